@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Check CDC extraction end to end against the local Postgres stand-in.
+
+    docker compose -f benchmarks/docker-compose.yml up -d --build
+    python -m benchmarks.cdc_roundtrip
+
+Loads the synthetic 10k dataset with a full query extraction, then inserts,
+updates and deletes source rows and verifies that one CDC micro-batch
+reproduces all three changes in the raw DuckDB dataset. Exits non-zero on
+any mismatch.
+"""
+
+import os
+import shutil
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.run_benchmarks import benchmark_database_config  # noqa: E402
+from benchmarks.synthetic_data import connect, generate  # noqa: E402
+from dlt_extraction.cdc_source import drop_replication, setup_replication  # noqa: E402
+from dlt_extraction.health_data_pipeline import HealthDataPipeline  # noqa: E402
+from dlt_extraction.pipeline_config import PipelineConfig  # noqa: E402
+
+WORK_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "work", "cdc")
+SLOT_NAME = "health_data_cdc_check"
+TABLES = [
+    'customers', 'medical_checkups', 'blood_pressure_readings',
+    'blood_sugar_readings', 'cholesterol_readings', 'sodium_readings'
+]
+
+
+def _run(database_config, **overrides):
+    config = PipelineConfig(
+        pipeline_name="health_data_cdc_check",
+        output_directory=WORK_DIR,
+        table_limits={},
+        table_filters={},
+        cdc_slot_name=SLOT_NAME,
+        cdc_max_batch_seconds=5,
+        **overrides
+    )
+    pipeline = HealthDataPipeline(config, database_config=database_config)
+    pipeline.run_extraction(show_progress=False)
+    return pipeline
+
+
+def main():
+    database_config = benchmark_database_config()
+    generate(database_config, '10k')
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR)
+
+    drop_replication(database_config, SLOT_NAME)
+    setup_replication(database_config, TABLES, SLOT_NAME)
+    try:
+        _run(database_config, full_refresh=True).close()
+
+        connection = connect(database_config)
+        with connection, connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO sodium_readings (checkup_id, sodium_level, test_type, measurement_time) "
+                "VALUES (1, 141.50, 'Standard', now()) RETURNING reading_id"
+            )
+            inserted_id = cursor.fetchone()[0]
+            cursor.execute("UPDATE customers SET email = 'cdc-check@example.com' WHERE customer_id = 1")
+            cursor.execute("DELETE FROM sodium_readings WHERE reading_id = 2")
+        connection.close()
+
+        pipeline = _run(database_config, extraction_mode="cdc")
+        duckdb = pipeline.get_duckdb_connection()
+        checks = {
+            'insert': duckdb.execute(
+                "SELECT count(*) FROM raw.sodium_readings WHERE reading_id = ?", [inserted_id]
+            ).fetchone()[0] == 1,
+            'update': duckdb.execute(
+                "SELECT email FROM raw.customers WHERE customer_id = 1"
+            ).fetchone()[0] == 'cdc-check@example.com',
+            'delete': duckdb.execute(
+                "SELECT count(*) FROM raw.sodium_readings WHERE reading_id = 2"
+            ).fetchone()[0] == 0
+        }
+        pipeline.close()
+    finally:
+        drop_replication(database_config, SLOT_NAME)
+
+    for name, passed in checks.items():
+        print(f"{name:<8} {'ok' if passed else 'FAILED'}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
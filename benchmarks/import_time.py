@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Check the startup cost of importing dlt_extraction against a budget.
+
+    python -m benchmarks.import_time [--budget-ms 150]
+
+Runs `python -X importtime` in a fresh interpreter for each probe and sums
+the cumulative time of the top-level imports. A probe fails if it exceeds
+the budget or pulls in a module that should only load on first use (dlt,
+pandas, SQLAlchemy, pyarrow, DuckDB). Exits non-zero on any failure.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ['dlt', 'pandas', 'sqlalchemy', 'pyarrow', 'duckdb']
+
+PROBES = {
+    'package': "import dlt_extraction",
+    'pipeline_config': "from dlt_extraction import PipelineConfig, get_default_config",
+    'pipeline_class': "from dlt_extraction import HealthDataPipeline"
+}
+
+
+def measure(statement: str) -> Tuple[float, List[str]]:
+    """
+    Import cost of a statement in a fresh interpreter.
+
+    Returns:
+        Cumulative milliseconds of the top-level imports and the heavy
+        modules that were loaded
+    """
+    script = (
+        f"{statement}\n"
+        "import sys\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", script],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+
+    cumulative_us = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: self [us] | cumulative | imported package", nested
+        # packages are indented and already counted in their parent's total
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not name[1:].startswith(" "):
+            cumulative_us += int(cumulative)
+    heavy = [module for module in completed.stdout.strip().split(",") if module]
+    return cumulative_us / 1000, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check dlt_extraction import time against a budget")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Budget per probe in milliseconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per probe; the fastest is reported")
+    args = parser.parse_args()
+
+    results: Dict[str, Tuple[float, List[str]]] = {}
+    for probe, statement in PROBES.items():
+        runs = [measure(statement) for _ in range(args.repeat)]
+        results[probe] = min(runs, key=lambda run: run[0])
+
+    failed = False
+    for probe, (milliseconds, heavy) in results.items():
+        problems = []
+        if milliseconds > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:g} ms budget")
+        if heavy:
+            problems.append(f"loaded {', '.join(heavy)}")
+        failed = failed or bool(problems)
+        status = "; ".join(problems) if problems else "ok"
+        print(f"{probe:<16} {milliseconds:>8.1f} ms  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Check that a memory-bounded full extraction stays under an RSS ceiling.
+
+    docker compose -f benchmarks/docker-compose.yml up -d --build
+    python -m benchmarks.memory_ceiling [--scale 1m] [--max-rss-mb 1024]
+
+Loads the synthetic dataset with get_memory_bounded_config in a freshly
+spawned process and compares the peak RSS of that process and its normalize
+workers with the ceiling. Run it at two scales to confirm the peak stays flat
+as the tables grow. Exits non-zero when the ceiling is exceeded.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Any, Dict
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.run_benchmarks import WORK_DIR, benchmark_database_config  # noqa: E402
+from benchmarks.synthetic_data import SCALES, generate  # noqa: E402
+from dlt_extraction.metrics import peak_rss_bytes  # noqa: E402
+
+MEMORY_WORK_DIR = os.path.join(WORK_DIR, "memory")
+
+
+def _bounded_extraction(memory_limit: str) -> Dict[str, Any]:
+    from dlt_extraction.health_data_pipeline import HealthDataPipeline
+    from dlt_extraction.pipeline_config import get_memory_bounded_config
+
+    config = get_memory_bounded_config(memory_limit)
+    config.pipeline_name = "health_data_memory_check"
+    config.output_directory = MEMORY_WORK_DIR
+    config.destination_config = {"credentials": os.path.join(MEMORY_WORK_DIR, "health_data.duckdb")}
+    config.duckdb_temp_directory = os.path.join(MEMORY_WORK_DIR, "duckdb_tmp")
+    config.table_limits = {}
+    config.table_filters = {}
+    config.full_refresh = True
+    pipeline = HealthDataPipeline(config, database_config=benchmark_database_config())
+    try:
+        result = pipeline.run_extraction(show_progress=False)
+    finally:
+        pipeline.close()
+    return {
+        'rows': result['rows_extracted'],
+        'seconds': result['wall_clock_seconds'],
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the peak RSS of a memory-bounded extraction")
+    parser.add_argument("--scale", choices=list(SCALES), default="1m", help="Rows per readings table")
+    parser.add_argument("--skip-generate", action="store_true", help="Reuse existing benchmark data")
+    parser.add_argument("--memory-limit", default="512MB", help="DuckDB destination memory_limit")
+    parser.add_argument("--max-rss-mb", type=float, default=1024.0, help="Peak RSS ceiling in MiB")
+    args = parser.parse_args()
+
+    if not args.skip_generate:
+        generate(benchmark_database_config(), args.scale)
+    shutil.rmtree(MEMORY_WORK_DIR, ignore_errors=True)
+    os.makedirs(MEMORY_WORK_DIR)
+
+    # A fresh process so the peak is not inherited from data generation
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        result = executor.submit(_bounded_extraction, args.memory_limit).result()
+
+    peak_mb = result['peak_rss_bytes'] / 2**20
+    print(f"{args.scale}: {result['rows']} rows in {result['seconds']:.2f}s, "
+          f"peak RSS {peak_mb:.1f} MiB (ceiling {args.max_rss_mb:g} MiB)")
+    if peak_mb > args.max_rss_mb:
+        print("Peak RSS over the ceiling")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
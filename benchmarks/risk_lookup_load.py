@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Load-test customer risk lookups against a latency budget.
+
+    python -m benchmarks.risk_lookup_load [--http] [--budget-p99-ms 5]
+
+Issues random point lookups from several threads, either through RiskLookup
+directly or through the HTTP service started in-process on a free port, and
+reports throughput and latency percentiles for a cold (uncached) and a warm
+pass. Exits non-zero when the warm p99 exceeds the budget.
+"""
+
+import argparse
+import http.client
+import os
+import random
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from health_analytics.risk_lookup import DEFAULT_DUCKDB_PATH, RiskLookup  # noqa: E402
+from health_analytics.service import create_server  # noqa: E402
+
+
+def run_load(lookup_one: Callable[[int], object], customer_ids: List[int],
+             threads: int, requests_per_thread: int) -> Dict[str, float]:
+    """Latency percentiles in milliseconds and requests per second of one pass."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def worker(seed: int):
+        rng = random.Random(seed)
+        local = []
+        for _ in range(requests_per_thread):
+            customer_id = rng.choice(customer_ids)
+            started = time.perf_counter()
+            lookup_one(customer_id)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(seed,)) for seed in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(p: float) -> float:
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        'requests': len(latencies),
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test customer risk lookups")
+    parser.add_argument("--duckdb", default=DEFAULT_DUCKDB_PATH, help="DuckDB file with the analytics marts")
+    parser.add_argument("--http", action="store_true", help="Go through the HTTP service")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per thread and pass")
+    parser.add_argument("--customers", type=int, default=10000, help="Distinct customers sampled")
+    parser.add_argument("--budget-p99-ms", type=float, default=5.0, help="Budget for the warm p99")
+    args = parser.parse_args()
+
+    lookup = RiskLookup(args.duckdb, cache_size=args.customers, max_cursors=args.threads)
+    customer_ids = lookup.sample_customer_ids(args.customers)
+    if not customer_ids:
+        print("clinical_risk_profile is empty")
+        return 1
+
+    server = None
+    lookup_one = lookup.get
+    if args.http:
+        server = create_server(lookup, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+        connections = threading.local()
+
+        def lookup_one(customer_id: int):
+            # One keep-alive connection per client thread
+            if not hasattr(connections, 'connection'):
+                connections.connection = http.client.HTTPConnection("127.0.0.1", port)
+            connections.connection.request("GET", f"/risk/{customer_id}")
+            return connections.connection.getresponse().read()
+
+    try:
+        cold = run_load(lookup_one, customer_ids, args.threads, args.requests)
+        warm = run_load(lookup_one, customer_ids, args.threads, args.requests)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        lookup.close()
+
+    print(f"Risk lookups ({'http' if args.http else 'direct'}, {args.threads} threads, "
+          f"{len(customer_ids)} customers)")
+    for name, result in (("cold", cold), ("warm", warm)):
+        print(f"{name:<5} {result['requests_per_second']:>10,.0f} req/s  "
+              f"p50 {result['p50_ms']:.3f} ms  p95 {result['p95_ms']:.3f} ms  "
+              f"p99 {result['p99_ms']:.3f} ms  max {result['max_ms']:.3f} ms")
+    if warm['p99_ms'] > args.budget_p99_ms:
+        print(f"warm p99 over the {args.budget_p99_ms:g} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
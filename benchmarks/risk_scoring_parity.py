@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Check health_analytics.risk_scoring against the dbt models.
+
+    python -m benchmarks.run_benchmarks --scale 100k
+    python -m benchmarks.risk_scoring_parity [--duckdb benchmarks/work/health_data.duckdb]
+
+Reading level: scores every row of the staging tables from its measurements
+and compares the labels with the staging risk level columns. Customer level:
+maps the level columns of clinical_risk_profile to scores, composite score,
+overall risk category and care priority and compares them with the mart.
+Reports rows per second for each check and exits non-zero on any mismatch.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pyarrow as pa
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.run_benchmarks import WORK_DIR  # noqa: E402
+from health_analytics import risk_scoring  # noqa: E402
+
+# Staging model, the columns read, and the component and level column compared
+READING_CHECKS = [
+    ('stg_medical_checkups', ['height_cm', 'weight_kg'], 'bmi', 'health_risk_level'),
+    ('stg_blood_pressure_readings', ['systolic_pressure', 'diastolic_pressure'], 'bp', 'bp_risk_level'),
+    ('stg_blood_sugar_readings', ['glucose_level', 'measurement_type'], 'glucose', 'glucose_risk_level'),
+    ('stg_cholesterol_readings', ['ldl_cholesterol', 'hdl_cholesterol', 'triglycerides'],
+     'cholesterol', 'cardiovascular_risk_level'),
+    ('stg_sodium_readings', ['sodium_level'], 'sodium', 'clinical_risk_level')
+]
+
+# clinical_risk_profile level column per component
+MART_LEVELS = {
+    'bmi': 'bmi_health_risk',
+    'bp': 'bp_risk_level',
+    'glucose': 'glucose_risk_level',
+    'cholesterol': 'cholesterol_cardiovascular_risk',
+    'sodium': 'sodium_risk_level'
+}
+
+
+def _relation(connection, table_name: str) -> str:
+    row = connection.execute(
+        "SELECT table_schema FROM information_schema.tables WHERE table_name = ? ORDER BY table_schema LIMIT 1",
+        [table_name]
+    ).fetchone()
+    if row is None:
+        raise LookupError(f"{table_name} not found; run dbt first")
+    return f'"{row[0]}"."{table_name}"'
+
+
+def _mismatches(expected, actual) -> int:
+    expected = np.asarray(expected)
+    actual = np.asarray(actual)
+    if expected.dtype.kind == "f" or actual.dtype.kind == "f":
+        return int(np.count_nonzero(~np.isclose(expected.astype(np.float64), actual.astype(np.float64))))
+    return int(np.count_nonzero(expected != actual))
+
+
+def check_readings(connection) -> List[Tuple[str, int, int, float]]:
+    """Mismatching rows per staging risk level, with the row count and rows per second."""
+    results = []
+    for model_name, columns, component, level_column in READING_CHECKS:
+        table = connection.execute(
+            f"SELECT {', '.join(columns + [level_column])} FROM {_relation(connection, model_name)}"
+        ).fetch_arrow_table()
+        inputs = {name: table.column(name) for name in columns}
+        started = time.perf_counter()
+        if component == 'bmi':
+            inputs = {'bmi': risk_scoring.bmi(inputs['height_cm'], inputs['weight_kg'])}
+        levels = risk_scoring.RISK_RULES[component].apply(inputs)
+        seconds = time.perf_counter() - started
+        expected = np.asarray(table.column(level_column).to_numpy(zero_copy_only=False), dtype=object)
+        results.append((f"{model_name}.{level_column}", _mismatches(expected, levels), table.num_rows,
+                        table.num_rows / seconds if seconds > 0 else 0.0))
+    return results
+
+
+def check_mart(connection) -> List[Tuple[str, int, int, float]]:
+    """Mismatching customers per clinical_risk_profile column, with the row count and rows per second."""
+    score_columns = [f"{component}_risk_score" for component in risk_scoring.COMPONENTS]
+    table = connection.execute(
+        f"SELECT {', '.join(list(MART_LEVELS.values()) + score_columns)}, "
+        f"composite_risk_score, overall_risk_category, care_priority "
+        f"FROM {_relation(connection, 'clinical_risk_profile')}"
+    ).fetch_arrow_table()
+
+    started = time.perf_counter()
+    scores = risk_scoring.scores_from_levels(
+        {component: table.column(column) for component, column in MART_LEVELS.items()}
+    )
+    composite = risk_scoring.composite_score(scores)
+    overall, priority = risk_scoring.risk_categories(composite)
+    seconds = time.perf_counter() - started
+
+    computed: Dict[str, np.ndarray] = {f"{component}_risk_score": score for component, score in scores.items()}
+    computed.update(composite_risk_score=composite, overall_risk_category=overall, care_priority=priority)
+    rows_per_second = table.num_rows / seconds if seconds > 0 else 0.0
+    results = []
+    for column, values in computed.items():
+        expected = table.column(column)
+        if pa.types.is_string(expected.type):
+            expected = np.asarray(expected.to_numpy(zero_copy_only=False), dtype=object)
+        else:
+            expected = risk_scoring._as_numpy(expected)
+        results.append((f"clinical_risk_profile.{column}", _mismatches(expected, values),
+                        table.num_rows, rows_per_second))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the Python risk scoring against the dbt models")
+    parser.add_argument("--duckdb", default=os.path.join(WORK_DIR, "health_data.duckdb"),
+                        help="DuckDB file built by dbt")
+    args = parser.parse_args()
+
+    import duckdb
+
+    connection = duckdb.connect(args.duckdb, read_only=True)
+    try:
+        results = check_readings(connection) + check_mart(connection)
+    finally:
+        connection.close()
+
+    failed = False
+    for check, mismatches, rows, rows_per_second in results:
+        failed = failed or mismatches > 0
+        status = "ok" if mismatches == 0 else f"{mismatches} mismatches"
+        print(f"{check:<58} {rows:>10} rows {rows_per_second:>14,.0f} rows/s  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
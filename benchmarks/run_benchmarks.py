@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Benchmark extraction and dbt builds against a synthetic PostgreSQL database.
+
+Start the local Postgres stand-in first:
+
+    docker compose -f benchmarks/docker-compose.yml up -d
+    python -m benchmarks.run_benchmarks --scale 100k
+
+Each step runs in a fresh process so its peak RSS is measured in isolation:
+
+- full_extraction:        full refresh run_extraction into a scratch DuckDB file
+- incremental_extraction: run_extraction after appending a delta to the source
+- export_to_files:        filesystem export of every table
+- dbt_run:                dbt run --full-refresh against the scratch DuckDB file
+
+The JSON report is written to benchmarks/results/ and can be compared with a
+report from another commit using --compare.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any, Dict, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.synthetic_data import SCALES, append_delta, generate  # noqa: E402
+from config.database import DatabaseConfig  # noqa: E402
+from dlt_extraction.metrics import peak_rss_bytes  # noqa: E402
+
+DBT_PROJECT_DIR = os.path.join(PROJECT_ROOT, "dbt_health_data")
+RESULTS_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "results")
+WORK_DIR = os.path.join(PROJECT_ROOT, "benchmarks", "work")
+
+# Metrics compared between reports, and whether a larger value is better
+COMPARED_METRICS = {
+    'seconds': False,
+    'rows_per_second': True,
+    'peak_rss_bytes': False,
+    'duckdb_bytes': False
+}
+
+
+def benchmark_database_config() -> DatabaseConfig:
+    """Connection settings for the benchmark database, matching docker-compose.yml."""
+    return DatabaseConfig(
+        host=os.environ.get("BENCH_DB_HOST", "localhost"),
+        port=int(os.environ.get("BENCH_DB_PORT", "5433")),
+        database=os.environ.get("BENCH_DB_NAME", "health_benchmark"),
+        username=os.environ.get("BENCH_DB_USER", "benchmark"),
+        password=os.environ.get("BENCH_DB_PASSWORD", "benchmark")
+    )
+
+
+def _duckdb_bytes(path: str) -> int:
+    return sum(os.path.getsize(p) for p in (path, path + ".wal") if os.path.exists(p))
+
+
+def _extraction_step(step: str, full_refresh: bool) -> Dict[str, Any]:
+    from dlt_extraction.health_data_pipeline import HealthDataPipeline
+    from dlt_extraction.pipeline_config import PipelineConfig
+
+    config = PipelineConfig(
+        pipeline_name="health_data_benchmark",
+        output_directory=WORK_DIR,
+        table_limits={},
+        table_filters={},
+        full_refresh=full_refresh
+    )
+    pipeline = HealthDataPipeline(config, database_config=benchmark_database_config())
+    try:
+        result = pipeline.run_extraction(show_progress=False)
+    finally:
+        pipeline.close()
+    return {
+        'step': step,
+        'seconds': result['wall_clock_seconds'],
+        'rows': result['rows_extracted'],
+        'row_counts': result['row_counts'],
+        'stage_seconds': result['metrics']['stage_seconds'],
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def _export_step() -> Dict[str, Any]:
+    from dlt_extraction.health_data_pipeline import HealthDataPipeline
+    from dlt_extraction.pipeline_config import get_filesystem_config
+
+    export_dir = os.path.join(WORK_DIR, "export")
+    config = get_filesystem_config(export_dir)
+    config.pipeline_name = "health_data_benchmark_export"
+    config.table_limits = {}
+    config.table_filters = {}
+    config.full_refresh = True
+    result = HealthDataPipeline(config, database_config=benchmark_database_config()).run_extraction(
+        show_progress=False
+    )
+    return {
+        'step': 'export_to_files',
+        'seconds': result['wall_clock_seconds'],
+        'rows': result['rows_extracted'],
+        'row_counts': result['row_counts'],
+        'stage_seconds': result['metrics']['stage_seconds'],
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def _dbt_step() -> Dict[str, Any]:
+    from dbt.cli.main import dbtRunner
+
+    os.environ["HEALTH_DATA_DUCKDB_PATH"] = os.path.join(WORK_DIR, "health_data.duckdb")
+    os.chdir(DBT_PROJECT_DIR)
+    started = time.perf_counter()
+    result = dbtRunner().invoke([
+        "run", "--full-refresh",
+        "--project-dir", DBT_PROJECT_DIR,
+        "--profiles-dir", DBT_PROJECT_DIR
+    ])
+    seconds = time.perf_counter() - started
+    if not result.success:
+        raise RuntimeError(f"dbt run failed: {result.exception}")
+    return {
+        'step': 'dbt_run',
+        'seconds': seconds,
+        'rows': None,
+        'peak_rss_bytes': peak_rss_bytes()
+    }
+
+
+def _run_isolated(function, *args) -> Dict[str, Any]:
+    """Run one benchmark step in a freshly spawned process."""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        measurement = executor.submit(function, *args).result()
+
+    measurement['duckdb_bytes'] = _duckdb_bytes(os.path.join(WORK_DIR, "health_data.duckdb"))
+    rows, seconds = measurement['rows'], measurement['seconds']
+    measurement['rows_per_second'] = rows / seconds if rows is not None and seconds > 0 else None
+    print(f"{measurement['step']:<24} {seconds:>9.2f}s  "
+          f"peak RSS {measurement['peak_rss_bytes'] / 2**20:>8.1f} MiB")
+    return measurement
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale: str, skip_generate: bool = False) -> Dict[str, Any]:
+    """
+    Run every benchmark step at the given scale.
+
+    Args:
+        scale: One of SCALES
+        skip_generate: Reuse the data already in the benchmark database
+
+    Returns:
+        Benchmark report
+    """
+    database_config = benchmark_database_config()
+    generated = None
+    if not skip_generate:
+        generated = generate(database_config, scale)
+
+    # Every run starts from an empty DuckDB file and export directory
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR)
+
+    steps = {}
+    steps['full_extraction'] = _run_isolated(_extraction_step, 'full_extraction', True)
+    delta = append_delta(database_config, max(1, SCALES[scale] // 100))
+    steps['incremental_extraction'] = _run_isolated(_extraction_step, 'incremental_extraction', False)
+    steps['export_to_files'] = _run_isolated(_export_step)
+    steps['dbt_run'] = _run_isolated(_dbt_step)
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'scale': scale,
+        'python': platform.python_version(),
+        'generated_rows': generated,
+        'delta_rows': delta,
+        'steps': steps
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold_percent: float) -> list:
+    """
+    Compare a report against a baseline report.
+
+    Returns:
+        List of regressions larger than threshold_percent
+    """
+    if report['scale'] != baseline['scale']:
+        print(f"Warning: comparing scale {report['scale']} against baseline scale {baseline['scale']}")
+
+    regressions = []
+    print(f"\nComparison with {baseline.get('commit') or 'baseline'}")
+    print("=" * 72)
+    for step, measurement in report['steps'].items():
+        previous = baseline['steps'].get(step)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = previous.get(metric), measurement.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            regressed = -change > threshold_percent if higher_is_better else change > threshold_percent
+            marker = "  REGRESSION" if regressed else ""
+            print(f"{step:<24} {metric:<16} {old:>14,.1f} -> {new:>14,.1f} ({change:+6.1f}%){marker}")
+            if regressed:
+                regressions.append((step, metric, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction and dbt builds on synthetic data")
+    parser.add_argument("--scale", choices=list(SCALES), default="100k", help="Rows per readings table")
+    parser.add_argument("--skip-generate", action="store_true", help="Reuse existing benchmark data")
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/<commit>-<scale>.json)")
+    parser.add_argument("--compare", help="Previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    args = parser.parse_args()
+
+    report = run(args.scale, skip_generate=args.skip_generate)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{(report['commit'] or 'unknown')[:12]}-{args.scale}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"\nReport written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
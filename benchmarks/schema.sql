@@ -0,0 +1,82 @@
+-- Source schema for the synthetic benchmark database, matching models/staging/_sources.yml
+
+DROP TABLE IF EXISTS sodium_readings, cholesterol_readings, blood_sugar_readings,
+    blood_pressure_readings, medical_checkups, customers CASCADE;
+
+CREATE TABLE customers (
+    customer_id     BIGSERIAL PRIMARY KEY,
+    first_name      VARCHAR(100) NOT NULL,
+    last_name       VARCHAR(100) NOT NULL,
+    email           VARCHAR(255) NOT NULL UNIQUE,
+    date_of_birth   DATE NOT NULL,
+    gender          VARCHAR(20) NOT NULL,
+    created_at      TIMESTAMP NOT NULL DEFAULT now(),
+    updated_at      TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE medical_checkups (
+    checkup_id      BIGSERIAL PRIMARY KEY,
+    customer_id     BIGINT NOT NULL REFERENCES customers (customer_id),
+    checkup_date    TIMESTAMP NOT NULL,
+    checkup_type    VARCHAR(50),
+    height_cm       NUMERIC(5, 2) NOT NULL,
+    weight_kg       NUMERIC(5, 2) NOT NULL,
+    notes           TEXT,
+    created_at      TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE blood_pressure_readings (
+    reading_id          BIGSERIAL PRIMARY KEY,
+    checkup_id          BIGINT NOT NULL REFERENCES medical_checkups (checkup_id),
+    systolic_pressure   INTEGER NOT NULL,
+    diastolic_pressure  INTEGER NOT NULL,
+    heart_rate          INTEGER NOT NULL,
+    measurement_time    TIMESTAMP NOT NULL,
+    notes               TEXT,
+    created_at          TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE blood_sugar_readings (
+    reading_id          BIGSERIAL PRIMARY KEY,
+    checkup_id          BIGINT NOT NULL REFERENCES medical_checkups (checkup_id),
+    glucose_level       NUMERIC(6, 2) NOT NULL,
+    measurement_type    VARCHAR(30) NOT NULL,
+    measurement_time    TIMESTAMP NOT NULL,
+    notes               TEXT,
+    created_at          TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE cholesterol_readings (
+    reading_id          BIGSERIAL PRIMARY KEY,
+    checkup_id          BIGINT NOT NULL REFERENCES medical_checkups (checkup_id),
+    total_cholesterol   NUMERIC(6, 2) NOT NULL,
+    ldl_cholesterol     NUMERIC(6, 2) NOT NULL,
+    hdl_cholesterol     NUMERIC(6, 2) NOT NULL,
+    triglycerides       NUMERIC(6, 2) NOT NULL,
+    fasting_hours       INTEGER,
+    measurement_time    TIMESTAMP NOT NULL,
+    notes               TEXT,
+    created_at          TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE TABLE sodium_readings (
+    reading_id          BIGSERIAL PRIMARY KEY,
+    checkup_id          BIGINT NOT NULL REFERENCES medical_checkups (checkup_id),
+    sodium_level        NUMERIC(6, 2) NOT NULL,
+    test_type           VARCHAR(50),
+    measurement_time    TIMESTAMP NOT NULL,
+    notes               TEXT,
+    created_at          TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX ON customers (updated_at);
+CREATE INDEX ON medical_checkups (checkup_date);
+CREATE INDEX ON medical_checkups (customer_id);
+CREATE INDEX ON blood_pressure_readings (created_at);
+CREATE INDEX ON blood_pressure_readings (checkup_id);
+CREATE INDEX ON blood_sugar_readings (created_at);
+CREATE INDEX ON blood_sugar_readings (checkup_id);
+CREATE INDEX ON cholesterol_readings (created_at);
+CREATE INDEX ON cholesterol_readings (checkup_id);
+CREATE INDEX ON sodium_readings (created_at);
+CREATE INDEX ON sodium_readings (checkup_id);
@@ -0,0 +1,224 @@
+"""Synthetic health data generator for the benchmark PostgreSQL database."""
+
+import os
+from typing import Dict
+
+import psycopg2
+
+from config.database import DatabaseConfig
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+# Rows per *_readings table at each benchmark scale
+SCALES = {
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+    '100m': 100_000_000
+}
+
+READINGS_TABLES = [
+    'blood_pressure_readings',
+    'blood_sugar_readings',
+    'cholesterol_readings',
+    'sodium_readings'
+]
+
+# Rows are generated server-side in batches so 100M-row scales never hold a
+# single huge transaction or stream data through Python
+BATCH_ROWS = 1_000_000
+
+_CUSTOMERS_SQL = """
+INSERT INTO customers (first_name, last_name, email, date_of_birth, gender, created_at, updated_at)
+SELECT
+    (ARRAY['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David', 'Maria'])[1 + i %% 10],
+    (ARRAY['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Lopez', 'Wilson'])[1 + (i / 10) %% 10],
+    'customer' || i || '@example.com',
+    DATE '1940-01-01' + (random() * 24000)::int,
+    (ARRAY['Male', 'Female', 'Other', 'Prefer not to say'])[1 + floor(random() * 4)::int],
+    TIMESTAMP '2020-01-01' + (i::float8 / %(total)s) * INTERVAL '1500 days',
+    TIMESTAMP '2020-01-01' + (i::float8 / %(total)s) * INTERVAL '1500 days'
+FROM generate_series(%(start)s, %(stop)s) AS i
+"""
+
+_CHECKUPS_SQL = """
+INSERT INTO medical_checkups (customer_id, checkup_date, checkup_type, height_cm, weight_kg, notes, created_at)
+SELECT
+    1 + i %% %(customers)s,
+    TIMESTAMP '2020-01-01' + (i::float8 / %(total)s) * INTERVAL '1800 days',
+    (ARRAY['Annual Physical', 'Follow-up', 'Specialist', NULL])[1 + floor(random() * 4)::int],
+    round((150 + random() * 45)::numeric, 2),
+    round((45 + random() * 80)::numeric, 2),
+    NULL,
+    TIMESTAMP '2020-01-01' + (i::float8 / %(total)s) * INTERVAL '1800 days' + INTERVAL '1 hour'
+FROM generate_series(%(start)s, %(stop)s) AS i
+"""
+
+_READINGS_SQL = {
+    'blood_pressure_readings': """
+INSERT INTO blood_pressure_readings (checkup_id, systolic_pressure, diastolic_pressure, heart_rate, measurement_time, created_at)
+SELECT
+    1 + i %% %(checkups)s,
+    95 + floor(random() * 90)::int,
+    60 + floor(random() * 45)::int,
+    50 + floor(random() * 60)::int,
+    ts,
+    ts + INTERVAL '5 minutes'
+FROM (
+    SELECT i, %(base_time)s::timestamp + (i::float8 / %(total)s) * %(span)s::interval AS ts
+    FROM generate_series(%(start)s, %(stop)s) AS i
+) g
+""",
+    'blood_sugar_readings': """
+INSERT INTO blood_sugar_readings (checkup_id, glucose_level, measurement_type, measurement_time, created_at)
+SELECT
+    1 + i %% %(checkups)s,
+    round((60 + random() * 200)::numeric, 2),
+    (ARRAY['fasting', 'random', 'post_meal', 'oral_glucose_tolerance'])[1 + floor(random() * 4)::int],
+    ts,
+    ts + INTERVAL '5 minutes'
+FROM (
+    SELECT i, %(base_time)s::timestamp + (i::float8 / %(total)s) * %(span)s::interval AS ts
+    FROM generate_series(%(start)s, %(stop)s) AS i
+) g
+""",
+    'cholesterol_readings': """
+INSERT INTO cholesterol_readings (checkup_id, total_cholesterol, ldl_cholesterol, hdl_cholesterol, triglycerides,
+                                  fasting_hours, measurement_time, created_at)
+SELECT
+    1 + i %% %(checkups)s,
+    round((140 + random() * 160)::numeric, 2),
+    round((60 + random() * 140)::numeric, 2),
+    round((30 + random() * 50)::numeric, 2),
+    round((60 + random() * 400)::numeric, 2),
+    floor(random() * 14)::int,
+    ts,
+    ts + INTERVAL '5 minutes'
+FROM (
+    SELECT i, %(base_time)s::timestamp + (i::float8 / %(total)s) * %(span)s::interval AS ts
+    FROM generate_series(%(start)s, %(stop)s) AS i
+) g
+""",
+    'sodium_readings': """
+INSERT INTO sodium_readings (checkup_id, sodium_level, test_type, measurement_time, created_at)
+SELECT
+    1 + i %% %(checkups)s,
+    round((128 + random() * 22)::numeric, 2),
+    (ARRAY['Standard', 'Basic Metabolic Panel', 'Comprehensive Metabolic Panel', 'Electrolyte Panel'])[1 + floor(random() * 4)::int],
+    ts,
+    ts + INTERVAL '5 minutes'
+FROM (
+    SELECT i, %(base_time)s::timestamp + (i::float8 / %(total)s) * %(span)s::interval AS ts
+    FROM generate_series(%(start)s, %(stop)s) AS i
+) g
+"""
+}
+
+
+def table_sizes(readings_rows: int) -> Dict[str, int]:
+    """
+    Derive consistent table sizes from the number of rows per readings table.
+
+    Every checkup belongs to an existing customer and every reading to an
+    existing checkup, matching the relationships declared in _sources.yml.
+    """
+    customers = max(100, readings_rows // 50)
+    checkups = max(customers, readings_rows // 5)
+    sizes = {'customers': customers, 'medical_checkups': checkups}
+    sizes.update({table_name: readings_rows for table_name in READINGS_TABLES})
+    return sizes
+
+
+def connect(database_config: DatabaseConfig):
+    """Open a psycopg2 connection to the benchmark database."""
+    return psycopg2.connect(
+        host=database_config.host,
+        port=database_config.port,
+        dbname=database_config.database,
+        user=database_config.username,
+        password=database_config.password
+    )
+
+
+def _insert_batches(cursor, sql: str, total: int, params: Dict):
+    for start in range(1, total + 1, BATCH_ROWS):
+        stop = min(start + BATCH_ROWS - 1, total)
+        cursor.execute(sql, dict(params, start=start, stop=stop, total=total))
+
+
+def generate(database_config: DatabaseConfig, scale: str) -> Dict[str, int]:
+    """
+    Recreate the source schema and fill it with synthetic data.
+
+    Args:
+        database_config: Connection settings for the benchmark database
+        scale: One of SCALES
+
+    Returns:
+        Dictionary of rows generated per table
+    """
+    sizes = table_sizes(SCALES[scale])
+    connection = connect(database_config)
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute("SELECT setseed(0.42)")
+            with open(SCHEMA_FILE) as f:
+                cursor.execute(f.read())
+
+            print(f"Generating {sizes['customers']} customers...")
+            _insert_batches(cursor, _CUSTOMERS_SQL, sizes['customers'], {})
+            print(f"Generating {sizes['medical_checkups']} medical checkups...")
+            _insert_batches(cursor, _CHECKUPS_SQL, sizes['medical_checkups'], {'customers': sizes['customers']})
+
+            for table_name in READINGS_TABLES:
+                print(f"Generating {sizes[table_name]} {table_name}...")
+                _insert_batches(cursor, _READINGS_SQL[table_name], sizes[table_name], {
+                    'checkups': sizes['medical_checkups'],
+                    'base_time': '2020-01-01',
+                    'span': '1800 days'
+                })
+
+        # Fresh planner statistics for pg_class based estimates
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    finally:
+        connection.close()
+    return sizes
+
+
+def append_delta(database_config: DatabaseConfig, readings_rows: int) -> Dict[str, int]:
+    """
+    Simulate new activity for incremental runs: new readings and updated customers.
+
+    Args:
+        database_config: Connection settings for the benchmark database
+        readings_rows: New rows to add to each readings table
+
+    Returns:
+        Dictionary of rows added or updated per table
+    """
+    connection = connect(database_config)
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM medical_checkups")
+            checkups = cursor.fetchone()[0]
+            cursor.execute(
+                "UPDATE customers SET updated_at = now() WHERE customer_id %% %(step)s = 0",
+                {'step': 50}
+            )
+            updated_customers = cursor.rowcount
+
+            for table_name in READINGS_TABLES:
+                sql = _READINGS_SQL[table_name].replace("%(base_time)s", "now()").replace(
+                    "%(span)s", "INTERVAL '1 minute'"
+                )
+                _insert_batches(cursor, sql, readings_rows, {'checkups': checkups})
+    finally:
+        connection.close()
+
+    delta = {'customers': updated_customers}
+    delta.update({table_name: readings_rows for table_name in READINGS_TABLES})
+    return delta
@@ -0,0 +1,73 @@
+{# Scope source tests to the most recent dlt loads.
+
+   With var dq_scope = recent, every test on a raw table reads only the rows of the
+   last dq_recent_loads completed loads; dq_scope = full sweeps the whole table.
+   A test can pin its own scope with config dq_scope. #}
+
+{% macro dq_scope() -%}
+    {{ return(config.get('dq_scope') or var('dq_scope', 'full')) }}
+{%- endmacro %}
+
+
+{% macro is_dlt_raw_table(relation) -%}
+    {{ return(
+        relation is not string
+        and relation.schema == var('raw_schema', 'raw')
+        and not relation.identifier.startswith('_dlt')
+        and not relation.identifier.startswith('quarantine_')
+    ) }}
+{%- endmacro %}
+
+
+{% macro recent_load_ids(relation) -%}
+    {%- set loads = api.Relation.create(database=relation.database, schema=relation.schema, identifier='_dlt_loads') -%}
+    (select load_id from {{ loads }} where status = 0 order by load_id desc limit {{ var('dq_recent_loads', 1) }})
+{%- endmacro %}
+
+
+{# Overrides dbt's get_where_subquery, which wraps the model argument of every generic test. #}
+{% macro get_where_subquery(relation) -%}
+    {%- set where = config.get('where') -%}
+    {%- set filters = [] -%}
+    {%- if where -%}
+        {%- if "__dbt_internal_ref" in where -%}
+            {%- set where = where | replace("__dbt_internal_ref", "ref") -%}
+        {%- endif -%}
+        {%- do filters.append(where) -%}
+    {%- endif -%}
+    {%- if dq_scope() == 'recent' and is_dlt_raw_table(relation) -%}
+        {%- do filters.append("_dlt_load_id in " ~ recent_load_ids(relation)) -%}
+    {%- endif -%}
+    {%- if filters -%}
+        {%- do return("(select * from " ~ relation ~ " where " ~ filters | join(" and ") ~ ") dbt_subquery") -%}
+    {%- else -%}
+        {%- do return(relation) -%}
+    {%- endif -%}
+{%- endmacro %}
+
+
+{# Uniqueness of the keys in the tested rows against the full key set of the table.
+
+   Rows from recent loads are checked against every row, so a new key colliding with
+   one loaded earlier still fails. Declare it with config dq_scope: full so that the
+   model argument stays the whole table; the recent scope is applied here instead. #}
+{% test unique_key_set(model, column_name) %}
+
+with tested_keys as (
+    select distinct {{ column_name }} as key_value
+    from {{ model }}
+    where {{ column_name }} is not null
+    {%- if var('dq_scope', 'full') == 'recent' and is_dlt_raw_table(model) %}
+      and _dlt_load_id in {{ recent_load_ids(model) }}
+    {%- endif %}
+)
+
+select
+    {{ column_name }} as unique_field,
+    count(*) as n_records
+from {{ model }}
+where {{ column_name }} in (select key_value from tested_keys)
+group by {{ column_name }}
+having count(*) > 1
+
+{% endtest %}
@@ -0,0 +1,83 @@
+{# Helpers for change-aware incremental models keyed on dlt's _dlt_load_id. #}
+
+{% macro latest_dlt_load_id() -%}
+    (select max(load_id) from {{ source('raw', '_dlt_loads') }} where status = 0)
+{%- endmacro %}
+
+
+{# Watermark of a model built from the given staging models: the newest _dlt_load_id among
+   the rows it read, not the newest load overall, so loads whose staging rows were not built
+   yet (a failed or partially selected run) are picked up later. Capped at the latest
+   completed load, so rows of a load that stopped halfway are read again once it completes. #}
+{% macro staged_load_id(model_names) -%}
+    (
+        select case when staged_load_id > completed_load_id then completed_load_id else staged_load_id end
+        from (
+            select
+                (
+                    select max(_dlt_load_id)
+                    from (
+                        {%- for model_name in model_names %}
+                        select max(_dlt_load_id) as _dlt_load_id from {{ ref(model_name) }}
+                        {%- if not loop.last %} union all{% endif %}
+                        {%- endfor %}
+                    )
+                ) as staged_load_id,
+                {{ latest_dlt_load_id() }} as completed_load_id
+        )
+    )
+{%- endmacro %}
+
+
+{# Staging models read by changed_customer_ids. #}
+{% macro customer_staging_models() -%}
+    {{ return([
+        'stg_customers',
+        'stg_medical_checkups',
+        'stg_blood_pressure_readings',
+        'stg_blood_sugar_readings',
+        'stg_cholesterol_readings',
+        'stg_sodium_readings'
+    ]) }}
+{%- endmacro %}
+
+
+{% macro load_id_watermark(column_name='source_load_id') -%}
+    (select coalesce(max({{ column_name }}), '') from {{ this }})
+{%- endmacro %}
+
+
+{# Customers with any customer, checkup or reading row loaded after the watermark. #}
+{% macro changed_customer_ids(watermark) %}
+    select customer_id
+    from {{ ref('stg_customers') }}
+    where _dlt_load_id > {{ watermark }}
+
+    union
+
+    select customer_id
+    from {{ ref('stg_medical_checkups') }}
+    where _dlt_load_id > {{ watermark }}
+
+    union
+
+    select mc.customer_id
+    from {{ ref('stg_medical_checkups') }} mc
+    inner join (
+        select checkup_id from {{ ref('stg_blood_pressure_readings') }} where _dlt_load_id > {{ watermark }}
+        union
+        select checkup_id from {{ ref('stg_blood_sugar_readings') }} where _dlt_load_id > {{ watermark }}
+        union
+        select checkup_id from {{ ref('stg_cholesterol_readings') }} where _dlt_load_id > {{ watermark }}
+        union
+        select checkup_id from {{ ref('stg_sodium_readings') }} where _dlt_load_id > {{ watermark }}
+    ) changed_readings on mc.checkup_id = changed_readings.checkup_id
+{% endmacro %}
+
+
+{# Restrict a CTE to the changed_customers CTE on incremental runs. #}
+{% macro incremental_customer_filter(column_name, keyword='where') -%}
+    {%- if is_incremental() %}
+    {{ keyword }} {{ column_name }} in (select customer_id from changed_customers)
+    {%- endif %}
+{%- endmacro %}
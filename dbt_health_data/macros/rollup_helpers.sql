@@ -0,0 +1,80 @@
+{# Per customer, measure and time bucket rollups of int_readings_long. #}
+
+{# Body of a rollup model at a date_trunc grain (day, week or month).
+
+   On incremental runs only the (customer, measure, bucket) combinations with a
+   reading loaded after the table's source_load_id watermark are recomputed, from
+   every reading in those buckets, and replaced through the model's
+   delete+insert unique key. Category transitions are counted between
+   consecutive readings inside a bucket; first_category and last_category let a
+   trend query count the transitions across bucket boundaries. #}
+{% macro readings_rollup(grain) %}
+with
+{% if is_incremental() %}
+-- Buckets with readings loaded since the last build
+affected_buckets as (
+    select distinct
+        customer_id,
+        measure,
+        cast(date_trunc('{{ grain }}', measured_at) as date) as bucket_start
+    from {{ ref('int_readings_long') }}
+    where _dlt_load_id > {{ load_id_watermark() }}
+),
+{% endif %}
+
+readings as (
+    select
+        r.customer_id,
+        r.measure,
+        cast(date_trunc('{{ grain }}', r.measured_at) as date) as bucket_start,
+        r.measured_at,
+        r.reading_id,
+        r.value,
+        r.category
+    from {{ ref('int_readings_long') }} r
+    {%- if is_incremental() %}
+    inner join affected_buckets b
+        on r.customer_id = b.customer_id
+        and r.measure = b.measure
+        and cast(date_trunc('{{ grain }}', r.measured_at) as date) = b.bucket_start
+    {%- endif %}
+),
+
+sequenced as (
+    select
+        *,
+        lag(category) over (
+            partition by customer_id, measure, bucket_start
+            order by measured_at, reading_id
+        ) as previous_category
+    from readings
+)
+
+select
+    customer_id,
+    measure,
+    '{{ grain }}' as grain,
+    bucket_start,
+    count(*) as reading_count,
+    min(value) as min_value,
+    max(value) as max_value,
+    avg(value) as mean_value,
+    quantile_cont(value, 0.5) as p50_value,
+    quantile_cont(value, 0.95) as p95_value,
+    count(*) filter (where previous_category is not null and category <> previous_category) as category_transitions,
+    arg_min(category, (measured_at, reading_id)) as first_category,
+    arg_max(category, (measured_at, reading_id)) as last_category,
+    min(measured_at) as first_measured_at,
+    max(measured_at) as last_measured_at,
+    {{ staged_load_id([
+        'stg_blood_pressure_readings',
+        'stg_blood_sugar_readings',
+        'stg_cholesterol_readings',
+        'stg_sodium_readings'
+    ]) }} as source_load_id,
+    current_timestamp as dbt_updated_at
+from sequenced
+group by customer_id, measure, bucket_start
+-- Stored by customer so per-customer trend queries hit few row groups
+order by customer_id, measure, bucket_start
+{% endmacro %}
@@ -0,0 +1,82 @@
+{# Per-model materialization and layout for the staging layer. #}
+
+{# Materialization for a staging model, overridable through the staging_materializations var. #}
+{% macro staging_materialization(model_name, default='view') -%}
+    {{ return(var('staging_materializations', {}).get(model_name, default)) }}
+{%- endmacro %}
+
+
+{# Only read raw rows from loads newer than the ones already in the staging table. #}
+{% macro staging_incremental_filter() -%}
+    {%- if is_incremental() %}
+    where _dlt_load_id > (select coalesce(max(_dlt_load_id), '') from {{ this }})
+    {%- endif %}
+{%- endmacro %}
+
+
+{# Post hook for incremental staging models: delete rows without a raw row of the same key and load.
+
+   delete+insert only replaces keys present in the new batch, so it never removes rows
+   deleted from raw (CDC hard deletes, a source full refresh) nor rows whose newer raw
+   version now fails the model's filter. Every current staging row was built from the
+   raw row with its key and _dlt_load_id (dlt stamps merged rows with the new load id),
+   so an anti-join on both finds exactly the stale rows without restating the filter.
+   Prunes are recorded in staging_prune_log for reset_if_staging_pruned. Off unless the
+   staging_prune var is set, since the anti-join reads all of staging and raw every run. #}
+{% macro staging_prune_stale(source_table, key_column) -%}
+    {%- if var('staging_prune', false) and is_incremental() %}
+    {%- set stale_rows %}
+    from {{ this }} as staged
+    where not exists (
+        select 1
+        from {{ source('raw', source_table) }} as raw_rows
+        where raw_rows.{{ key_column }} = staged.{{ key_column }}
+          and raw_rows._dlt_load_id = staged._dlt_load_id
+    )
+    {%- endset %}
+    create table if not exists {{ staging_prune_log() }} (
+        model_name varchar,
+        pruned_rows bigint,
+        pruned_at timestamp with time zone
+    );
+    insert into {{ staging_prune_log() }}
+    select '{{ this.identifier }}', count(*), current_timestamp
+    {{ stale_rows }}
+    having count(*) > 0;
+    delete {{ stale_rows }};
+    {%- endif %}
+{%- endmacro %}
+
+
+{% macro staging_prune_log() -%}
+    {{ return(api.Relation.create(database=target.database, schema=target.schema, identifier='staging_prune_log')) }}
+{%- endmacro %}
+
+
+{# Pre hook for incremental models downstream of staging: empty the table when staging rows
+   were pruned after its last build. Aggregates over pruned rows cannot be found by load id,
+   so the emptied table's load_id_watermark() falls back to '' and the run recomputes all. #}
+{% macro reset_if_staging_pruned() -%}
+    {%- if var('staging_prune', false) and is_incremental() and execute %}
+    {%- set prune_log = adapter.get_relation(
+        database=target.database, schema=target.schema, identifier='staging_prune_log'
+    ) %}
+    {%- if prune_log is not none %}
+    delete from {{ this }}
+    where exists (
+        select 1
+        from {{ prune_log }}
+        where pruned_at > (select max(dbt_updated_at) from {{ this }})
+    )
+    {%- endif %}
+    {%- endif %}
+{%- endmacro %}
+
+
+{# Lay out staging tables on the mart join keys so DuckDB zonemaps can prune row groups.
+   Only a table build sorts the whole table; delete+insert would only sort each new batch. #}
+{% macro staging_sort(columns) -%}
+    {%- if config.get('materialized') == 'table' %}
+order by {{ columns | join(', ') }}
+    {%- endif %}
+{%- endmacro %}
@@ -0,0 +1,199 @@
+{{ config(
+    materialized='incremental',
+    unique_key='customer_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    pre_hook="{{ reset_if_staging_pruned() }}"
+) }}
+
+-- changed_customer_ids() refs the staging models only on incremental runs
+-- depends_on: {{ ref('stg_customers') }}
+-- depends_on: {{ ref('stg_medical_checkups') }}
+-- depends_on: {{ ref('stg_blood_pressure_readings') }}
+-- depends_on: {{ ref('stg_blood_sugar_readings') }}
+-- depends_on: {{ ref('stg_cholesterol_readings') }}
+-- depends_on: {{ ref('stg_sodium_readings') }}
+
+with
+{% if is_incremental() %}
+-- Only customers with rows loaded since the last build are recomputed
+changed_customers as (
+    {{ changed_customer_ids(load_id_watermark()) }}
+),
+{% endif %}
+
+-- Checkups are scanned once and shared by every measure below
+checkups as materialized (
+    select
+        customer_id,
+        checkup_id,
+        checkup_date,
+        bmi,
+        bmi_category,
+        health_risk_level
+    from {{ ref('stg_medical_checkups') }}
+    {{ incremental_customer_filter('customer_id') }}
+),
+
+-- Latest value per customer per measure, resolved with arg_max hash aggregates
+-- instead of a row_number() window per measure
+latest_checkups as (
+    select
+        customer_id,
+        arg_max(
+            {
+                'checkup_date': checkup_date,
+                'bmi': bmi,
+                'bmi_category': bmi_category,
+                'health_risk_level': health_risk_level
+            },
+            checkup_date
+        ) as checkup
+    from checkups
+    group by customer_id
+),
+
+latest_bp_readings as (
+    select
+        mc.customer_id,
+        arg_max(
+            {
+                'systolic_pressure': bp.systolic_pressure,
+                'diastolic_pressure': bp.diastolic_pressure,
+                'heart_rate': bp.heart_rate,
+                'bp_category': bp.bp_category,
+                'bp_risk_level': bp.bp_risk_level,
+                'heart_rate_category': bp.heart_rate_category,
+                'bp_cardiovascular_risk': bp.overall_cardiovascular_risk
+            },
+            row(mc.checkup_date, bp.reading_id)
+        ) as bp
+    from checkups mc
+    inner join {{ ref('stg_blood_pressure_readings') }} bp on mc.checkup_id = bp.checkup_id
+    group by mc.customer_id
+),
+
+latest_glucose_readings as (
+    select
+        mc.customer_id,
+        arg_max(
+            {
+                'glucose_level': bg.glucose_level,
+                'measurement_type': bg.measurement_type,
+                'glucose_category': bg.glucose_category,
+                'glucose_risk_level': bg.glucose_risk_level,
+                'glucose_normal_range': bg.is_normal_range,
+                'indicates_diabetes': bg.indicates_diabetes,
+                'indicates_prediabetes': bg.indicates_prediabetes
+            },
+            row(mc.checkup_date, bg.reading_id)
+        ) as gluc
+    from checkups mc
+    inner join {{ ref('stg_blood_sugar_readings') }} bg on mc.checkup_id = bg.checkup_id
+    group by mc.customer_id
+),
+
+latest_cholesterol_readings as (
+    select
+        mc.customer_id,
+        arg_max(
+            {
+                'total_cholesterol': chol.total_cholesterol,
+                'ldl_cholesterol': chol.ldl_cholesterol,
+                'hdl_cholesterol': chol.hdl_cholesterol,
+                'triglycerides': chol.triglycerides,
+                'total_cholesterol_category': chol.total_cholesterol_category,
+                'ldl_cholesterol_category': chol.ldl_cholesterol_category,
+                'hdl_cholesterol_category': chol.hdl_cholesterol_category,
+                'triglycerides_category': chol.triglycerides_category,
+                'cholesterol_cardiovascular_risk': chol.cardiovascular_risk_level,
+                'total_hdl_ratio': chol.total_hdl_ratio,
+                'treatment_recommendation': chol.treatment_recommendation
+            },
+            row(mc.checkup_date, chol.reading_id)
+        ) as chol
+    from checkups mc
+    inner join {{ ref('stg_cholesterol_readings') }} chol on mc.checkup_id = chol.checkup_id
+    group by mc.customer_id
+),
+
+latest_sodium_readings as (
+    select
+        mc.customer_id,
+        arg_max(
+            {
+                'sodium_level': sod.sodium_level,
+                'sodium_category': sod.sodium_category,
+                'severity_category': sod.severity_category,
+                'sodium_risk_level': sod.clinical_risk_level,
+                'sodium_normal_range': sod.is_normal_range,
+                'treatment_urgency': sod.treatment_urgency
+            },
+            row(mc.checkup_date, sod.reading_id)
+        ) as sod
+    from checkups mc
+    inner join {{ ref('stg_sodium_readings') }} sod on mc.checkup_id = sod.checkup_id
+    group by mc.customer_id
+),
+
+final as (
+    select
+        lc.customer_id,
+
+        -- Latest checkup data
+        lc.checkup.checkup_date as latest_checkup_date,
+        lc.checkup.bmi as bmi,
+        lc.checkup.bmi_category as bmi_category,
+        lc.checkup.health_risk_level as bmi_health_risk,
+
+        -- Blood pressure metrics
+        bp.bp.systolic_pressure as systolic_pressure,
+        bp.bp.diastolic_pressure as diastolic_pressure,
+        bp.bp.heart_rate as heart_rate,
+        bp.bp.bp_category as bp_category,
+        bp.bp.bp_risk_level as bp_risk_level,
+        bp.bp.heart_rate_category as heart_rate_category,
+        bp.bp.bp_cardiovascular_risk as bp_cardiovascular_risk,
+
+        -- Glucose metrics
+        gluc.gluc.glucose_level as glucose_level,
+        gluc.gluc.measurement_type as glucose_measurement_type,
+        gluc.gluc.glucose_category as glucose_category,
+        gluc.gluc.glucose_risk_level as glucose_risk_level,
+        gluc.gluc.glucose_normal_range as glucose_normal_range,
+        gluc.gluc.indicates_diabetes as indicates_diabetes,
+        gluc.gluc.indicates_prediabetes as indicates_prediabetes,
+
+        -- Cholesterol metrics
+        chol.chol.total_cholesterol as total_cholesterol,
+        chol.chol.ldl_cholesterol as ldl_cholesterol,
+        chol.chol.hdl_cholesterol as hdl_cholesterol,
+        chol.chol.triglycerides as triglycerides,
+        chol.chol.total_cholesterol_category as total_cholesterol_category,
+        chol.chol.ldl_cholesterol_category as ldl_cholesterol_category,
+        chol.chol.hdl_cholesterol_category as hdl_cholesterol_category,
+        chol.chol.triglycerides_category as triglycerides_category,
+        chol.chol.cholesterol_cardiovascular_risk as cholesterol_cardiovascular_risk,
+        chol.chol.total_hdl_ratio as total_hdl_ratio,
+        chol.chol.treatment_recommendation as treatment_recommendation,
+
+        -- Sodium metrics
+        sod.sod.sodium_level as sodium_level,
+        sod.sod.sodium_category as sodium_category,
+        sod.sod.severity_category as sodium_severity_category,
+        sod.sod.sodium_risk_level as sodium_risk_level,
+        sod.sod.sodium_normal_range as sodium_normal_range,
+        sod.sod.treatment_urgency as sodium_treatment_urgency,
+
+        -- Metadata
+        {{ staged_load_id(customer_staging_models()) }} as source_load_id,
+        current_timestamp as dbt_updated_at
+
+    from latest_checkups lc
+    left join latest_bp_readings bp on lc.customer_id = bp.customer_id
+    left join latest_glucose_readings gluc on lc.customer_id = gluc.customer_id
+    left join latest_cholesterol_readings chol on lc.customer_id = chol.customer_id
+    left join latest_sodium_readings sod on lc.customer_id = sod.customer_id
+)
+
+select * from final
@@ -0,0 +1,54 @@
+{{ config(
+    materialized='view'
+) }}
+
+-- One row per reading per measure with its clinical category. A view, so the
+-- incremental rollups push their _dlt_load_id and bucket filters into the
+-- staging tables instead of copying every reading once more.
+
+with checkups as (
+    select
+        checkup_id,
+        customer_id
+    from {{ ref('stg_medical_checkups') }}
+),
+
+measures as (
+    {%- set measures = [
+        ('stg_blood_pressure_readings', 'systolic_pressure', 'bp_category'),
+        ('stg_blood_pressure_readings', 'diastolic_pressure', 'bp_category'),
+        ('stg_blood_pressure_readings', 'heart_rate', 'heart_rate_category'),
+        ('stg_blood_sugar_readings', 'glucose_level', 'glucose_category'),
+        ('stg_cholesterol_readings', 'total_cholesterol', 'total_cholesterol_category'),
+        ('stg_cholesterol_readings', 'ldl_cholesterol', 'ldl_cholesterol_category'),
+        ('stg_cholesterol_readings', 'hdl_cholesterol', 'hdl_cholesterol_category'),
+        ('stg_cholesterol_readings', 'triglycerides', 'triglycerides_category'),
+        ('stg_sodium_readings', 'sodium_level', 'sodium_category')
+    ] %}
+    {%- for model_name, measure, category in measures %}
+    select
+        checkup_id,
+        reading_id,
+        '{{ measure }}' as measure,
+        measurement_time as measured_at,
+        cast({{ measure }} as double) as value,
+        {{ category }} as category,
+        _dlt_load_id
+    from {{ ref(model_name) }}
+    where {{ measure }} is not null
+      and measurement_time is not null
+    {% if not loop.last %}union all{% endif %}
+    {%- endfor %}
+)
+
+select
+    c.customer_id,
+    m.measure,
+    m.measured_at,
+    m.value,
+    m.category,
+    m.reading_id,
+    m.checkup_id,
+    m._dlt_load_id
+from measures m
+inner join checkups c on m.checkup_id = c.checkup_id
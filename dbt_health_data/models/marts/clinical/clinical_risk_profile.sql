@@ -1,82 +1,36 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='customer_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    pre_hook="{{ reset_if_staging_pruned() }}",
+    post_hook="create index if not exists clinical_risk_profile_customer_id on {{ this }} (customer_id)"
+) }}
 
-with customers_base as (
-    select * from {{ ref('dim_customers') }}
-),
-
-latest_checkups as (
-    select 
-        customer_id,
-        checkup_id,
-        checkup_date,
-        bmi,
-        bmi_category,
-        health_risk_level,
-        row_number() over (partition by customer_id order by checkup_date desc) as rn
-    from {{ ref('stg_medical_checkups') }}
-),
+-- changed_customer_ids() refs the staging models only on incremental runs
+-- depends_on: {{ ref('stg_customers') }}
+-- depends_on: {{ ref('stg_medical_checkups') }}
+-- depends_on: {{ ref('stg_blood_pressure_readings') }}
+-- depends_on: {{ ref('stg_blood_sugar_readings') }}
+-- depends_on: {{ ref('stg_cholesterol_readings') }}
+-- depends_on: {{ ref('stg_sodium_readings') }}
 
-latest_bp_readings as (
-    select 
-        mc.customer_id,
-        bp.systolic_pressure,
-        bp.diastolic_pressure,
-        bp.heart_rate,
-        bp.bp_category,
-        bp.bp_risk_level,
-        bp.heart_rate_category,
-        bp.overall_cardiovascular_risk as bp_cardiovascular_risk,
-        row_number() over (partition by mc.customer_id order by mc.checkup_date desc, bp.reading_id desc) as rn
-    from {{ ref('stg_medical_checkups') }} mc
-    inner join {{ ref('stg_blood_pressure_readings') }} bp on mc.checkup_id = bp.checkup_id
+with
+{% if is_incremental() %}
+-- Only customers with rows loaded since the last build are recomputed
+changed_customers as (
+    {{ changed_customer_ids(load_id_watermark()) }}
 ),
+{% endif %}
 
-latest_glucose_readings as (
-    select 
-        mc.customer_id,
-        bg.glucose_level,
-        bg.measurement_type,
-        bg.glucose_category,
-        bg.glucose_risk_level,
-        bg.is_normal_range as glucose_normal_range,
-        bg.indicates_diabetes,
-        bg.indicates_prediabetes,
-        row_number() over (partition by mc.customer_id order by mc.checkup_date desc, bg.reading_id desc) as rn
-    from {{ ref('stg_medical_checkups') }} mc
-    inner join {{ ref('stg_blood_sugar_readings') }} bg on mc.checkup_id = bg.checkup_id
-),
-
-latest_cholesterol_readings as (
-    select 
-        mc.customer_id,
-        chol.total_cholesterol,
-        chol.ldl_cholesterol,
-        chol.hdl_cholesterol,
-        chol.triglycerides,
-        chol.total_cholesterol_category,
-        chol.ldl_cholesterol_category,
-        chol.hdl_cholesterol_category,
-        chol.triglycerides_category,
-        chol.cardiovascular_risk_level as cholesterol_cardiovascular_risk,
-        chol.total_hdl_ratio,
-        chol.treatment_recommendation,
-        row_number() over (partition by mc.customer_id order by mc.checkup_date desc, chol.reading_id desc) as rn
-    from {{ ref('stg_medical_checkups') }} mc
-    inner join {{ ref('stg_cholesterol_readings') }} chol on mc.checkup_id = chol.checkup_id
+customers_base as (
+    select * from {{ ref('dim_customers') }}
+    {{ incremental_customer_filter('customer_id') }}
 ),
 
-latest_sodium_readings as (
-    select 
-        mc.customer_id,
-        sod.sodium_level,
-        sod.sodium_category,
-        sod.severity_category,
-        sod.clinical_risk_level as sodium_risk_level,
-        sod.is_normal_range as sodium_normal_range,
-        sod.treatment_urgency,
-        row_number() over (partition by mc.customer_id order by mc.checkup_date desc, sod.reading_id desc) as rn
-    from {{ ref('stg_medical_checkups') }} mc
-    inner join {{ ref('stg_sodium_readings') }} sod on mc.checkup_id = sod.checkup_id
+latest_readings as (
+    select * from {{ ref('int_customer_latest_readings') }}
+    {{ incremental_customer_filter('customer_id') }}
 ),
 
 risk_scoring as (
@@ -86,87 +40,97 @@ risk_scoring as (
         c.gender,
         
         -- Latest checkup data
-        lc.checkup_date as latest_checkup_date,
-        lc.bmi,
-        lc.bmi_category,
-        lc.health_risk_level as bmi_health_risk,
+        lr.latest_checkup_date,
+        lr.bmi,
+        lr.bmi_category,
+        lr.bmi_health_risk,
         
         -- Blood pressure metrics
-        bp.systolic_pressure,
-        bp.diastolic_pressure,
-        bp.heart_rate,
-        bp.bp_category,
-        bp.bp_risk_level,
-        bp.bp_cardiovascular_risk,
+        lr.systolic_pressure,
+        lr.diastolic_pressure,
+        lr.heart_rate,
+        lr.bp_category,
+        lr.bp_risk_level,
+        lr.bp_cardiovascular_risk,
         
         -- Glucose metrics
-        gluc.glucose_level,
-        gluc.measurement_type as glucose_measurement_type,
-        gluc.glucose_category,
-        gluc.glucose_risk_level,
-        gluc.indicates_diabetes,
-        gluc.indicates_prediabetes,
+        lr.glucose_level,
+        lr.glucose_measurement_type,
+        lr.glucose_category,
+        lr.glucose_risk_level,
+        lr.indicates_diabetes,
+        lr.indicates_prediabetes,
         
         -- Cholesterol metrics
-        chol.total_cholesterol,
-        chol.ldl_cholesterol,
-        chol.hdl_cholesterol,
-        chol.triglycerides,
-        chol.cholesterol_cardiovascular_risk,
-        chol.total_hdl_ratio,
-        chol.treatment_recommendation,
+        lr.total_cholesterol,
+        lr.ldl_cholesterol,
+        lr.hdl_cholesterol,
+        lr.triglycerides,
+        lr.cholesterol_cardiovascular_risk,
+        lr.total_hdl_ratio,
+        lr.treatment_recommendation,
         
         -- Sodium metrics
-        sod.sodium_level,
-        sod.sodium_category,
-        sod.sodium_risk_level,
+        lr.sodium_level,
+        lr.sodium_category,
+        lr.sodium_risk_level,
         
         -- Individual risk scores (0=low, 1=moderate, 2=high, 3=critical)
         case 
-            when lc.health_risk_level = 'Low' then 0
-            when lc.health_risk_level = 'Moderate' then 1
-            when lc.health_risk_level = 'High' then 2
+            when lr.bmi_health_risk = 'Low' then 0
+            when lr.bmi_health_risk = 'Moderate' then 1
+            when lr.bmi_health_risk = 'High' then 2
             else 0
         end as bmi_risk_score,
         
         case 
-            when bp.bp_risk_level in ('Low', 'Low-Moderate') then 0
-            when bp.bp_risk_level = 'Moderate' then 1
-            when bp.bp_risk_level = 'High' then 2
-            when bp.bp_risk_level = 'Critical' then 3
+            when lr.bp_risk_level in ('Low', 'Low-Moderate') then 0
+            when lr.bp_risk_level = 'Moderate' then 1
+            when lr.bp_risk_level = 'High' then 2
+            when lr.bp_risk_level = 'Critical' then 3
             else 0
         end as bp_risk_score,
         
         case 
-            when gluc.glucose_risk_level in ('Low', 'Normal') then 0
-            when gluc.glucose_risk_level = 'Moderate' then 1
-            when gluc.glucose_risk_level = 'High' then 2
-            when gluc.glucose_risk_level in ('Critical High', 'Critical Low') then 3
+            when lr.glucose_risk_level in ('Low', 'Normal') then 0
+            when lr.glucose_risk_level = 'Moderate' then 1
+            when lr.glucose_risk_level = 'High' then 2
+            when lr.glucose_risk_level in ('Critical High', 'Critical Low') then 3
             else 0
         end as glucose_risk_score,
         
         case 
-            when chol.cholesterol_cardiovascular_risk = 'Low' then 0
-            when chol.cholesterol_cardiovascular_risk = 'Moderate' then 1
-            when chol.cholesterol_cardiovascular_risk = 'High' then 2
-            when chol.cholesterol_cardiovascular_risk = 'Very High' then 3
+            when lr.cholesterol_cardiovascular_risk = 'Low' then 0
+            when lr.cholesterol_cardiovascular_risk = 'Moderate' then 1
+            when lr.cholesterol_cardiovascular_risk = 'High' then 2
+            when lr.cholesterol_cardiovascular_risk = 'Very High' then 3
             else 0
         end as cholesterol_risk_score,
         
         case 
-            when sod.sodium_risk_level = 'Low' then 0
-            when sod.sodium_risk_level = 'Moderate' then 1
-            when sod.sodium_risk_level = 'High' then 2
-            when sod.sodium_risk_level = 'Critical' then 3
+            when lr.sodium_risk_level = 'Low' then 0
+            when lr.sodium_risk_level = 'Moderate' then 1
+            when lr.sodium_risk_level = 'High' then 2
+            when lr.sodium_risk_level = 'Critical' then 3
             else 0
         end as sodium_risk_score
         
     from customers_base c
-    left join latest_checkups lc on c.customer_id = lc.customer_id and lc.rn = 1
-    left join latest_bp_readings bp on c.customer_id = bp.customer_id and bp.rn = 1
-    left join latest_glucose_readings gluc on c.customer_id = gluc.customer_id and gluc.rn = 1
-    left join latest_cholesterol_readings chol on c.customer_id = chol.customer_id and chol.rn = 1
-    left join latest_sodium_readings sod on c.customer_id = sod.customer_id and sod.rn = 1
+    left join latest_readings lr on c.customer_id = lr.customer_id
+),
+
+-- Composite risk score (weighted average), computed once
+scored as (
+    select
+        *,
+        round(
+            (bmi_risk_score * 0.15 + 
+             bp_risk_score * 0.25 + 
+             glucose_risk_score * 0.25 + 
+             cholesterol_risk_score * 0.25 + 
+             sodium_risk_score * 0.10), 2
+        ) as composite_risk_score
+    from risk_scoring
 ),
 
 final as (
@@ -218,37 +182,13 @@ final as (
         sodium_risk_score,
         
         -- Composite risk score (weighted average)
-        round(
-            (bmi_risk_score * 0.15 + 
-             bp_risk_score * 0.25 + 
-             glucose_risk_score * 0.25 + 
-             cholesterol_risk_score * 0.25 + 
-             sodium_risk_score * 0.10), 2
-        ) as composite_risk_score,
+        composite_risk_score,
         
         -- Overall risk category
         case 
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) < 0.5 then 'Low Risk'
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) < 1.5 then 'Moderate Risk'
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) < 2.5 then 'High Risk'
+            when composite_risk_score < 0.5 then 'Low Risk'
+            when composite_risk_score < 1.5 then 'Moderate Risk'
+            when composite_risk_score < 2.5 then 'High Risk'
             else 'Critical Risk'
         end as overall_risk_category,
         
@@ -265,34 +205,21 @@ final as (
         
         -- Care priority
         case
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) >= 2.5 then 'Immediate Care'
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) >= 1.5 then 'Priority Care'
-            when round(
-                (bmi_risk_score * 0.15 + 
-                 bp_risk_score * 0.25 + 
-                 glucose_risk_score * 0.25 + 
-                 cholesterol_risk_score * 0.25 + 
-                 sodium_risk_score * 0.10), 2
-            ) >= 0.5 then 'Standard Care'
+            when composite_risk_score >= 2.5 then 'Immediate Care'
+            when composite_risk_score >= 1.5 then 'Priority Care'
+            when composite_risk_score >= 0.5 then 'Standard Care'
             else 'Routine Care'
         end as care_priority,
         
         -- Metadata
+        -- Built from both upstream models, so only as current as the older of the two
+        least(
+            (select max(source_load_id) from {{ ref('dim_customers') }}),
+            (select max(source_load_id) from {{ ref('int_customer_latest_readings') }})
+        ) as source_load_id,
         current_timestamp as dbt_updated_at
         
-    from risk_scoring
+    from scored
 )
 
 select * from final
\ No newline at end of file
@@ -1,7 +1,30 @@
-{{ config(materialized='table') }}
+{{ config(
+    materialized='incremental',
+    unique_key='customer_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    pre_hook="{{ reset_if_staging_pruned() }}"
+) }}
 
-with customers_base as (
+-- changed_customer_ids() refs the staging models only on incremental runs
+-- depends_on: {{ ref('stg_customers') }}
+-- depends_on: {{ ref('stg_medical_checkups') }}
+-- depends_on: {{ ref('stg_blood_pressure_readings') }}
+-- depends_on: {{ ref('stg_blood_sugar_readings') }}
+-- depends_on: {{ ref('stg_cholesterol_readings') }}
+-- depends_on: {{ ref('stg_sodium_readings') }}
+
+with
+{% if is_incremental() %}
+-- Only customers with rows loaded since the last build are recomputed
+changed_customers as (
+    {{ changed_customer_ids(load_id_watermark()) }}
+),
+{% endif %}
+
+customers_base as (
     select * from {{ ref('stg_customers') }}
+    {{ incremental_customer_filter('customer_id') }}
 ),
 
 checkup_metrics as (
@@ -13,6 +36,7 @@ checkup_metrics as (
         avg(bmi) as avg_bmi,
         max(case when health_risk_level = 'High' then 1 else 0 end) as has_high_health_risk
     from {{ ref('stg_medical_checkups') }}
+    {{ incremental_customer_filter('customer_id') }}
     group by customer_id
 ),
 
@@ -23,6 +47,7 @@ bp_risk_flags as (
         max(case when bp.overall_cardiovascular_risk in ('High', 'Critical') then 1 else 0 end) as has_high_cardiovascular_risk
     from {{ ref('stg_medical_checkups') }} mc
     left join {{ ref('stg_blood_pressure_readings') }} bp on mc.checkup_id = bp.checkup_id
+    {{ incremental_customer_filter('mc.customer_id') }}
     group by mc.customer_id
 ),
 
@@ -33,6 +58,7 @@ glucose_risk_flags as (
         max(case when bg.indicates_prediabetes = true then 1 else 0 end) as has_prediabetes_indicators
     from {{ ref('stg_medical_checkups') }} mc
     left join {{ ref('stg_blood_sugar_readings') }} bg on mc.checkup_id = bg.checkup_id
+    {{ incremental_customer_filter('mc.customer_id') }}
     group by mc.customer_id
 ),
 
@@ -42,6 +68,7 @@ cholesterol_risk_flags as (
         max(case when chol.cardiovascular_risk_level in ('High', 'Very High') then 1 else 0 end) as has_high_cholesterol_risk
     from {{ ref('stg_medical_checkups') }} mc
     left join {{ ref('stg_cholesterol_readings') }} chol on mc.checkup_id = chol.checkup_id
+    {{ incremental_customer_filter('mc.customer_id') }}
     group by mc.customer_id
 ),
 
@@ -127,6 +154,7 @@ final as (
         
         -- Metadata
         c.created_at as customer_created_at,
+        {{ staged_load_id(customer_staging_models()) }} as source_load_id,
         current_timestamp as dbt_updated_at
         
     from customers_base c
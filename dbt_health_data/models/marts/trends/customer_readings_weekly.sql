@@ -0,0 +1,9 @@
+{{ config(
+    materialized='incremental',
+    unique_key=['customer_id', 'measure', 'bucket_start'],
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    pre_hook="{{ reset_if_staging_pruned() }}"
+) }}
+
+{{ readings_rollup('week') }}
@@ -1,7 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized=staging_materialization('stg_cholesterol_readings'),
+    unique_key='reading_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    post_hook="{{ staging_prune_stale('cholesterol_readings', 'reading_id') }}"
+) }}
 
 with source_data as (
     select * from {{ source('raw', 'cholesterol_readings') }}
+    {{ staging_incremental_filter() }}
 ),
 
 transformed as (
@@ -118,6 +125,7 @@ transformed as (
         
         -- Metadata
         created_at,
+        _dlt_load_id,
         current_timestamp as dbt_updated_at
         
     from source_data
@@ -127,4 +135,5 @@ transformed as (
       and triglycerides is not null
 )
 
-select * from transformed
\ No newline at end of file
+select * from transformed
+{{ staging_sort(['checkup_id', 'reading_id']) }}
\ No newline at end of file
@@ -1,7 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized=staging_materialization('stg_customers'),
+    unique_key='customer_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    post_hook="{{ staging_prune_stale('customers', 'customer_id') }}"
+) }}
 
 with source_data as (
     select * from {{ source('raw', 'customers') }}
+    {{ staging_incremental_filter() }}
 ),
 
 transformed as (
@@ -30,9 +37,11 @@ transformed as (
         -- Metadata
         created_at,
         updated_at,
+        _dlt_load_id,
         current_timestamp as dbt_updated_at
         
     from source_data
 )
 
-select * from transformed
\ No newline at end of file
+select * from transformed
+{{ staging_sort(['customer_id']) }}
\ No newline at end of file
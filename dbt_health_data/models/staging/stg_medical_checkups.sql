@@ -1,7 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized=staging_materialization('stg_medical_checkups'),
+    unique_key='checkup_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    post_hook="{{ staging_prune_stale('medical_checkups', 'checkup_id') }}"
+) }}
 
 with source_data as (
     select * from {{ source('raw', 'medical_checkups') }}
+    {{ staging_incremental_filter() }}
 ),
 
 transformed as (
@@ -46,10 +53,12 @@ transformed as (
         
         -- Metadata
         created_at,
+        _dlt_load_id,
         current_timestamp as dbt_updated_at
         
     from source_data
     where height_cm > 0 and weight_kg > 0  -- Data quality filter
 )
 
-select * from transformed
\ No newline at end of file
+select * from transformed
+{{ staging_sort(['customer_id', 'checkup_id']) }}
\ No newline at end of file
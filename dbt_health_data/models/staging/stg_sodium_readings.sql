@@ -1,7 +1,14 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized=staging_materialization('stg_sodium_readings'),
+    unique_key='reading_id',
+    incremental_strategy='delete+insert',
+    on_schema_change='append_new_columns',
+    post_hook="{{ staging_prune_stale('sodium_readings', 'reading_id') }}"
+) }}
 
 with source_data as (
     select * from {{ source('raw', 'sodium_readings') }}
+    {{ staging_incremental_filter() }}
 ),
 
 transformed as (
@@ -105,10 +112,12 @@ transformed as (
         
         -- Metadata
         created_at,
+        _dlt_load_id,
         current_timestamp as dbt_updated_at
         
     from source_data
     where sodium_level is not null
 )
 
-select * from transformed
\ No newline at end of file
+select * from transformed
+{{ staging_sort(['checkup_id', 'reading_id']) }}
\ No newline at end of file
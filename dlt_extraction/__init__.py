@@ -1,18 +1,52 @@
 """dlt-based data extraction for health tracking system."""
 
-from .health_data_pipeline import (
-    HealthDataPipeline,
-    run_full_extraction,
-    export_to_files
-)
-from .postgres_source import postgres_health_data
-from .pipeline_config import PipelineConfig, get_default_config
-
-__all__ = [
-    'HealthDataPipeline',
-    'run_full_extraction',
-    'export_to_files',
-    'postgres_health_data',
-    'PipelineConfig',
-    'get_default_config'
-]
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names and the submodule each one lives in. They are imported on first
+# access, so `from dlt_extraction import PipelineConfig` does not load dlt,
+# SQLAlchemy or pandas.
+_EXPORTS = {
+    'HealthDataPipeline': 'health_data_pipeline',
+    'run_full_extraction': 'health_data_pipeline',
+    'run_extract_and_transform': 'health_data_pipeline',
+    'export_to_files': 'health_data_pipeline',
+    'compare_extraction_modes': 'health_data_pipeline',
+    'compare_backends': 'health_data_pipeline',
+    'postgres_health_data': 'postgres_source',
+    'PipelineConfig': 'pipeline_config',
+    'get_default_config': 'pipeline_config',
+    'TableFilter': 'query_filters',
+    'TableOrdering': 'query_filters',
+    'ParquetLake': 'parquet_lake'
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .health_data_pipeline import (
+        HealthDataPipeline,
+        run_full_extraction,
+        run_extract_and_transform,
+        export_to_files,
+        compare_extraction_modes,
+        compare_backends
+    )
+    from .postgres_source import postgres_health_data
+    from .pipeline_config import PipelineConfig, get_default_config
+    from .query_filters import TableFilter, TableOrdering
+    from .parquet_lake import ParquetLake
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups skip __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,163 @@
+"""Duplicate guard for append-only tables re-read inside the incremental lag window."""
+
+import math
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+import dlt
+
+
+class LagWindowDedup:
+    """
+    Drop rows whose key was already appended in an earlier run's lag window.
+
+    With an incremental lag every run re-reads the rows from the last
+    window_seconds before the stored high-water mark. Merge deduplicates them
+    at load time; an append-only table needs this guard instead. The keys of
+    rows inside the window are kept in the resource state together with the
+    highest cursor value seen, so the state only ever holds one window of keys.
+
+    Keys are integer primary keys assigned from a sequence, so the state keeps
+    them as sorted runs of consecutive keys, [first, last, newest cursor],
+    rather than one entry per key: a window of a busy table serializes as a
+    handful of runs. A run leaves the state once its newest cursor falls out
+    of the window.
+
+    Used with DltResource.add_yield_map, which passes dict rows one by one and
+    Arrow tables and pandas DataFrames whole. Each is yielded as the type it
+    came in.
+    """
+
+    STATE_KEY = 'lag_window_runs'
+
+    def __init__(self, table_name: str, key_column: str, cursor_column: str, window_seconds: float):
+        self.table_name = table_name
+        self.key_column = key_column
+        self.cursor_column = cursor_column
+        self.window_seconds = window_seconds
+        self._state: Optional[Dict[str, Any]] = None
+
+    def __call__(self, item) -> Iterator[Any]:
+        state = self._load_state()
+        if isinstance(item, dict):
+            key = int(item[self.key_column])
+            if _run_index(state['runs'], key) is not None:
+                return
+            cursor = _epoch_seconds(item[self.cursor_column])
+            if state['max_cursor'] is None or cursor > state['max_cursor']:
+                state['max_cursor'] = cursor
+            # Rows older than the window behind the highest cursor so far are never re-read
+            if cursor >= state['max_cursor'] - self.window_seconds:
+                _add_run(state['runs'], key, key, cursor)
+            yield item
+            return
+
+        if _is_dataframe(item):
+            import pyarrow as pa
+
+            # Only the key and cursor columns are converted; the rows are filtered in pandas
+            columns = pa.Table.from_pandas(item[[self.key_column, self.cursor_column]], preserve_index=False)
+            keep = self._keep_mask(state, columns)
+            if keep.any():
+                yield item if keep.all() else item[keep]
+            return
+
+        keep = self._keep_mask(state, item)
+        if keep.any():
+            import pyarrow as pa
+
+            yield item if keep.all() else item.filter(pa.array(keep))
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self._state is None:
+            resource_state = dlt.current.resource_state(self.table_name)
+            # Drop the per-key state written by earlier versions of the guard
+            resource_state.pop('lag_window_keys', None)
+            state = resource_state.setdefault(self.STATE_KEY, {'max_cursor': None, 'runs': []})
+            # Forget runs that fell out of the window since the last run
+            if state['max_cursor'] is not None:
+                cutoff = state['max_cursor'] - self.window_seconds
+                state['runs'] = [run for run in state['runs'] if run[2] >= cutoff]
+            self._state = state
+        return self._state
+
+    def _keep_mask(self, state: Dict[str, Any], table):
+        """Boolean array of the rows of an Arrow table not appended before, recording their keys."""
+        import numpy as np
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        keys = table.column(self.key_column).cast(pa.int64()).to_numpy()
+        keep = np.ones(len(keys), dtype=bool)
+        runs = state['runs']
+        if runs:
+            firsts = np.fromiter((run[0] for run in runs), dtype=np.int64, count=len(runs))
+            lasts = np.fromiter((run[1] for run in runs), dtype=np.int64, count=len(runs))
+            index = np.searchsorted(firsts, keys, side='right') - 1
+            keep = ~((index >= 0) & (lasts[np.maximum(index, 0)] >= keys))
+        if not keep.any():
+            return keep
+
+        cursor = table.column(self.cursor_column)
+        epochs = pc.divide(
+            pc.cast(pc.cast(cursor, pa.timestamp("us", tz=cursor.type.tz)), pa.int64()).cast(pa.float64()),
+            1_000_000
+        ).to_numpy()[keep]
+        keys = keys[keep]
+        high = float(epochs.max())
+        if state['max_cursor'] is None or high > state['max_cursor']:
+            state['max_cursor'] = high
+        in_window = epochs >= state['max_cursor'] - self.window_seconds
+        window_keys = keys[in_window]
+        if not len(window_keys):
+            return keep
+
+        # Collapse the chunk's window keys into runs before merging them into the state
+        order = np.argsort(window_keys, kind='stable')
+        window_keys = window_keys[order]
+        window_epochs = epochs[in_window][order]
+        breaks = np.flatnonzero(np.diff(window_keys) > 1) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(window_keys)])) - 1
+        newest = np.maximum.reduceat(window_epochs, starts)
+        for first, last, seen_at in zip(window_keys[starts], window_keys[ends], newest):
+            _add_run(runs, int(first), int(last), float(seen_at))
+        return keep
+
+
+def _run_index(runs: List[List[Any]], key: int) -> Optional[int]:
+    """Index of the run holding key, or None."""
+    index = bisect_right(runs, [key, math.inf, math.inf]) - 1
+    if index >= 0 and runs[index][1] >= key:
+        return index
+    return None
+
+
+def _add_run(runs: List[List[Any]], first: int, last: int, seen_at: float):
+    """Insert [first, last] into the sorted runs, merging runs that touch or overlap."""
+    index = bisect_right(runs, [first, math.inf, math.inf])
+    if index > 0 and runs[index - 1][1] >= first - 1:
+        index -= 1
+        run = runs[index]
+        run[1] = max(run[1], last)
+        run[2] = max(run[2], seen_at)
+    else:
+        run = [first, last, seen_at]
+        runs.insert(index, run)
+    while index + 1 < len(runs) and runs[index + 1][0] <= run[1] + 1:
+        following = runs.pop(index + 1)
+        run[1] = max(run[1], following[1])
+        run[2] = max(run[2], following[2])
+
+
+def _is_dataframe(item) -> bool:
+    # pandas is only imported by its backend, so check the type without importing it
+    return type(item).__name__ == "DataFrame" and type(item).__module__.startswith("pandas")
+
+
+def _epoch_seconds(value: datetime) -> float:
+    # Naive timestamps are read as UTC, matching how Arrow stores them
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
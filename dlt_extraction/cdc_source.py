@@ -0,0 +1,232 @@
+"""Log-based change data capture for the health tables via PostgreSQL logical replication."""
+
+import json
+import select
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional
+
+import dlt
+from dlt.sources import DltResource
+
+from config.database import DatabaseConfig
+
+
+# Columns added to every replicated row. dlt's merge keeps the change with the
+# highest _cdc_lsn per primary key and deletes rows whose latest change is a delete.
+CDC_COLUMNS = [
+    {'name': '_cdc_lsn', 'data_type': 'bigint', 'dedup_sort': 'desc'},
+    {'name': '_cdc_deleted', 'data_type': 'bool', 'hard_delete': True}
+]
+
+OUTPUT_PLUGIN = "wal2json"
+
+
+def setup_replication(database_config: DatabaseConfig, table_names: List[str],
+                      slot_name: str = "health_data_cdc") -> bool:
+    """
+    Prepare the source database for CDC: full replica identity and a wal2json slot.
+
+    REPLICA IDENTITY FULL makes deletes carry the whole old row, so the delete
+    can be staged against raw tables whose columns are NOT NULL. Create the
+    slot before the initial full extraction; changes made during that load are
+    replayed afterwards and merged idempotently.
+
+    Args:
+        database_config: Database configuration object
+        table_names: Tables to capture
+        slot_name: Logical replication slot to create
+
+    Returns:
+        True if the slot was created, False if it already existed
+    """
+    import psycopg2
+
+    connection = psycopg2.connect(database_config.connection_string())
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            for table_name in table_names:
+                cursor.execute(f'ALTER TABLE public."{table_name}" REPLICA IDENTITY FULL')
+            cursor.execute("SELECT 1 FROM pg_replication_slots WHERE slot_name = %s", (slot_name,))
+            if cursor.fetchone():
+                return False
+            cursor.execute("SELECT pg_create_logical_replication_slot(%s, %s)", (slot_name, OUTPUT_PLUGIN))
+            print(f"Created replication slot {slot_name} ({OUTPUT_PLUGIN})")
+            return True
+    finally:
+        connection.close()
+
+
+def drop_replication(database_config: DatabaseConfig, slot_name: str = "health_data_cdc"):
+    """Drop the replication slot so the server can discard the WAL it retains."""
+    import psycopg2
+
+    connection = psycopg2.connect(database_config.connection_string())
+    connection.autocommit = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_drop_replication_slot(slot_name) FROM pg_replication_slots WHERE slot_name = %s",
+                (slot_name,)
+            )
+    finally:
+        connection.close()
+
+
+def cdc_changes(
+        database_config: DatabaseConfig,
+        primary_keys: Dict[str, str],
+        slot_name: str = "health_data_cdc",
+        batch_size: int = 10000,
+        max_batch_seconds: float = 30,
+        idle_timeout_seconds: float = 2
+) -> DltResource:
+    """
+    Build a resource that drains one micro-batch of changes from a replication slot.
+
+    Changes are decoded by wal2json (format-version 2) and routed to one raw
+    table per source table. A batch always ends on a transaction commit and
+    stops after batch_size changes, max_batch_seconds, or once the stream has
+    been idle for idle_timeout_seconds.
+
+    The commit LSN of the last batch is kept in the resource state, and the
+    server is only told to release WAL up to the LSN stored by the previous,
+    completed run. A crash therefore replays changes instead of losing them,
+    and the merge on primary key makes the replay harmless.
+
+    Args:
+        database_config: Database configuration object
+        primary_keys: Primary key column per captured table
+        slot_name: Logical replication slot created by setup_replication
+        batch_size: Changes after which the batch ends at the next commit
+        max_batch_seconds: Upper bound on the time spent reading one batch
+        idle_timeout_seconds: Stream idle time that ends the batch
+
+    Returns:
+        dlt resource named postgres_cdc
+    """
+
+    @dlt.resource(name="postgres_cdc")
+    def read_changes() -> Iterator[Any]:
+        import psycopg2
+        from psycopg2.extras import LogicalReplicationConnection
+
+        state = dlt.current.resource_state()
+        confirmed_lsn = state.get('lsn', 0)
+
+        connection = psycopg2.connect(
+            database_config.connection_string(),
+            connection_factory=LogicalReplicationConnection
+        )
+        try:
+            cursor = connection.cursor()
+            cursor.start_replication(
+                slot_name=slot_name,
+                decode=True,
+                start_lsn=confirmed_lsn,
+                options={
+                    'format-version': '2',
+                    'include-types': '1',
+                    'include-transaction': '1',
+                    'add-tables': ",".join(f"public.{table_name}" for table_name in primary_keys)
+                }
+            )
+            # Everything up to the stored LSN has been loaded by an earlier run
+            if confirmed_lsn:
+                cursor.send_feedback(flush_lsn=confirmed_lsn, reply=True)
+
+            batch, commit_lsn, changes = _read_batch(
+                cursor, confirmed_lsn, batch_size, max_batch_seconds, idle_timeout_seconds
+            )
+        finally:
+            connection.close()
+
+        print(f"CDC: {changes} changes from slot {slot_name} up to LSN {_format_lsn(commit_lsn)}")
+        for table_name, rows in batch.items():
+            yield dlt.mark.with_hints(
+                rows,
+                dlt.mark.make_hints(
+                    table_name=table_name,
+                    primary_key=primary_keys[table_name],
+                    write_disposition={'disposition': 'merge', 'strategy': 'delete-insert'},
+                    columns=CDC_COLUMNS
+                ),
+                create_table_variant=True
+            )
+        if commit_lsn > confirmed_lsn:
+            state['lsn'] = commit_lsn
+
+    return read_changes
+
+
+def _read_batch(cursor, confirmed_lsn: int, batch_size: int,
+                max_batch_seconds: float, idle_timeout_seconds: float):
+    """Read whole transactions until the batch is full, the time is up or the stream is idle."""
+    batch: Dict[str, List[Dict[str, Any]]] = {}
+    transaction: List[Dict[str, Any]] = []
+    commit_lsn = confirmed_lsn
+    changes = 0
+    in_transaction = False
+    deadline = time.monotonic() + max_batch_seconds
+
+    while True:
+        message = cursor.read_message()
+        if message is None:
+            # Never cut a transaction in half; keep waiting for its commit
+            if not in_transaction and (changes >= batch_size or time.monotonic() >= deadline):
+                break
+            timeout = idle_timeout_seconds if not in_transaction else max(idle_timeout_seconds, 1.0)
+            if not select.select([cursor], [], [], timeout)[0] and not in_transaction:
+                break
+            continue
+
+        change = json.loads(message.payload, parse_float=Decimal)
+        action = change['action']
+        if action == 'B':
+            in_transaction = True
+            transaction = []
+        elif action == 'C':
+            in_transaction = False
+            # Transactions at or before the stored LSN were already loaded
+            if message.data_start > confirmed_lsn:
+                for table_name, row in transaction:
+                    batch.setdefault(table_name, []).append(row)
+                changes += len(transaction)
+                commit_lsn = max(commit_lsn, message.data_start)
+            transaction = []
+            if changes >= batch_size or time.monotonic() >= deadline:
+                break
+        elif action in ('I', 'U', 'D'):
+            transaction.append((change['table'], _change_to_row(change, message.data_start)))
+        elif action == 'T':
+            print(f"CDC: ignoring TRUNCATE of {change.get('table')}; run a full refresh of that table")
+
+    return batch, commit_lsn, changes
+
+
+def _change_to_row(change: Dict[str, Any], lsn: int) -> Dict[str, Any]:
+    """Turn a wal2json v2 change into a row with the CDC columns set."""
+    # Inserts and updates carry the new row, deletes the old one (REPLICA IDENTITY FULL)
+    columns = change['identity'] if change['action'] == 'D' else change['columns']
+    row = {column['name']: _coerce(column['value'], column['type']) for column in columns}
+    row['_cdc_lsn'] = lsn
+    row['_cdc_deleted'] = change['action'] == 'D'
+    return row
+
+
+def _coerce(value: Any, pg_type: str) -> Any:
+    """Parse the text values wal2json emits for date and timestamp columns."""
+    if value is None:
+        return None
+    if pg_type.startswith('timestamp'):
+        return datetime.fromisoformat(value)
+    if pg_type == 'date':
+        return date.fromisoformat(value)
+    return value
+
+
+def _format_lsn(lsn: Optional[int]) -> str:
+    lsn = lsn or 0
+    return f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}"
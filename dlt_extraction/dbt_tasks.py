@@ -0,0 +1,177 @@
+"""Run dbt models and source tests in-process against the extracted raw dataset."""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+DBT_PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dbt_health_data"
+)
+
+DQ_SCOPES = ("recent", "full")
+
+
+def run_source_tests(duckdb_path: str, scope: str = "recent", recent_loads: int = 1,
+                     select: str = "source:raw") -> Dict[str, Any]:
+    """
+    Run the dbt tests on the raw sources and summarize the results.
+
+    With the recent scope each test reads only the rows of the last
+    recent_loads completed dlt loads (see macros/data_quality.sql); the full
+    scope sweeps the whole tables. The DuckDB file must not be open in
+    read-write mode by this process, since dbt opens it itself.
+
+    Args:
+        duckdb_path: DuckDB file holding the raw dataset
+        scope: recent or full
+        recent_loads: Number of most recent loads tested with the recent scope
+        select: dbt node selection
+
+    Returns:
+        Dictionary with the scope, wall clock seconds, counts per test
+        status and the failing tests with their failure counts
+    """
+    if scope not in DQ_SCOPES:
+        raise ValueError(f"Unsupported data quality scope: {scope}")
+    summary = _invoke(duckdb_path, [
+        "test", "--select", select,
+        "--vars", json.dumps({'dq_scope': scope, 'dq_recent_loads': recent_loads})
+    ])
+    return {
+        'scope': scope,
+        'recent_loads': recent_loads if scope == "recent" else None,
+        'seconds': summary['seconds'],
+        'tests': summary['nodes'],
+        'statuses': summary['statuses'],
+        'failures': summary['failures']
+    }
+
+
+def changed_source_selectors(row_counts: Dict[str, int], source_tables: Iterable[str]) -> List[str]:
+    """
+    dbt selectors for the models downstream of raw tables that received rows.
+
+    Args:
+        row_counts: Rows loaded per table in a run
+        source_tables: Raw tables declared as dbt sources; other tables in
+            row_counts (quarantine and dlt tables) are ignored
+
+    Returns:
+        Selectors such as source:raw.sodium_readings+, empty when no source changed
+    """
+    return [
+        f"source:raw.{table_name}+"
+        for table_name in sorted(source_tables)
+        if row_counts.get(table_name, 0) > 0
+    ]
+
+
+def run_models(duckdb_path: str, selectors: List[str], full_refresh: bool = False) -> Dict[str, Any]:
+    """
+    Build the selected dbt models in this process.
+
+    Args:
+        duckdb_path: DuckDB file holding the raw dataset, not open in this
+            process or any other
+        selectors: dbt node selectors
+        full_refresh: Rebuild incremental models from scratch
+
+    Returns:
+        Dictionary with the selectors, wall clock seconds, counts per model
+        status and the models that did not succeed
+    """
+    args = ["run", "--select", *selectors]
+    if full_refresh:
+        args.append("--full-refresh")
+    summary = _invoke(duckdb_path, args)
+    return {
+        'selectors': selectors,
+        'seconds': summary['seconds'],
+        'models': summary['nodes'],
+        'statuses': summary['statuses'],
+        'failures': summary['failures']
+    }
+
+
+def failed_selectors(dbt_result: Optional[Dict[str, Any]]) -> List[str]:
+    """
+    Selectors for the models a dbt run did not build.
+
+    Args:
+        dbt_result: run_models summary, or None when dbt was skipped
+
+    Returns:
+        The failed models and the models skipped after them, empty when the
+        run succeeded or was skipped
+    """
+    if dbt_result is None:
+        return []
+    return sorted({failure['node'] for failure in dbt_result['failures']})
+
+
+def _invoke(duckdb_path: str, args: List[str]) -> Dict[str, Any]:
+    """Run one dbt command against duckdb_path and summarize its node results."""
+    from dbt.cli.main import dbtRunner
+
+    os.environ["HEALTH_DATA_DUCKDB_PATH"] = os.path.abspath(duckdb_path)
+    started = time.perf_counter()
+    try:
+        result = dbtRunner().invoke(args + [
+            "--project-dir", DBT_PROJECT_DIR,
+            "--profiles-dir", DBT_PROJECT_DIR
+        ])
+    finally:
+        _close_dbt_connections()
+    seconds = time.perf_counter() - started
+    if result.exception is not None:
+        raise RuntimeError(f"dbt {args[0]} failed to run: {result.exception}")
+
+    statuses: Dict[str, int] = {}
+    failures = []
+    for node_result in result.result.results:
+        status = str(node_result.status)
+        statuses[status] = statuses.get(status, 0) + 1
+        if status not in ("pass", "success"):
+            failures.append({
+                'node': node_result.node.name,
+                'status': status,
+                'failures': node_result.failures,
+                'message': node_result.message
+            })
+    return {'seconds': seconds, 'nodes': sum(statuses.values()), 'statuses': statuses, 'failures': failures}
+
+
+def _close_dbt_connections():
+    """
+    Drop the DuckDB handle dbt-duckdb keeps for the process.
+
+    dbt-duckdb keeps one environment, and with it the database, open for the
+    life of the process. Closing it lets the pipeline reopen the file with its
+    own settings once dbt is done; the next invocation creates a new one.
+    """
+    from dbt.adapters.duckdb.connections import DuckDBConnectionManager
+
+    with DuckDBConnectionManager._LOCK:
+        if DuckDBConnectionManager._ENV is not None:
+            DuckDBConnectionManager._ENV.close()
+            DuckDBConnectionManager._ENV = None
+
+
+def full_sweep_due(stamp_path: str, interval_hours: float) -> bool:
+    """Whether the last full sweep recorded in stamp_path is older than the interval."""
+    if interval_hours <= 0:
+        return False
+    try:
+        last_sweep: Optional[float] = os.path.getmtime(stamp_path)
+    except OSError:
+        return True
+    return time.time() - last_sweep >= interval_hours * 3600
+
+
+def record_full_sweep(stamp_path: str):
+    """Mark a completed full sweep by touching stamp_path."""
+    os.makedirs(os.path.dirname(stamp_path) or ".", exist_ok=True)
+    with open(stamp_path, "a"):
+        pass
+    os.utime(stamp_path)
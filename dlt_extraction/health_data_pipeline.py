@@ -1,35 +1,64 @@
 """Main pipeline orchestration for health data extraction using dlt."""
 
-import dlt
-import pandas as pd
-from typing import Dict, Any, Optional
+import os
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 
 from config.database import DatabaseConfig
-from .postgres_source import postgres_health_data
 from .pipeline_config import PipelineConfig, get_default_config
+from .metrics import (
+    PostgresQueryTimer, RssSampler, RunMetrics, peak_rss_bytes, profile_stage,
+    write_jsonl, write_prometheus_textfile
+)
+from .dbt_tasks import (
+    changed_source_selectors, full_sweep_due, record_full_sweep, run_models, run_source_tests
+)
+from .parquet_lake import ParquetLake, remove_lake
+from .query_filters import TableFilter, quote_identifier
+
+# dlt, the sql_database source and pandas are imported where they are first
+# needed, so importing this module (or dlt_extraction) stays cheap
+if TYPE_CHECKING:
+    import dlt
+    import pandas as pd
 
 
 class HealthDataPipeline:
     """Main pipeline class for health data extraction and loading."""
     
-    def __init__(self, config: Optional[PipelineConfig] = None):
+    def __init__(self, config: Optional[PipelineConfig] = None,
+                 database_config: Optional[DatabaseConfig] = None):
         """
         Initialize the pipeline.
         
         Args:
             config: Pipeline configuration. If None, uses default config.
+            database_config: Source database settings. If None, reads .env.local.
         """
         self.config = config or get_default_config()
-        self.database_config = DatabaseConfig()
+        self.database_config = database_config or DatabaseConfig()
         self.pipeline = None
+        self.engine = None
+        self.query_timer = None
+        self.duckdb_connection = None
         
-    def create_pipeline(self) -> dlt.Pipeline:
+    def create_pipeline(self) -> 'dlt.Pipeline':
         """Create and configure the dlt pipeline."""
         if self.pipeline is None:
+            import dlt
+            
             # Create destination with explicit configuration
             if self.config.destination == "duckdb" and self.config.destination_config:
+                # Share one DuckDB connection between loading and reads
                 destination = dlt.destinations.duckdb(
-                    credentials=self.config.destination_config["credentials"]
+                    credentials=self.get_duckdb_connection()
+                )
+            elif self.config.destination == "filesystem" and self.config.destination_config:
+                destination = dlt.destinations.filesystem(
+                    bucket_url=self.config.destination_config["bucket_url"],
+                    layout=self.config.destination_config["layout"]
                 )
             else:
                 destination = self.config.destination
@@ -41,191 +70,568 @@ class HealthDataPipeline:
             )
         return self.pipeline
     
-    def run_extraction(self, show_progress: bool = True) -> Dict[str, Any]:
+    def get_engine(self):
+        """Get the pooled SQLAlchemy engine shared by all table resources."""
+        if self.engine is None:
+            from .postgres_source import create_pooled_engine
+            
+            # Every concurrently extracted table may hold one connection per key range
+            self.engine = create_pooled_engine(
+                self.database_config,
+                pool_size=self.config.parallel_workers * self.config.range_partitions
+            )
+            self.query_timer = PostgresQueryTimer(self.engine)
+        return self.engine
+    
+    def get_duckdb_connection(self):
+        """Get the DuckDB connection reused by the destination and all reads."""
+        if self.duckdb_connection is None:
+            import duckdb
+            
+            self.duckdb_connection = duckdb.connect(
+                self.config.destination_config["credentials"], config=self._duckdb_settings()
+            )
+        return self.duckdb_connection
+    
+    def _duckdb_settings(self) -> Dict[str, Any]:
+        """Memory, spill and thread settings for the destination DuckDB connection."""
+        os.makedirs(self.config.duckdb_temp_directory, exist_ok=True)
+        settings: Dict[str, Any] = {'temp_directory': self.config.duckdb_temp_directory}
+        if self.config.duckdb_memory_limit is not None:
+            settings['memory_limit'] = self.config.duckdb_memory_limit
+        if self.config.duckdb_threads is not None:
+            settings['threads'] = self.config.duckdb_threads
+        return settings
+    
+    def close(self):
+        """Close the DuckDB connection and the PostgreSQL connection pool."""
+        self._release_duckdb()
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
+            self.query_timer = None
+    
+    def _release_duckdb(self):
+        """Close the DuckDB connection, and the dlt pipeline bound to it, so another process can open the file."""
+        if self.duckdb_connection is not None:
+            self.duckdb_connection.close()
+            self.duckdb_connection = None
+            self.pipeline = None
+    
+    @property
+    def execution_mode(self) -> str:
+        """Describe how the extraction is parallelized."""
+        if self.config.parallel_workers == 1:
+            return "serial"
+        return f"parallel ({self.config.parallel_workers} workers, {self.config.normalize_pool} normalize)"
+    
+    def _apply_runtime_settings(self):
+        """
+        Size dlt's worker pools and writer buffers from the config.
+        
+        Each table's writer holds at most buffer_max_items items in memory
+        before flushing them to its intermediate file, and the file is rotated
+        at file_max_items rows or file_max_bytes, so normalize and load work on
+        bounded files as well. Items are rows for the sqlalchemy backend and
+        Arrow chunks of chunk_size rows for the columnar backends.
+        """
+        workers = self.config.parallel_workers
+        os.environ["EXTRACT__WORKERS"] = str(workers)
+        os.environ["NORMALIZE__WORKERS"] = str(self.config.normalize_workers or workers)
+        os.environ["NORMALIZE__POOL_TYPE"] = self.config.normalize_pool
+        os.environ["LOAD__WORKERS"] = str(self.config.load_workers or workers)
+        
+        writer_settings = {
+            'BUFFER_MAX_ITEMS': self.config.buffer_max_items,
+            'FILE_MAX_ITEMS': self.config.file_max_items,
+            'FILE_MAX_BYTES': self.config.file_max_bytes
+        }
+        for stage in ("EXTRACT", "NORMALIZE"):
+            for name, value in writer_settings.items():
+                key = f"{stage}__DATA_WRITER__{name}"
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = str(value)
+    
+    def run_extraction(self, show_progress: bool = True,
+                       table_names: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Run the complete data extraction pipeline.
         
         Args:
             show_progress: Whether to show extraction progress
+            table_names: Tables to extract in this run, overriding
+                config.tables_to_extract
             
         Returns:
             Dictionary containing extraction results and statistics
         """
+        self._apply_runtime_settings()
         pipeline = self.create_pipeline()
         
         print(f"Starting health data extraction pipeline: {self.config.pipeline_name}")
         print(f"Database: {self.database_config.host}:{self.database_config.port}/{self.database_config.database}")
         print(f"Destination: {self.config.destination}")
+        print(f"Execution mode: {self.execution_mode}")
+        print(f"Backend: {self.config.backend}")
 
+        from .postgres_source import postgres_health_data
+        
         # Get the data source
+        schema_violations: Dict[str, int] = {}
         source = postgres_health_data(
             database_config=self.database_config,
-            table_names=self.config.tables_to_extract,
+            table_names=table_names or self.config.tables_to_extract,
             table_limits=self.config.table_limits,
             table_filters=self.config.table_filters,
-            table_ordering=self.config.table_ordering
+            table_ordering=self.config.table_ordering,
+            enable_incremental=self.config.enable_incremental,
+            incremental_lag_seconds=self.config.incremental_lag_seconds,
+            engine=self.get_engine(),
+            parallelize=self.config.parallel_workers > 1,
+            range_partitions=self.config.range_partitions,
+            partition_key=self.config.partition_key,
+            chunk_size=self.config.chunk_size,
+            backend=self.config.backend,
+            backend_kwargs=self.config.backend_kwargs,
+            write_dispositions=self.config.write_dispositions,
+            append_dedup=self.config.append_dedup,
+            explicit_schema=self.config.explicit_schema,
+            violation_policy=self.config.violation_policy,
+            violation_counts=schema_violations,
+            extraction_mode=self.config.extraction_mode,
+            cdc_options={
+                'slot_name': self.config.cdc_slot_name,
+                'batch_size': self.config.cdc_batch_size,
+                'max_batch_seconds': self.config.cdc_max_batch_seconds
+            }
         )
         
-        # Run the pipeline
-        if self.config.full_refresh:
-            print("Running full refresh...")
-            load_info = pipeline.run(
-                source,
-                write_disposition="replace"
-            )
-        else:
-            print("Running incremental extraction...")
-            load_info = pipeline.run(source)
+        # Columnar backends yield Arrow tables, which dlt writes straight to parquet
+        run_kwargs = {}
+        if self.config.backend != "sqlalchemy":
+            run_kwargs['loader_file_format'] = "parquet"
+        if self.config.destination == "filesystem":
+            run_kwargs['loader_file_format'] = self.config.output_format
+        
+        # Run extract, normalize and load as separate, individually timed stages
+        run_metrics = RunMetrics(pipeline_name=pipeline.pipeline_name)
+        self.query_timer.reset()
+        started = time.perf_counter()
+        with RssSampler() as rss:
+            pipeline.sync_destination()
+            if self.config.full_refresh:
+                # Drop the tables together with the stored cursors so the next
+                # incremental run starts from the freshly reloaded high-water mark
+                print("Running full refresh...")
+                self._run_stage(run_metrics, "extract", pipeline.extract, source,
+                                refresh="drop_sources", **run_kwargs)
+            else:
+                print("Running incremental extraction...")
+                self._run_stage(run_metrics, "extract", pipeline.extract, source, **run_kwargs)
+            normalize_info = self._run_stage(run_metrics, "normalize", pipeline.normalize, **run_kwargs)
+            load_info = self._run_stage(run_metrics, "load", pipeline.load)
+            if self.config.lake:
+                self._publish_to_lake(run_metrics)
+        wall_clock_seconds = time.perf_counter() - started
+        
+        run_metrics.peak_rss_bytes = rss.peak_bytes
+        run_metrics.process_peak_rss_bytes = peak_rss_bytes()
+        run_metrics.postgres_query_seconds = self.query_timer.seconds
+        run_metrics.postgres_query_count = self.query_timer.count
+        run_metrics.schema_violations = schema_violations
+        self._export_metrics(run_metrics)
+        
+        row_counts = self._collect_row_counts(normalize_info)
+        rows_extracted = sum(row_counts.values())
+        
+        data_quality = None
+        if self.config.dq_scope is not None:
+            data_quality = self._run_data_quality_tests(load_info)
         
         # Display results
-        self._display_results(load_info, show_progress)
+        self._display_results(load_info, show_progress, wall_clock_seconds, row_counts,
+                              run_metrics, data_quality)
         
         return {
             'load_info': load_info,
             'pipeline_name': pipeline.pipeline_name,
             'destination': self.config.destination,
-            'tables_extracted': self.config.tables_to_extract or 'all'
+            'tables_extracted': table_names or self.config.tables_to_extract or 'all',
+            'execution_mode': self.execution_mode,
+            'backend': self.config.backend,
+            'wall_clock_seconds': wall_clock_seconds,
+            'row_counts': row_counts,
+            'rows_extracted': rows_extracted,
+            'rows_per_second': rows_extracted / wall_clock_seconds if wall_clock_seconds > 0 else 0.0,
+            'schema_violations': schema_violations,
+            'metrics': run_metrics.to_dict(),
+            'data_quality': data_quality
         }
     
-    def get_extracted_data(self, table_name: str) -> Optional[pd.DataFrame]:
+    def run_extract_transform(self, show_progress: bool = True,
+                              table_names: Optional[List[str]] = None,
+                              retry_selectors: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Run the extraction and then the dbt models downstream of the tables that changed.
+        
+        dbt runs in this process with one source:raw.<table>+ selector per
+        raw table that received rows, and is skipped when none did. The
+        pipeline's DuckDB connection is closed before dbt opens the file and
+        reopened on next use, so the two never contend for the write lock.
+        
+        Args:
+            show_progress: Whether to show extraction progress
+            table_names: Tables to extract in this run, overriding
+                config.tables_to_extract
+            retry_selectors: Selectors a previous dbt run failed on, built
+                together with the changed tables' models
+            
+        Returns:
+            The run_extraction results with a 'dbt' entry, None when dbt was skipped
+        """
+        if self.config.destination != "duckdb":
+            raise ValueError("dbt runs require the duckdb destination")
+        from .postgres_source import HEALTH_TABLES
+        
+        result = self.run_extraction(show_progress=show_progress, table_names=table_names)
+        selectors = changed_source_selectors(result['row_counts'], HEALTH_TABLES)
+        selectors += [selector for selector in retry_selectors or [] if selector not in selectors]
+        if not selectors:
+            print("⏭️  No new rows in any source table, skipping dbt")
+            result['dbt'] = None
+            return result
+        
+        result['dbt'] = self.run_transform(selectors)
+        return result
+    
+    def run_transform(self, selectors: List[str]) -> Dict[str, Any]:
+        """
+        Build the selected dbt models on the pipeline's DuckDB file.
+        
+        Args:
+            selectors: dbt node selectors
+            
+        Returns:
+            The run_models summary
+        """
+        self._release_duckdb()
+        print(f"\nRunning dbt for {' '.join(selectors)}")
+        dbt_result = run_models(self.config.destination_config["credentials"], selectors)
+        print(f"dbt: {dbt_result['models']} models in {dbt_result['seconds']:.2f}s")
+        for failure in dbt_result['failures']:
+            print(f"  ❌ {failure['node']}: {failure['status']} {failure['message'] or ''}")
+        return dbt_result
+    
+    def tables_with_new_data(self, table_names: List[str]) -> List[str]:
+        """
+        Return the tables whose source high-water mark moved past the stored cursor.
+        
+        Compares max(incremental_key), answered from the index, with the
+        incremental cursor in the pipeline state, so an idle table costs one
+        cheap query instead of an extraction run. Tables without a stored
+        cursor, replaced tables and CDC runs always count as changed.
+        
+        Args:
+            table_names: Tables to check
+            
+        Returns:
+            Subset of table_names that should be extracted
+        """
+        if self.config.extraction_mode == "cdc" or not self.config.enable_incremental:
+            return list(table_names)
+        from sqlalchemy import text
+        from .postgres_source import HEALTH_TABLES
+        
+        resources = (self.create_pipeline().state.get('sources', {})
+                     .get('postgres_health_data', {}).get('resources', {}))
+        changed = []
+        with self.get_engine().connect() as connection:
+            for table_name in table_names:
+                key = HEALTH_TABLES[table_name]['incremental_key']
+                disposition = (self.config.write_dispositions or {}).get(table_name)
+                last_value = (resources.get(table_name, {}).get('incremental', {})
+                              .get(key, {}).get('last_value'))
+                if disposition == "replace" or last_value is None:
+                    changed.append(table_name)
+                    continue
+                high = connection.execute(text(
+                    f"SELECT max({quote_identifier(key)}) FROM public.{quote_identifier(table_name)}"
+                )).scalar()
+                if high is not None and _as_utc(high) > _as_utc(last_value):
+                    changed.append(table_name)
+        return changed
+    
+    def _run_stage(self, run_metrics: RunMetrics, stage: str, step, *args, **kwargs):
+        """Run one pipeline stage, timing it and profiling it if configured."""
+        profiler = nullcontext()
+        if self.config.profile_stage == stage:
+            extension = "html" if self.config.profiler == "pyinstrument" else "prof"
+            output_path = os.path.join(
+                self.config.output_directory, "profiles",
+                f"{self.config.pipeline_name}-{stage}-{int(time.time())}.{extension}"
+            )
+            profiler = profile_stage(self.config.profiler, output_path)
+        
+        with profiler:
+            started = time.perf_counter()
+            step_info = step(*args, **kwargs)
+            run_metrics.record_stage(stage, time.perf_counter() - started, step_info)
+        return step_info
+    
+    def _publish_to_lake(self, run_metrics: RunMetrics):
+        """Move the files of the loads just written into the Parquet lake."""
+        lake = ParquetLake.from_config(self.config)
+        if self.config.full_refresh:
+            # The landing area now holds complete tables, so start the lake over
+            remove_lake(lake.directory)
+        started = time.perf_counter()
+        lake.ingest(self.config.destination_config["bucket_url"])
+        run_metrics.stage_seconds['lake'] = time.perf_counter() - started
+    
+    def _run_data_quality_tests(self, load_info) -> Dict[str, Any]:
+        """
+        Run the dbt source tests on the rows of this run's loads.
+        
+        The recent scope covers at least the loads just completed. Once the
+        last full sweep is older than config.dq_full_sweep_hours, the run
+        sweeps the whole raw tables instead.
+        """
+        scope = self.config.dq_scope
+        stamp_path = os.path.join(self.config.output_directory, f".{self.config.pipeline_name}.dq_full_sweep")
+        if scope == "recent" and full_sweep_due(stamp_path, self.config.dq_full_sweep_hours):
+            scope = "full"
+        
+        # dbt opens the DuckDB file itself; the connection is reopened on next use
+        self._release_duckdb()
+        recent_loads = max(self.config.dq_recent_loads, len(load_info.loads_ids))
+        data_quality = run_source_tests(self.config.destination_config["credentials"], scope, recent_loads)
+        if scope == "full" and not data_quality['failures']:
+            record_full_sweep(stamp_path)
+        return data_quality
+    
+    def _export_metrics(self, run_metrics: RunMetrics):
+        """Write the run metrics to the configured JSON lines and Prometheus files."""
+        if self.config.metrics_jsonl_path:
+            write_jsonl(run_metrics, self.config.metrics_jsonl_path)
+        if self.config.metrics_prometheus_path:
+            write_prometheus_textfile(run_metrics, self.config.metrics_prometheus_path)
+    
+    def _build_select(self, table_name: str, columns: Optional[List[str]] = None,
+                      filters: Optional[List[TableFilter]] = None):
+        """Build a projected, filtered SELECT against the raw dataset and its parameters."""
+        projection = ', '.join(quote_identifier(column) for column in columns) if columns else '*'
+        query = f"SELECT {projection} FROM raw.{quote_identifier(table_name)}"
+        params = []
+        if filters:
+            predicates = []
+            for table_filter in filters:
+                predicate, predicate_params = table_filter.to_sql()
+                predicates.append(predicate)
+                params.extend(predicate_params)
+            query += f" WHERE {' AND '.join(predicates)}"
+        return query, params
+    
+    def read_arrow(self, table_name: str, columns: Optional[List[str]] = None,
+                   filters: Optional[List[TableFilter]] = None):
         """
-        Get extracted data as pandas DataFrame.
+        Read an extracted table as an Arrow table.
+        
+        Only the requested columns are read and the filters are evaluated
+        inside DuckDB, so no Python objects are created per row.
         
         Args:
             table_name: Name of the table to retrieve
+            columns: Optional list of columns to project. None reads all columns
+            filters: Optional typed filters pushed down into the query
             
         Returns:
-            DataFrame with the extracted data, or None if not found
+            pyarrow.Table with the selected data
+            
+        Raises:
+            ValueError: If the destination is not duckdb
         """
-        if self.pipeline is None:
-            print("Pipeline not initialized. Run extraction first.")
-            return None
+        self.config.require_duckdb_destination("read_arrow")
+        query, params = self._build_select(table_name, columns, filters)
+        return self.get_duckdb_connection().cursor().execute(query, params).fetch_arrow_table()
+    
+    def read_batches(self, table_name: str, columns: Optional[List[str]] = None,
+                     filters: Optional[List[TableFilter]] = None, batch_size: int = 100000):
+        """
+        Stream an extracted table as Arrow record batches.
+        
+        Memory use is bounded by batch_size regardless of the table size.
+        
+        Args:
+            table_name: Name of the table to retrieve
+            columns: Optional list of columns to project. None reads all columns
+            filters: Optional typed filters pushed down into the query
+            batch_size: Rows per record batch
+            
+        Returns:
+            pyarrow.RecordBatchReader over the selected data
             
+        Raises:
+            ValueError: If the destination is not duckdb
+        """
+        self.config.require_duckdb_destination("read_batches")
+        query, params = self._build_select(table_name, columns, filters)
+        # Each reader gets its own cursor so concurrent streams do not interfere
+        return self.get_duckdb_connection().cursor().execute(query, params).fetch_record_batch(batch_size)
+    
+    def get_extracted_data(self, table_name: str, columns: Optional[List[str]] = None,
+                           filters: Optional[List[TableFilter]] = None) -> Optional['pd.DataFrame']:
+        """
+        Get extracted data as pandas DataFrame with Arrow-backed dtypes.
+        
+        Args:
+            table_name: Name of the table to retrieve
+            columns: Optional list of columns to project. None reads all columns
+            filters: Optional typed filters pushed down into the query
+            
+        Returns:
+            DataFrame with the extracted data, or None if not found or the
+            destination is not duckdb
+        """
+        if self.config.destination != "duckdb":
+            print(f"get_extracted_data requires the duckdb destination, not {self.config.destination}")
+            return None
         try:
-            # For DuckDB destination, we can query directly
-            if self.config.destination == "duckdb":
-                with self.pipeline.sql_client() as client:
-                    query = f"SELECT * FROM raw.{table_name}"
-                    result = client.execute_sql(query)
-                    if hasattr(result, 'df'):
-                        return result.df()
-                    else:
-                        # Convert list of rows to DataFrame
-                        import pandas as pd
-                        rows = result.fetchall() if hasattr(result, 'fetchall') else result
-                        if rows:
-                            columns = [desc[0] for desc in result.description] if hasattr(result, 'description') else None
-                            return pd.DataFrame(rows, columns=columns)
-                        return pd.DataFrame()
-            else:
-                print(f"Data retrieval not implemented for destination: {self.config.destination}")
-                return None
+            import pandas as pd
+            
+            return self.read_arrow(table_name, columns, filters).to_pandas(types_mapper=pd.ArrowDtype)
         except Exception as e:
             print(f"Error retrieving data for {table_name}: {e}")
             return None
     
-    def _display_results(self, load_info, show_progress: bool = True):
+    @staticmethod
+    def _collect_row_counts(normalize_info) -> Dict[str, int]:
+        """Rows per table from the normalize step's metrics, excluding dlt's own tables."""
+        row_counts = getattr(normalize_info, 'row_counts', None) or {}
+        return {
+            table_name: count for table_name, count in row_counts.items()
+            if not table_name.startswith('_dlt')
+        }
+    
+    def _display_results(self, load_info, show_progress: bool = True,
+                         wall_clock_seconds: Optional[float] = None,
+                         row_counts: Optional[Dict[str, int]] = None,
+                         run_metrics: Optional[RunMetrics] = None,
+                         data_quality: Optional[Dict[str, Any]] = None):
         """Display extraction results."""
         print("\n" + "="*50)
         print("EXTRACTION RESULTS")
         print("="*50)
         
-        # Safely access LoadInfo attributes
-        pipeline_name = 'Unknown'
-        if hasattr(load_info, 'pipeline') and load_info.pipeline:
-            if hasattr(load_info.pipeline, 'pipeline_name'):
-                pipeline_name = load_info.pipeline.pipeline_name
-            elif hasattr(load_info.pipeline, 'name'):
-                pipeline_name = load_info.pipeline.name
+        if wall_clock_seconds is not None:
+            print(f"Wall clock: {wall_clock_seconds:.2f}s ({self.execution_mode})")
+            if row_counts is not None and wall_clock_seconds > 0:
+                rows_extracted = sum(row_counts.values())
+                print(f"Throughput: {rows_extracted / wall_clock_seconds:,.0f} rows/sec "
+                      f"({rows_extracted} rows, {self.config.backend} backend)")
         
-        print(f"Pipeline: {pipeline_name}")
-        
-        # Load ID might not exist in all dlt versions
-        if hasattr(load_info, 'load_id'):
-            print(f"Load ID: {load_info.load_id}")
-        elif hasattr(load_info, 'loads_ids') and load_info.loads_ids:
+        print(f"Pipeline: {load_info.pipeline.pipeline_name}")
+        if load_info.loads_ids:
             print(f"Load IDs: {', '.join(load_info.loads_ids)}")
+        print(f"Destination: {load_info.destination_name}")
         
-        # Destination name
-        if hasattr(load_info, 'destination_name'):
-            print(f"Destination: {load_info.destination_name}")
-        elif hasattr(load_info, 'destination_type'):
-            print(f"Destination: {load_info.destination_type}")
-        
-        # Check for failed jobs
-        if hasattr(load_info, 'has_failed_jobs') and load_info.has_failed_jobs:
+        if load_info.has_failed_jobs:
             print("❌ Some jobs failed:")
-            if hasattr(load_info, 'failed_jobs'):
-                for job in load_info.failed_jobs:
-                    table_name = getattr(job, 'table_name', 'Unknown table')
-                    if hasattr(job, 'job_file_info') and hasattr(job.job_file_info, 'table_name'):
-                        table_name = job.job_file_info.table_name
-                    exception = getattr(job, 'exception', 'Unknown error')
-                    print(f"  - {table_name}: {exception}")
+            for package in load_info.load_packages:
+                for job in package.jobs.get('failed_jobs', []):
+                    print(f"  - {job.job_file_info.table_name}: {job.failed_message}")
         else:
             print("✅ All jobs completed successfully")
         
-        # Display table statistics if available
-        if hasattr(load_info, 'loaded_packages') and load_info.loaded_packages:
-            try:
-                packages = load_info.loaded_packages
-                if packages and len(packages) > 0:
-                    first_package = packages[0]
-                    if hasattr(first_package, 'schema_updates'):
-                        print(f"\nTables processed: {len(first_package.schema_updates)}")
-                    
-                    # Try to display load metrics
-                    for package in packages:
-                        if hasattr(package, 'load_metrics'):
-                            for table_name, metrics in package.load_metrics.items():
-                                if hasattr(metrics, 'items_count'):
-                                    print(f"  - {table_name}: {metrics.items_count} rows")
-                                elif hasattr(metrics, 'rows_count'):
-                                    print(f"  - {table_name}: {metrics.rows_count} rows")
-            except (AttributeError, IndexError) as e:
-                print(f"Could not retrieve detailed statistics: {e}")
+        if run_metrics is not None:
+            stages = ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in run_metrics.stage_seconds.items())
+            print(f"Stages: {stages}")
+            print(f"Postgres: {run_metrics.postgres_query_count} queries, "
+                  f"{run_metrics.postgres_query_seconds:.2f}s executing")
+            print(f"Peak RSS: {run_metrics.peak_rss_bytes / 2**20:.1f} MiB this run, "
+                  f"{run_metrics.process_peak_rss_bytes / 2**20:.1f} MiB process lifetime")
+            slowest = run_metrics.slowest_table()
+            if slowest is not None:
+                breakdown = ", ".join(
+                    f"{stage} {metrics.seconds:.2f}s"
+                    for stage, metrics in run_metrics.tables[slowest].items()
+                )
+                print(f"Slowest table: {slowest} ({breakdown})")
+            if run_metrics.schema_violations:
+                print(f"Schema violations ({self.config.violation_policy}):")
+                for table_name, count in sorted(run_metrics.schema_violations.items()):
+                    print(f"  - {table_name}: {count} rows")
+        
+        if data_quality is not None:
+            scope = data_quality['scope']
+            if scope == "recent":
+                scope = f"last {data_quality['recent_loads']} load(s)"
+            print(f"Data quality: {data_quality['tests']} tests on {scope} in {data_quality['seconds']:.2f}s")
+            if data_quality['failures']:
+                for failure in data_quality['failures']:
+                    print(f"  ❌ {failure['node']}: {failure['status']} ({failure['failures']} rows)")
+            else:
+                print("✅ All data quality tests passed")
+        
+        # Display per-table row counts from the load metrics
+        if row_counts:
+            print(f"\nTables processed: {len(row_counts)}")
+            for table_name, count in sorted(row_counts.items()):
+                print(f"  - {table_name}: {count} rows")
         
         if show_progress and self.config.destination == "duckdb":
             self._show_sample_data()
     
     def _show_sample_data(self):
-        """Show sample data from extracted tables."""
-        if self.pipeline is None:
-            return
-            
+        """
+        Show table sizes, and optionally a few sample rows, for the raw dataset.
+        
+        Sizes are DuckDB's catalog estimates, so no table is scanned. Sample
+        rows are only read when config.sample_rows is set.
+        """
         try:
-            with self.pipeline.sql_client() as client:
-                # Get all tables in the schema
-                tables = client.execute_sql(
-                    "SELECT table_name FROM information_schema.tables WHERE table_schema = 'raw'"
-                ).fetchall()
-                
-                for (table_name,) in tables:
-                    print(f"\n--- Sample from {table_name} ---")
-                    result = client.execute_sql(f"SELECT * FROM raw.{table_name} LIMIT 3")
-                    if hasattr(result, 'df'):
-                        sample_df = result.df()
-                    else:
-                        import pandas as pd
-                        rows = result.fetchall() if hasattr(result, 'fetchall') else result
-                        if rows:
-                            columns = [desc[0] for desc in result.description] if hasattr(result, 'description') else None
-                            sample_df = pd.DataFrame(rows, columns=columns)
-                        else:
-                            sample_df = pd.DataFrame()
-                    
-                    if not sample_df.empty:
-                        print(sample_df.to_string(index=False))
-                        count_result = client.execute_sql(f'SELECT COUNT(*) FROM raw.{table_name}')
-                        count = count_result.fetchone()[0] if hasattr(count_result, 'fetchone') else count_result[0][0]
-                        print(f"Total rows: {count}")
-                    else:
-                        print("No data found")
+            connection = self.get_duckdb_connection().cursor()
+            tables = connection.execute(
+                "SELECT table_name, estimated_size FROM duckdb_tables() "
+                "WHERE schema_name = 'raw' AND NOT starts_with(table_name, '_dlt') "
+                "ORDER BY table_name"
+            ).fetchall()
+            
+            print("\nEstimated table sizes:")
+            for table_name, estimated_size in tables:
+                print(f"  - {table_name}: ~{estimated_size} rows")
+            
+            if self.config.sample_rows <= 0:
+                return
+            for table_name, _ in tables:
+                print(f"\n--- Sample from {table_name} ---")
+                sample = connection.execute(
+                    f"SELECT * FROM raw.{quote_identifier(table_name)} LIMIT {int(self.config.sample_rows)}"
+                ).fetch_arrow_table()
+                if sample.num_rows == 0:
+                    print("No data found")
+                    continue
+                text = sample.to_pandas().to_string(index=False)
+                encoded = text.encode('utf-8')
+                if len(encoded) > self.config.sample_max_bytes:
+                    text = encoded[:self.config.sample_max_bytes].decode('utf-8', errors='ignore') + "\n..."
+                print(text)
                         
         except Exception as e:
             print(f"Error displaying sample data: {e}")
 
 
+def _as_utc(value) -> datetime:
+    """Normalize a cursor value from PostgreSQL or dlt state to an aware UTC datetime."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
 
 def run_full_extraction():
     """Run full extraction of all health tracking tables."""
@@ -235,11 +641,94 @@ def run_full_extraction():
     return pipeline.run_extraction()
 
 
-def export_to_files(output_dir: str = "./health_data_export"):
-    """Export data to files (CSV, Parquet, etc.)."""
-    from .pipeline_config import get_filesystem_config
+def run_extract_and_transform():
+    """Run an incremental extraction of all tables followed by the affected dbt models."""
+    from .pipeline_config import get_full_extraction_config
+    
+    pipeline = HealthDataPipeline(get_full_extraction_config())
+    try:
+        return pipeline.run_extract_transform()
+    finally:
+        pipeline.close()
+
+
+def compare_extraction_modes(workers: int = 4, normalize_pool: str = "process") -> Dict[str, float]:
+    """
+    Run a full refresh serially and then with a worker pool, and report wall clock times.
+    
+    Args:
+        workers: Worker count for the parallel run
+        normalize_pool: process or thread based normalize for the parallel run
+        
+    Returns:
+        Dictionary with the serial and parallel wall clock seconds
+    """
+    from .pipeline_config import get_full_extraction_config, get_parallel_extraction_config
+    
+    serial_config = get_full_extraction_config()
+    serial_config.full_refresh = True
+    parallel_config = get_parallel_extraction_config(workers, normalize_pool)
+    parallel_config.full_refresh = True
+    
+    serial = HealthDataPipeline(serial_config).run_extraction(show_progress=False)
+    parallel = HealthDataPipeline(parallel_config).run_extraction(show_progress=False)
+    
+    timings = {
+        'serial': serial['wall_clock_seconds'],
+        'parallel': parallel['wall_clock_seconds']
+    }
+    print("\n" + "="*50)
+    print("SERIAL VS PARALLEL")
+    print("="*50)
+    print(f"Serial:   {timings['serial']:.2f}s")
+    print(f"Parallel: {timings['parallel']:.2f}s ({parallel['execution_mode']})")
+    if timings['parallel'] > 0:
+        print(f"Speedup:  {timings['serial'] / timings['parallel']:.2f}x")
+    return timings
+
+
+def compare_backends(backends=("sqlalchemy", "pyarrow", "pandas", "connectorx")) -> Dict[str, float]:
+    """
+    Run a full refresh with each row backend and report rows/sec for each.
+    
+    Args:
+        backends: Backends to compare
+        
+    Returns:
+        Dictionary mapping backend name to rows per second
+    """
+    from .pipeline_config import get_columnar_extraction_config
+    
+    throughput = {}
+    for backend in backends:
+        try:
+            config = get_columnar_extraction_config(backend)
+            config.full_refresh = True
+            result = HealthDataPipeline(config).run_extraction(show_progress=False)
+            throughput[backend] = result['rows_per_second']
+        except Exception as e:
+            print(f"❌ Backend {backend} failed: {e}")
+    
+    print("\n" + "="*50)
+    print("ROWS/SEC BY BACKEND")
+    print("="*50)
+    for backend, rows_per_second in sorted(throughput.items(), key=lambda item: -item[1]):
+        print(f"{backend:<12} {rows_per_second:>12,.0f} rows/sec")
+    return throughput
+
+
+def export_to_files(output_dir: str = "./health_data_export", lake: bool = False):
+    """
+    Export data to files (CSV, Parquet, etc.).
+    
+    Args:
+        output_dir: Directory the files are written to
+        lake: Write a hive-partitioned, compressed Parquet lake under
+            <output_dir>/lake instead of one file per table per load
+    """
+    from .pipeline_config import get_filesystem_config, get_lake_config
     
-    config = get_filesystem_config(output_dir)
+    config = get_lake_config(output_dir) if lake else get_filesystem_config(output_dir)
     pipeline = HealthDataPipeline(config)
     return pipeline.run_extraction()
 
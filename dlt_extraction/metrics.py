@@ -0,0 +1,321 @@
+"""Per-stage timing and resource metrics for extraction runs."""
+
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+STAGES = ("extract", "normalize", "load")
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+@dataclass
+class TableStageMetrics:
+    """Rows, bytes and seconds spent on one table in one stage."""
+
+    rows: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    """
+    Structured metrics for a single extraction run.
+
+    Stage and table figures come from the metrics dlt already keeps for every
+    step, so collecting them adds no queries and no extra passes over the data.
+    """
+
+    pipeline_name: str
+    started_at: float = field(default_factory=time.time)
+    load_ids: List[str] = field(default_factory=list)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    tables: Dict[str, Dict[str, TableStageMetrics]] = field(default_factory=dict)
+    peak_rss_bytes: int = 0  # Sampled over this run, including live child processes
+    process_peak_rss_bytes: int = 0  # Peak over the whole process lifetime (ru_maxrss)
+    postgres_query_seconds: float = 0.0
+    postgres_query_count: int = 0
+    schema_violations: Dict[str, int] = field(default_factory=dict)  # Rows violating the declared types per table
+
+    def record_stage(self, stage: str, seconds: float, step_info):
+        """
+        Record the wall time of a stage and the per-table figures from its step info.
+
+        Extract and normalize report the rows and bytes written per table, with
+        the span between the first and last write as the table's time. Load
+        reports the duration of each load job.
+        """
+        self.stage_seconds[stage] = seconds
+        for load_id, step_metrics_list in (getattr(step_info, 'metrics', None) or {}).items():
+            if load_id not in self.load_ids:
+                self.load_ids.append(load_id)
+            for step_metrics in step_metrics_list:
+                if stage == "load":
+                    for job in step_metrics.get('job_metrics', {}).values():
+                        table = self._table(job.table_name, stage)
+                        if table is not None and job.started_at and job.finished_at:
+                            table.seconds += (job.finished_at - job.started_at).total_seconds()
+                else:
+                    for table_name, writer in step_metrics.get('table_metrics', {}).items():
+                        table = self._table(table_name, stage)
+                        if table is not None:
+                            table.rows += writer.items_count
+                            table.bytes += writer.file_size
+                            table.seconds += max(0.0, writer.last_modified - writer.created)
+
+    def _table(self, table_name: str, stage: str) -> Optional[TableStageMetrics]:
+        if table_name.startswith('_dlt'):
+            return None
+        return self.tables.setdefault(table_name, {}).setdefault(stage, TableStageMetrics())
+
+    def slowest_table(self) -> Optional[str]:
+        """Table with the most time across all stages."""
+        if not self.tables:
+            return None
+        return max(self.tables, key=lambda name: sum(m.seconds for m in self.tables[name].values()))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class PostgresQueryTimer:
+    """
+    Accumulate time spent in cursor.execute on a SQLAlchemy engine.
+
+    Listeners are attached once per engine and only add two perf_counter calls
+    per statement. With server-side cursors the time to stream result chunks
+    is counted in the extract stage, not here; connectorx reads bypass the
+    engine and are not counted.
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self._lock = threading.Lock()
+        self.seconds = 0.0
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def reset(self):
+        with self._lock:
+            self.seconds = 0.0
+            self.count = 0
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started_at', []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started_at'].pop()
+        with self._lock:
+            self.seconds += elapsed
+            self.count += 1
+
+
+class RssSampler:
+    """
+    Track the peak resident set size over one run by sampling it on a thread.
+
+    ru_maxrss only reports the peak over the whole process lifetime, so in a
+    long-lived process such as the daemon every run would report the all-time
+    peak. The sampler reads VmRSS of this process and of its live children
+    (the normalize process pool) from /proc every interval_seconds; a spike
+    shorter than the interval can be missed. Where /proc is not available the
+    peak falls back to the process lifetime figure.
+
+    Used as a context manager; peak_bytes holds the result after exit.
+    """
+
+    def __init__(self, interval_seconds: float = 0.1):
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RssSampler":
+        if current_rss_bytes() is None:
+            return self
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread is None:
+            self.peak_bytes = peak_rss_bytes()
+            return
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self._sample()
+
+    def _sample(self):
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes() or 0)
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Current resident set size of this process and its live children, None without /proc."""
+    total = _proc_rss_bytes("self")
+    if total is None:
+        return None
+    try:
+        with os.scandir("/proc/self/task") as tasks:
+            for task in tasks:
+                try:
+                    with open(f"/proc/self/task/{task.name}/children") as f:
+                        children = f.read().split()
+                except OSError:
+                    continue
+                total += sum(_proc_rss_bytes(pid) or 0 for pid in children)
+    except OSError:
+        pass
+    return total
+
+
+def _proc_rss_bytes(pid: str) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return 0
+
+
+def peak_rss_bytes() -> int:
+    """
+    Peak resident set size of this process and its finished children over the
+    whole process lifetime, not a single run; see RssSampler for a run's peak.
+    """
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextmanager
+def profile_stage(profiler: str, output_path: str):
+    """
+    Profile the enclosed block with cProfile or pyinstrument.
+
+    Only the calling thread of this process is profiled, so profile the
+    normalize stage with parallel_workers=1 or a thread normalize pool.
+
+    Args:
+        profiler: cprofile (writes pstats) or pyinstrument (writes HTML)
+        output_path: File the profile is written to
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            with open(output_path, "w") as f:
+                f.write(profile.output_html())
+    else:
+        import cProfile
+
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            profile.dump_stats(output_path)
+    print(f"Profile written to {output_path}")
+
+
+def write_jsonl(metrics: RunMetrics, path: str):
+    """Append the run metrics as one JSON line."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(metrics.to_dict(), default=str) + "\n")
+
+
+def write_prometheus_textfile(metrics: RunMetrics, path: str):
+    """
+    Write the run metrics in the Prometheus text format for the node exporter
+    textfile collector.
+
+    The file is written to a temporary file in the same directory and renamed
+    into place so the collector never reads a partial file.
+    """
+    pipeline = _label(metrics.pipeline_name)
+    lines = [
+        "# HELP health_pipeline_last_run_timestamp_seconds Start time of the last extraction run.",
+        "# TYPE health_pipeline_last_run_timestamp_seconds gauge",
+        f'health_pipeline_last_run_timestamp_seconds{{pipeline="{pipeline}"}} {metrics.started_at}',
+        "# HELP health_pipeline_stage_seconds Wall time of each pipeline stage.",
+        "# TYPE health_pipeline_stage_seconds gauge"
+    ]
+    for stage, seconds in metrics.stage_seconds.items():
+        lines.append(f'health_pipeline_stage_seconds{{pipeline="{pipeline}",stage="{stage}"}} {seconds}')
+
+    for name, help_text in (
+            ("rows", "Rows written per table and stage."),
+            ("bytes", "Bytes written per table and stage."),
+            ("seconds", "Seconds spent per table and stage.")):
+        lines.append(f"# HELP health_pipeline_table_{name} {help_text}")
+        lines.append(f"# TYPE health_pipeline_table_{name} gauge")
+        for table_name, stages in sorted(metrics.tables.items()):
+            for stage, table_metrics in stages.items():
+                lines.append(
+                    f'health_pipeline_table_{name}{{pipeline="{pipeline}",table="{_label(table_name)}",'
+                    f'stage="{stage}"}} {getattr(table_metrics, name)}'
+                )
+
+    lines.extend([
+        "# HELP health_pipeline_peak_rss_bytes Peak resident set size sampled during the last run.",
+        "# TYPE health_pipeline_peak_rss_bytes gauge",
+        f'health_pipeline_peak_rss_bytes{{pipeline="{pipeline}"}} {metrics.peak_rss_bytes}',
+        "# HELP health_pipeline_process_peak_rss_bytes Peak resident set size over the process lifetime.",
+        "# TYPE health_pipeline_process_peak_rss_bytes gauge",
+        f'health_pipeline_process_peak_rss_bytes{{pipeline="{pipeline}"}} {metrics.process_peak_rss_bytes}',
+        "# HELP health_pipeline_postgres_query_seconds Time spent executing source queries.",
+        "# TYPE health_pipeline_postgres_query_seconds gauge",
+        f'health_pipeline_postgres_query_seconds{{pipeline="{pipeline}"}} {metrics.postgres_query_seconds}',
+        "# HELP health_pipeline_postgres_queries Source queries executed.",
+        "# TYPE health_pipeline_postgres_queries gauge",
+        f'health_pipeline_postgres_queries{{pipeline="{pipeline}"}} {metrics.postgres_query_count}',
+        "# HELP health_pipeline_schema_violations Rows violating the declared column types per table.",
+        "# TYPE health_pipeline_schema_violations gauge"
+    ])
+    for table_name, count in sorted(metrics.schema_violations.items()):
+        lines.append(
+            f'health_pipeline_schema_violations{{pipeline="{pipeline}",table="{_label(table_name)}"}} {count}'
+        )
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".prom.tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
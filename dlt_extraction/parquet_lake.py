@@ -0,0 +1,317 @@
+"""Hive-partitioned, compressed Parquet lake built from filesystem exports."""
+
+import glob
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+
+# Lake layout per table. Mutable tables may hold several versions of a row
+# across loads; their views keep the one from the latest _dlt_load_id.
+LAKE_TABLES = {
+    'customers': {'primary_key': 'customer_id', 'partition_column': None, 'mutable': True},
+    'medical_checkups': {'primary_key': 'checkup_id', 'partition_column': 'checkup_date', 'mutable': True},
+    'blood_pressure_readings': {'primary_key': 'reading_id', 'partition_column': 'measurement_time', 'mutable': False},
+    'blood_sugar_readings': {'primary_key': 'reading_id', 'partition_column': 'measurement_time', 'mutable': False},
+    'cholesterol_readings': {'primary_key': 'reading_id', 'partition_column': 'measurement_time', 'mutable': False},
+    'sodium_readings': {'primary_key': 'reading_id', 'partition_column': 'measurement_time', 'mutable': False}
+}
+# Rows quarantined by the raw schema contract (quarantine_<table>) are only
+# ever appended and keep the primary key of their source table
+LAKE_TABLES.update({
+    f"quarantine_{table_name}": {
+        'primary_key': table_config['primary_key'], 'partition_column': None, 'mutable': False
+    }
+    for table_name, table_config in list(LAKE_TABLES.items())
+})
+
+PARTITION_KEY = "partition_date"
+LOADS_TABLE = "_dlt_loads"
+INGEST_DIRECTORY = "_ingest"
+COMPACTION_JOURNAL = "_compaction.json"
+
+
+@dataclass
+class ParquetLake:
+    """
+    A Parquet lake under `directory` with one folder per table.
+
+    Dated tables are partitioned as <table>/partition_date=YYYY-MM-DD/ on the
+    day or month of their partition column, so engines reading with
+    hive_partitioning prune whole folders on partition_date filters.
+    """
+
+    directory: str
+    compression: str = "zstd"
+    partition_grain: str = "day"
+    row_group_size: int = 122880
+    file_size_bytes: int = 256 * 2**20
+    compact_min_files: int = 8
+
+    def __post_init__(self):
+        if self.compression not in ("zstd", "snappy", "gzip", "uncompressed"):
+            raise ValueError(f"Unsupported lake compression: {self.compression}")
+        if self.partition_grain not in ("day", "month"):
+            raise ValueError(f"Unsupported lake partition grain: {self.partition_grain}")
+
+    @classmethod
+    def from_config(cls, config) -> 'ParquetLake':
+        """Build the lake described by a PipelineConfig."""
+        return cls(
+            directory=config.lake_directory,
+            compression=config.lake_compression,
+            partition_grain=config.lake_partition_grain,
+            row_group_size=config.lake_row_group_size,
+            file_size_bytes=config.lake_file_size_bytes,
+            compact_min_files=config.lake_compact_min_files
+        )
+
+    def ingest(self, landing_directory: str) -> Dict[str, int]:
+        """
+        Move the per-load Parquet files written by dlt into the lake.
+
+        Each table of a load is first copied into _ingest/<load_id>/ and then
+        renamed into the lake, and the table is marked done there; the load is
+        recorded in the lake's _dlt_loads folder once all its tables are done.
+        An interrupted ingest can simply be re-run: it skips recorded loads and
+        done tables, finishes the renames of tables that were fully copied and
+        copies the rest again. Landing files are removed once their load is
+        recorded.
+
+        Quarantine tables are ingested like the source tables. dlt's own
+        _dlt_* folders stay in the landing area, since sync_destination
+        restores the pipeline state from them.
+
+        Args:
+            landing_directory: bucket_url of the filesystem destination
+
+        Returns:
+            Dictionary of landing files ingested per table
+        """
+        import duckdb
+
+        files_by_load = self._landing_files(landing_directory)
+        ingested: Dict[str, int] = {}
+        connection = duckdb.connect()
+        try:
+            for load_id in sorted(files_by_load):
+                tables = files_by_load[load_id]
+                if not self._load_recorded(load_id):
+                    for table_name, files in tables.items():
+                        if self._ingest_table(connection, load_id, table_name, files):
+                            ingested[table_name] = ingested.get(table_name, 0) + len(files)
+                    self._record_load(connection, load_id)
+                    shutil.rmtree(os.path.join(self.directory, INGEST_DIRECTORY, load_id), ignore_errors=True)
+                for files in tables.values():
+                    for path in files:
+                        os.remove(path)
+        finally:
+            connection.close()
+
+        for table_name, count in sorted(ingested.items()):
+            print(f"Lake: ingested {count} files into {table_name}")
+        return ingested
+
+    def compact(self, table_names: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Merge the small files left by incremental loads into one file per partition.
+
+        Partitions with fewer than compact_min_files files are left alone.
+        Mutable tables are also deduplicated to the latest version of each row
+        within the partition. Run compaction while no reader is scanning the
+        lake, since the old and new files briefly coexist.
+
+        Args:
+            table_names: Tables to compact; None compacts every lake table
+
+        Returns:
+            Dictionary of files removed per table
+        """
+        import duckdb
+
+        removed: Dict[str, int] = {}
+        connection = duckdb.connect()
+        try:
+            for table_name in table_names or list(LAKE_TABLES):
+                table_directory = os.path.join(self.directory, table_name)
+                if not os.path.isdir(table_directory):
+                    continue
+                directories = [table_directory] + sorted(
+                    path for path in glob.glob(os.path.join(table_directory, f"{PARTITION_KEY}=*"))
+                    if os.path.isdir(path)
+                )
+                for directory in directories:
+                    removed[table_name] = removed.get(table_name, 0) + self._compact_directory(
+                        connection, table_name, directory
+                    )
+        finally:
+            connection.close()
+
+        for table_name, count in sorted(removed.items()):
+            print(f"Lake: compacted {count} files in {table_name}")
+        return removed
+
+    def create_views(self, connection, schema: str = "lake"):
+        """
+        Create DuckDB views over the lake, one per table plus _dlt_loads.
+
+        Point the dbt sources at them with --vars '{raw_schema: lake}'.
+
+        Args:
+            connection: DuckDB connection to the database dbt builds in
+            schema: Schema the views are created in
+        """
+        connection.execute(f"CREATE SCHEMA IF NOT EXISTS {schema}")
+        for table_name, table_config in LAKE_TABLES.items():
+            if not glob.glob(os.path.join(self.directory, table_name, "**", "*.parquet"), recursive=True):
+                continue
+            select = f"SELECT * FROM {self._scan(table_name)}"
+            if table_config['mutable']:
+                select += (f" QUALIFY row_number() OVER (PARTITION BY {table_config['primary_key']} "
+                           f"ORDER BY _dlt_load_id DESC) = 1")
+            connection.execute(f'CREATE OR REPLACE VIEW {schema}."{table_name}" AS {select}')
+            print(f"Lake: created view {schema}.{table_name}")
+
+        if glob.glob(os.path.join(self.directory, LOADS_TABLE, "*.parquet")):
+            connection.execute(
+                f'CREATE OR REPLACE VIEW {schema}."{LOADS_TABLE}" AS SELECT * FROM {self._scan(LOADS_TABLE)}'
+            )
+
+    def _scan(self, table_name: str) -> str:
+        pattern = _sql_string(os.path.join(os.path.abspath(self.directory), table_name, "**", "*.parquet"))
+        return f"read_parquet({pattern}, hive_partitioning = true, union_by_name = true)"
+
+    def _landing_files(self, landing_directory: str) -> Dict[str, Dict[str, List[str]]]:
+        # dlt names landing files {table_name}/{load_id}.{file_id}.parquet
+        files_by_load: Dict[str, Dict[str, List[str]]] = {}
+        for table_name in LAKE_TABLES:
+            for path in sorted(glob.glob(os.path.join(landing_directory, table_name, "*.parquet"))):
+                # Load ids hold a dot themselves, e.g. 1712345678.123456
+                load_id = os.path.basename(path).rsplit(".", 2)[0]
+                files_by_load.setdefault(load_id, {}).setdefault(table_name, []).append(path)
+        return files_by_load
+
+    def _ingest_table(self, connection, load_id: str, table_name: str, files: List[str]) -> bool:
+        """Copy one table of a load into the lake unless it is already done; True if copied."""
+        load_directory = os.path.join(self.directory, INGEST_DIRECTORY, load_id)
+        done_marker = os.path.join(load_directory, f"{table_name}.done")
+        if os.path.exists(done_marker):
+            return False
+
+        # The copied marker is written once the staged files are complete, so
+        # without it the staged files may be partial and are copied again
+        staging_directory = os.path.join(load_directory, table_name)
+        copied_marker = os.path.join(load_directory, f"{table_name}.copied")
+        if not os.path.exists(copied_marker):
+            shutil.rmtree(staging_directory, ignore_errors=True)
+            os.makedirs(load_directory, exist_ok=True)
+            self._copy(connection, table_name, files, staging_directory)
+            open(copied_marker, "w").close()
+
+        table_directory = os.path.join(self.directory, table_name)
+        for path in glob.glob(os.path.join(staging_directory, "**", "*.parquet"), recursive=True):
+            target = os.path.join(table_directory, os.path.relpath(path, staging_directory))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(path, target)
+        open(done_marker, "w").close()
+        return True
+
+    def _copy(self, connection, table_name: str, files: List[str], directory: str):
+        table_config = LAKE_TABLES[table_name]
+        source = f"read_parquet({_sql_list(files)}, union_by_name = true)"
+
+        if table_config['partition_column'] is None:
+            connection.execute(
+                f"COPY (SELECT * FROM {source}) TO {_sql_string(directory)} ("
+                f"{self._parquet_options()}, FILE_SIZE_BYTES {int(self.file_size_bytes)}, "
+                f"FILENAME_PATTERN 'part_{{uuid}}')"
+            )
+            return
+
+        # DuckDB cannot rotate files within a PARTITION_BY copy, so each
+        # partition gets one file per load until compaction merges them
+        partition_value = (f"CAST(date_trunc('{self.partition_grain}', "
+                           f"{table_config['partition_column']}) AS DATE)")
+        connection.execute(
+            f"COPY (SELECT *, {partition_value} AS {PARTITION_KEY} FROM {source}) "
+            f"TO {_sql_string(directory)} ("
+            f"{self._parquet_options()}, PARTITION_BY ({PARTITION_KEY}), FILENAME_PATTERN 'part_{{uuid}}')"
+        )
+
+    def _load_recorded(self, load_id: str) -> bool:
+        return os.path.exists(os.path.join(self.directory, LOADS_TABLE, f"{load_id}.parquet"))
+
+    def _record_load(self, connection, load_id: str):
+        loads_directory = os.path.join(self.directory, LOADS_TABLE)
+        os.makedirs(loads_directory, exist_ok=True)
+        target = os.path.join(loads_directory, f"{load_id}.parquet")
+        # Written under a temporary name so a recorded load is always complete
+        connection.execute(
+            f"COPY (SELECT ? AS load_id, 0 AS status, CAST(? AS TIMESTAMPTZ) AS inserted_at) "
+            f"TO {_sql_string(target + '.tmp')} (FORMAT parquet)",
+            [load_id, datetime.now(timezone.utc)]
+        )
+        os.replace(target + ".tmp", target)
+
+    def _compact_directory(self, connection, table_name: str, directory: str) -> int:
+        journal = os.path.join(directory, COMPACTION_JOURNAL)
+        if os.path.exists(journal):
+            self._finish_compaction(journal)
+        else:
+            # Output of a compaction that died before its journal was written
+            for path in glob.glob(os.path.join(directory, "*.parquet.tmp")):
+                os.remove(path)
+
+        files = sorted(glob.glob(os.path.join(directory, "*.parquet")))
+        if len(files) < max(2, self.compact_min_files):
+            return 0
+
+        table_config = LAKE_TABLES[table_name]
+        select = f"SELECT * FROM read_parquet({_sql_list(files)}, union_by_name = true)"
+        if table_config['mutable']:
+            select += (f" QUALIFY row_number() OVER (PARTITION BY {table_config['primary_key']} "
+                       f"ORDER BY _dlt_load_id DESC) = 1")
+        select += f" ORDER BY {table_config['primary_key']}"
+
+        target = os.path.join(directory, f"part_{uuid4().hex}.parquet")
+        connection.execute(f"COPY ({select}) TO {_sql_string(target + '.tmp')} ({self._parquet_options()})")
+
+        # The journal makes the swap restartable: once it exists the new file
+        # replaces the old ones, even if this process dies halfway through
+        with open(journal + ".tmp", "w") as f:
+            json.dump({'target': target, 'replaces': files}, f)
+        os.replace(journal + ".tmp", journal)
+        self._finish_compaction(journal)
+        return len(files)
+
+    @staticmethod
+    def _finish_compaction(journal: str):
+        with open(journal) as f:
+            entry = json.load(f)
+        if os.path.exists(entry['target'] + ".tmp"):
+            os.replace(entry['target'] + ".tmp", entry['target'])
+        for path in entry['replaces']:
+            if os.path.exists(path):
+                os.remove(path)
+        os.remove(journal)
+
+    def _parquet_options(self) -> str:
+        return (f"FORMAT parquet, COMPRESSION {self.compression}, "
+                f"ROW_GROUP_SIZE {int(self.row_group_size)}")
+
+
+def remove_lake(directory: str):
+    """Delete a lake and everything in it."""
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _sql_list(values: List[str]) -> str:
+    return "[" + ", ".join(_sql_string(value) for value in values) + "]"
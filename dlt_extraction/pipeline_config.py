@@ -1,9 +1,13 @@
 """Pipeline configuration for dlt health data extraction."""
 
 import os
+from datetime import date
+from importlib.util import find_spec
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 
+from .query_filters import TableFilter
+
 
 @dataclass
 class PipelineConfig:
@@ -19,32 +23,139 @@ class PipelineConfig:
     
     # Table-specific configurations
     table_limits: Dict[str, int] = None
-    table_filters: Dict[str, str] = None  # WHERE clauses per table
+    table_filters: Dict[str, List[TableFilter]] = None  # Typed WHERE predicates per table
     table_ordering: Dict[str, str] = None  # ORDER BY clauses per table
     
     # Incremental loading settings
     enable_incremental: bool = True
-    full_refresh: bool = False
+    full_refresh: bool = False  # Drops the raw tables and resets incremental cursors
+    incremental_lag_seconds: float = 3600  # Re-read window behind the high-water mark for late rows
+    
+    # Extraction mode
+    extraction_mode: str = "query"  # query (SELECT based) or cdc (logical replication slot)
+    cdc_slot_name: str = "health_data_cdc"
+    cdc_batch_size: int = 10000  # Changes per micro-batch, always ending on a commit
+    cdc_max_batch_seconds: float = 30  # Upper bound on the time spent reading one micro-batch
+    
+    # Schema
+    explicit_schema: bool = True  # Declare column types from _sources.yml and freeze the raw schema
+    violation_policy: str = "quarantine"  # reject_row, coerce or quarantine rows that break the declared types
+    
+    # Write strategy
+    write_dispositions: Dict[str, str] = None  # Per-table append, merge or replace; None keeps the source defaults
+    append_dedup: bool = True  # Drop rows already appended in the previous run's lag window
+    
+    # Parallelism settings
+    parallel_workers: int = 1  # 1 extracts tables serially over a single connection
+    normalize_pool: str = "process"  # process or thread based normalize workers
+    
+    # Memory settings
+    buffer_max_items: int = 5000  # Items buffered per table writer before a flush to the intermediate file
+    file_max_items: Optional[int] = 500000  # Rows per intermediate file before rotating, None for no limit
+    file_max_bytes: Optional[int] = 64 * 2**20  # Bytes per intermediate file before rotating, None for no limit
+    normalize_workers: Optional[int] = None  # Normalize processes or threads; None uses parallel_workers
+    load_workers: Optional[int] = None  # Concurrent load jobs; None uses parallel_workers
+    duckdb_memory_limit: Optional[str] = "1GB"  # DuckDB destination memory ceiling, None for DuckDB's default
+    duckdb_temp_directory: Optional[str] = None  # Where DuckDB spills; defaults to <output_directory>/duckdb_tmp
+    duckdb_threads: Optional[int] = None  # DuckDB destination threads, None for one per core
+    
+    # Chunked read settings
+    chunk_size: int = 50000  # Rows per server-side cursor fetch
+    range_partitions: int = 1  # >1 splits the *_readings tables into key ranges read concurrently
+    partition_key: str = "reading_id"  # reading_id or created_at
+    
+    # Row backend settings
+    backend: str = "sqlalchemy"  # sqlalchemy, pyarrow, pandas or connectorx
+    backend_kwargs: Optional[Dict[str, Any]] = None
     
     # Output settings
     output_format: str = "parquet"  # parquet, jsonl, csv
     output_directory: str = None
+    sample_rows: int = 0  # Sample rows printed per table after a run, 0 disables samples
+    sample_max_bytes: int = 2048  # Cap on the printed sample per table
+    
+    # Parquet lake (filesystem destination only)
+    lake: bool = False  # Move each load's files into a partitioned lake under lake_directory
+    lake_directory: str = None  # Defaults to <output_directory>/lake
+    lake_compression: str = "zstd"  # zstd, snappy, gzip or uncompressed
+    lake_partition_grain: str = "day"  # day or month partitions on measurement_time/checkup_date
+    lake_row_group_size: int = 122880  # Rows per Parquet row group
+    lake_file_size_bytes: int = 256 * 2**20  # Target size before an unpartitioned table rolls over to a new file
+    lake_compact_min_files: int = 8  # Partitions with at least this many files are compacted
+    
+    # Data quality (duckdb destination only)
+    dq_scope: Optional[str] = None  # recent or full; runs the dbt source tests after each load, None disables
+    dq_recent_loads: int = 1  # Completed loads tested with the recent scope, at least the loads of the run
+    dq_full_sweep_hours: float = 24  # Recent runs become a full sweep once the last one is this old, 0 never
+    
+    # Metrics
+    metrics_jsonl_path: Optional[str] = None  # Append one JSON line of run metrics per run
+    metrics_prometheus_path: Optional[str] = None  # Textfile collector file, e.g. /var/lib/node_exporter/health.prom
+    profile_stage: Optional[str] = None  # extract, normalize or load; None disables profiling
+    profiler: str = "cprofile"  # cprofile or pyinstrument
     
     def __post_init__(self):
         """Initialize default configurations."""
+        if self.parallel_workers < 1:
+            raise ValueError("parallel_workers must be at least 1")
+        if self.normalize_pool not in ("process", "thread"):
+            raise ValueError(f"Unsupported normalize_pool: {self.normalize_pool}")
+        for name in ("buffer_max_items", "file_max_items", "file_max_bytes", "normalize_workers",
+                     "load_workers", "duckdb_threads"):
+            value = getattr(self, name)
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be at least 1")
+        if self.range_partitions < 1:
+            raise ValueError("range_partitions must be at least 1")
+        if self.partition_key not in ("reading_id", "created_at"):
+            raise ValueError(f"Unsupported partition_key: {self.partition_key}")
+        if self.backend not in ("sqlalchemy", "pyarrow", "pandas", "connectorx"):
+            raise ValueError(f"Unsupported backend: {self.backend}")
+        if self.extraction_mode not in ("query", "cdc"):
+            raise ValueError(f"Unsupported extraction_mode: {self.extraction_mode}")
+        if self.violation_policy not in ("reject_row", "coerce", "quarantine"):
+            raise ValueError(f"Unsupported violation_policy: {self.violation_policy}")
+        for table_name, disposition in (self.write_dispositions or {}).items():
+            if disposition not in ("append", "merge", "replace"):
+                raise ValueError(f"Unsupported write disposition for {table_name}: {disposition}")
+        if self.dq_scope is not None:
+            if self.dq_scope not in ("recent", "full"):
+                raise ValueError(f"Unsupported dq_scope: {self.dq_scope}")
+            self.require_duckdb_destination("data quality tests")
+        if self.dq_recent_loads < 1:
+            raise ValueError("dq_recent_loads must be at least 1")
+        if self.profile_stage is not None and self.profile_stage not in ("extract", "normalize", "load"):
+            raise ValueError(f"Unsupported profile_stage: {self.profile_stage}")
+        if self.profiler not in ("cprofile", "pyinstrument"):
+            raise ValueError(f"Unsupported profiler: {self.profiler}")
+        # Optional packages, not in requirements.txt; fail here rather than mid-run
+        if self.backend == "connectorx":
+            _require_package("connectorx", "backend='connectorx'")
+        if self.profile_stage is not None and self.profiler == "pyinstrument":
+            _require_package("pyinstrument", "profiler='pyinstrument'")
+        
         # Set default output directory to project root/data
         if self.output_directory is None:
             project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
             self.output_directory = os.path.join(project_root, "data")
             
+        if self.duckdb_temp_directory is None:
+            self.duckdb_temp_directory = os.path.join(self.output_directory, "duckdb_tmp")
+            
+        if self.lake:
+            if self.destination != "filesystem":
+                raise ValueError("lake output requires the filesystem destination")
+            if self.lake_directory is None:
+                self.lake_directory = os.path.join(self.output_directory, "lake")
+            if self.destination_config is not None and \
+                    self.destination_config.get("layout") != "{table_name}/{load_id}.{file_id}.{ext}":
+                raise ValueError("lake output requires the {table_name}/{load_id}.{file_id}.{ext} layout")
+            
         if self.table_limits is None:
+            # No caps on the incremental tables: a limit under the incremental lag
+            # can re-read the same window every run without advancing the cursor
             self.table_limits = {
                 'users': 1000,
-                'medical_checkups': 5000,
-                'blood_pressure_readings': 10000,
-                'blood_sugar_readings': 10000,
-                'cholesterol_readings': 10000,
-                'sodium_readings': 10000,
                 'medications': 5000,
                 'health_goals': 2000
             }
@@ -52,8 +163,8 @@ class PipelineConfig:
         if self.table_filters is None:
             self.table_filters = {
                 # Example filters - can be customized
-                'users': "created_at >= '2020-01-01'",
-                'medical_checkups': "checkup_date >= '2020-01-01'",
+                'users': [TableFilter('created_at', '>=', date(2020, 1, 1))],
+                'medical_checkups': [TableFilter('checkup_date', '>=', date(2020, 1, 1))],
             }
             
         if self.table_ordering is None:
@@ -76,8 +187,18 @@ class PipelineConfig:
             elif self.destination == "filesystem":
                 self.destination_config = {
                     "bucket_url": self.output_directory,
-                    "layout": "{table_name}/{load_id}.{file_format}"
+                    "layout": "{table_name}/{load_id}.{file_id}.{ext}"
                 }
+    
+    def require_duckdb_destination(self, feature: str):
+        """Raise ValueError unless the destination is duckdb, which feature needs."""
+        if self.destination != "duckdb":
+            raise ValueError(f"{feature} requires the duckdb destination, not {self.destination}")
+
+
+def _require_package(package: str, option: str):
+    if find_spec(package) is None:
+        raise ImportError(f"{option} requires the optional {package} package: pip install {package}")
 
 
 def get_default_config() -> PipelineConfig:
@@ -102,6 +223,76 @@ def get_full_extraction_config() -> PipelineConfig:
     )
 
 
+def get_parallel_extraction_config(workers: int = 4, normalize_pool: str = "process") -> PipelineConfig:
+    """Get configuration for extracting all tables concurrently with a bounded worker pool."""
+    return PipelineConfig(
+        tables_to_extract=None,
+        enable_incremental=True,
+        parallel_workers=workers,
+        normalize_pool=normalize_pool
+    )
+
+
+def get_columnar_extraction_config(backend: str = "pyarrow") -> PipelineConfig:
+    """Get configuration for extracting all tables as Arrow chunks with a columnar backend."""
+    return PipelineConfig(
+        tables_to_extract=None,
+        enable_incremental=True,
+        backend=backend
+    )
+
+
+def get_lake_config(output_dir: str = "./health_data_export", compression: str = "zstd") -> PipelineConfig:
+    """
+    Get configuration for exporting to a partitioned Parquet lake.
+    
+    dlt writes each load as Parquet files under <output_dir>/_landing, which
+    are then moved into the hive-partitioned lake under <output_dir>/lake.
+    """
+    return PipelineConfig(
+        destination="filesystem",
+        output_directory=output_dir,
+        output_format="parquet",
+        lake=True,
+        lake_compression=compression,
+        destination_config={
+            "bucket_url": os.path.join(output_dir, "_landing"),
+            "layout": "{table_name}/{load_id}.{file_id}.{ext}"
+        }
+    )
+
+
+def get_memory_bounded_config(memory_limit: str = "512MB", file_max_bytes: int = 32 * 2**20) -> PipelineConfig:
+    """
+    Get configuration for extracting large tables under a fixed memory ceiling.
+    
+    Rows stream through small writer buffers into rotated intermediate files,
+    one normalize and one load worker run at a time, and DuckDB spills to
+    disk beyond memory_limit.
+    """
+    return PipelineConfig(
+        tables_to_extract=None,
+        chunk_size=10000,
+        buffer_max_items=1000,
+        file_max_items=100000,
+        file_max_bytes=file_max_bytes,
+        normalize_workers=1,
+        load_workers=1,
+        duckdb_memory_limit=memory_limit,
+        duckdb_threads=2
+    )
+
+
+def get_cdc_config(slot_name: str = "health_data_cdc", batch_size: int = 10000) -> PipelineConfig:
+    """Get configuration for streaming changes from a logical replication slot in micro-batches."""
+    return PipelineConfig(
+        tables_to_extract=None,
+        extraction_mode="cdc",
+        cdc_slot_name=slot_name,
+        cdc_batch_size=batch_size
+    )
+
+
 def get_filesystem_config(output_dir: str = "./health_data_export") -> PipelineConfig:
     """Get configuration for exporting to filesystem."""
     return PipelineConfig(
@@ -109,6 +300,6 @@ def get_filesystem_config(output_dir: str = "./health_data_export") -> PipelineC
         output_directory=output_dir,
         destination_config={
             "bucket_url": output_dir,
-            "layout": "{table_name}/{load_id}.{file_format}"
+            "layout": "{table_name}/{load_id}.{file_id}.{ext}"
         }
     )
\ No newline at end of file
@@ -1,12 +1,60 @@
 """PostgreSQL data source for dlt extraction - Fixed Version."""
 
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List
 
 import dlt
 from dlt.sources import DltResource
 from dlt.sources.sql_database import sql_table
 
 from config.database import DatabaseConfig
+from .append_guard import LagWindowDedup
+from .cdc_source import CDC_COLUMNS, cdc_changes
+from .query_filters import TableFilter, TableOrdering
+from .range_partitions import partitioned_table
+from .source_schema import FROZEN_CONTRACT, RowPolicy, dlt_column_hints, source_columns_for
+
+
+# All available tables with their keys and write strategy
+HEALTH_TABLES = {
+    'customers': {
+        'primary_key': 'customer_id',
+        'incremental_key': 'updated_at',
+        'write_disposition': 'merge'
+    },
+    'medical_checkups': {
+        'primary_key': 'checkup_id',
+        'incremental_key': 'checkup_date',
+        'write_disposition': 'merge'
+    },
+    'blood_pressure_readings': {
+        'primary_key': 'reading_id',
+        'incremental_key': 'created_at',
+        'partitionable': True,
+        # Readings are never updated after insert
+        'write_disposition': 'append'
+    },
+    'blood_sugar_readings': {
+        'primary_key': 'reading_id',
+        'incremental_key': 'created_at',
+        'partitionable': True,
+        # Readings are never updated after insert
+        'write_disposition': 'append'
+    },
+    'cholesterol_readings': {
+        'primary_key': 'reading_id',
+        'incremental_key': 'created_at',
+        'partitionable': True,
+        # Readings are never updated after insert
+        'write_disposition': 'append'
+    },
+    'sodium_readings': {
+        'primary_key': 'reading_id',
+        'incremental_key': 'created_at',
+        'partitionable': True,
+        # Readings are never updated after insert
+        'write_disposition': 'append'
+    }
+}
 
 
 @dlt.source
@@ -14,8 +62,24 @@ def postgres_health_data(
         database_config: DatabaseConfig,
         table_names: Optional[List[str]] = None,
         table_limits: Optional[Dict[str, int]] = None,
-        table_filters: Optional[Dict[str, str]] = None,
-        table_ordering: Optional[Dict[str, str]] = None
+        table_filters: Optional[Dict[str, List[TableFilter]]] = None,
+        table_ordering: Optional[Dict[str, str]] = None,
+        enable_incremental: bool = True,
+        incremental_lag_seconds: float = 0,
+        engine: Optional[Any] = None,
+        parallelize: bool = False,
+        range_partitions: int = 1,
+        partition_key: str = "reading_id",
+        chunk_size: int = 50000,
+        backend: str = "sqlalchemy",
+        backend_kwargs: Optional[Dict[str, Any]] = None,
+        write_dispositions: Optional[Dict[str, str]] = None,
+        append_dedup: bool = True,
+        extraction_mode: str = "query",
+        cdc_options: Optional[Dict[str, Any]] = None,
+        explicit_schema: bool = True,
+        violation_policy: str = "quarantine",
+        violation_counts: Optional[Dict[str, int]] = None
 ) -> List[DltResource]:
     """
     PostgreSQL source for health tracking data using dlt's sql_database source.
@@ -23,48 +87,66 @@ def postgres_health_data(
     Args:
         database_config: Database configuration object
         table_names: Optional list of specific tables to extract
-        table_limits: Optional dictionary of row limits per table
-        table_filters: Optional dictionary of WHERE clauses per table
+        table_limits: Optional dictionary of row limits per table. A limited
+            table loads at most that many rows per run; a limit cannot be
+            combined with incremental_lag_seconds on an incremental table
+        table_filters: Optional dictionary of typed filters per table, pushed
+            down into the WHERE clause
         table_ordering: Optional dictionary of ORDER BY clauses per table
+            (e.g. 'created_at DESC'), ignored while an incremental cursor is active
+        enable_incremental: Whether to track a high-water mark on each table's
+            incremental_key and only extract rows past it on subsequent runs
+        incremental_lag_seconds: How far behind the stored high-water mark to
+            restart each run, so late-arriving rows are still picked up
+        engine: Optional pooled SQLAlchemy engine shared by all resources.
+            If None, each resource connects with the connection string
+        parallelize: Whether to extract the tables concurrently in dlt's
+            extract worker pool instead of one after another
+        range_partitions: Number of key ranges the large readings tables are
+            split into and read concurrently. 1 reads each table with one query
+        partition_key: Indexed column the readings tables are split on
+            (reading_id or created_at)
+        chunk_size: Rows fetched per server-side cursor round trip
+        backend: Row backend for sql_table. sqlalchemy yields Python dicts,
+            pyarrow and connectorx yield Arrow tables and pandas yields pandas
+            DataFrames. Range-partitioned reads yield Arrow tables for pandas too
+        backend_kwargs: Optional keyword arguments passed to the backend
+        write_dispositions: Optional per-table override of the write disposition
+            (append, merge or replace). replace reloads the whole table every
+            run, so it disables the incremental cursor for that table
+        append_dedup: Whether append tables drop rows already loaded in the
+            previous run's incremental lag window
+        extraction_mode: query reads the tables with SELECTs; cdc drains the
+            changes, including deletes, from a logical replication slot instead.
+            Limits, filters and ordering do not apply to cdc
+        cdc_options: Optional keyword arguments for cdc_changes, such as
+            slot_name, batch_size and max_batch_seconds
+        explicit_schema: Whether to declare the column types from the dbt
+            sources file and freeze the schema instead of inferring it
+        violation_policy: What happens to rows that do not match the declared
+            types: reject_row, coerce or quarantine
+        violation_counts: Optional dictionary that collects the number of rows
+            with schema violations per table while the source is extracted
 
     Returns:
         List of dlt resources for each table
     """
-    connection_string = database_config.connection_string()
-
-    # Define all available tables with their configurations
-    all_tables = {
-        'customers': {
-            'primary_key': 'customer_id',
-            'incremental_key': 'updated_at'
-        },
-        'medical_checkups': {
-            'primary_key': 'checkup_id',
-            'incremental_key': 'checkup_date'
-        },
-        'blood_pressure_readings': {
-            'primary_key': 'reading_id',
-            'incremental_key': 'created_at'
-        },
-        'blood_sugar_readings': {
-            'primary_key': 'reading_id',
-            'incremental_key': 'created_at'
-        },
-        'cholesterol_readings': {
-            'primary_key': 'reading_id',
-            'incremental_key': 'created_at'
-        },
-        'sodium_readings': {
-            'primary_key': 'reading_id',
-            'incremental_key': 'created_at'
-        }
-    }
+    credentials = engine if engine is not None else database_config.connection_string()
+
+    all_tables = HEALTH_TABLES
 
     # Filter tables if specific ones are requested
     tables_to_extract = table_names if table_names else list(all_tables.keys())
 
     print(f"Tables to extract: {tables_to_extract}")
 
+    if extraction_mode == "cdc":
+        primary_keys = {
+            table_name: all_tables[table_name]['primary_key']
+            for table_name in tables_to_extract if table_name in all_tables
+        }
+        return [cdc_changes(database_config, primary_keys, **(cdc_options or {}))]
+
     resources = []
 
     for table_name in tables_to_extract:
@@ -72,38 +154,106 @@ def postgres_health_data(
             print(f"Warning: Table '{table_name}' not found in available tables. Skipping.")
             continue
 
+        table_config = all_tables[table_name]
+        limit = (table_limits or {}).get(table_name)
+        write_disposition = (write_dispositions or {}).get(table_name, table_config['write_disposition'])
+        tracks_cursor = enable_incremental and table_config.get('incremental_key') and write_disposition != "replace"
+        if limit and tracks_cursor and incremental_lag_seconds:
+            # Each run restarts lag seconds behind the high-water mark; with more
+            # rows than the limit in that window the cursor would never advance
+            raise ValueError(
+                f"Row limit on {table_name} cannot be combined with an incremental lag "
+                f"({incremental_lag_seconds}s); drop the limit or set incremental_lag_seconds=0"
+            )
+
         try:
             print(f"Creating resource for table: {table_name}")
 
-            table_config = all_tables[table_name]
-
-            # Build the SQL query for this table
-            query = f"SELECT * FROM public.{table_name}"
+            filters = (table_filters or {}).get(table_name, [])
+            partitioned = range_partitions > 1 and table_config.get('partitionable') and engine is not None
+            if partitioned and limit:
+                print(f"Ignoring row limit for {table_name}: not supported for partitioned reads")
+                limit = None
+            if backend == "connectorx" and not partitioned:
+                print(f"⚠️  connectorx reads {table_name} in one piece, ignoring chunk_size; "
+                      f"use range_partitions > 1 to bound its memory")
+            if limit:
+                print(f"⚠️  Row limit in effect for {table_name}: at most {limit} rows per run (partial load)")
 
-            # Add WHERE clause if provided
-            if table_filters and table_name in table_filters:
-                query += f" WHERE {table_filters[table_name]}"
+            # Track a high-water mark on the incremental key in dlt state
+            incremental = None
+            if tracks_cursor:
+                incremental = dlt.sources.incremental(
+                    table_config['incremental_key'],
+                    lag=incremental_lag_seconds or None,
+                    # A row limit must read the oldest rows past the cursor first
+                    row_order='asc' if limit else None
+                )
+                print(f"Incremental cursor for {table_name}: {table_config['incremental_key']} "
+                      f"(lag {incremental_lag_seconds}s)")
+            print(f"Write disposition for {table_name}: {write_disposition}")
 
-            # Add ORDER BY if provided
-            if table_ordering and table_name in table_ordering:
-                query += f" ORDER BY {table_ordering[table_name]}"
-            elif table_config.get('incremental_key'):
-                query += f" ORDER BY {table_config['incremental_key']}"
+            if partitioned:
+                # Read key ranges concurrently into a single resource
+                resource = partitioned_table(
+                    engine,
+                    table_name,
+                    key_column=partition_key,
+                    partitions=range_partitions,
+                    chunk_size=chunk_size,
+                    primary_key=table_config['primary_key'],
+                    write_disposition=write_disposition,
+                    incremental=incremental,
+                    query_adapter_callback=_make_query_adapter(table_name, filters=filters),
+                    backend=backend
+                )
+            else:
+                # Create the resource using dlt's sql_table
+                resource = sql_table(
+                    credentials=credentials,
+                    table=table_name,
+                    schema="public",
+                    incremental=incremental,
+                    chunk_size=chunk_size,
+                    backend=backend,
+                    backend_kwargs=backend_kwargs,
+                    # Keep declared numeric precision and timestamp types in the Arrow schema
+                    reflection_level="full_with_precision",
+                    query_adapter_callback=_make_query_adapter(
+                        table_name,
+                        filters=filters,
+                        ordering=None if incremental else (table_ordering or {}).get(table_name),
+                        limit=limit
+                    ),
+                    primary_key=table_config['primary_key'],
+                    write_disposition=write_disposition
+                )
+            if parallelize:
+                resource = resource.parallelize()
 
-            # Add LIMIT if provided
-            if table_limits and table_name in table_limits:
-                query += f" LIMIT {table_limits[table_name]}"
+            if write_disposition == "append" and append_dedup and incremental is not None and incremental_lag_seconds:
+                resource.add_yield_map(LagWindowDedup(
+                    table_name,
+                    key_column=table_config['primary_key'],
+                    cursor_column=table_config['incremental_key'],
+                    window_seconds=incremental_lag_seconds
+                ))
 
-            print(f"Query for {table_name}: {query}")
-
-            # Create the resource using dlt's sql_table
-            resource = sql_table(
-                credentials=connection_string,
-                table=table_name,
-                schema="public",
-                primary_key=table_config['primary_key'],
-                write_disposition="merge"
-            )
+            # Declared types replace inference; mismatching rows never evolve the schema
+            columns = source_columns_for(table_name) if explicit_schema else []
+            if columns:
+                column_hints = dlt_column_hints(columns)
+                # CDC runs later merge into the same tables; declare their columns
+                # here so the frozen contract admits them
+                for cdc_column in CDC_COLUMNS:
+                    column_hints[cdc_column['name']] = {
+                        'name': cdc_column['name'], 'data_type': cdc_column['data_type'], 'nullable': True
+                    }
+                resource.apply_hints(columns=column_hints, schema_contract=FROZEN_CONTRACT)
+                resource.add_yield_map(RowPolicy(
+                    table_name, columns, violation_policy, primary_key=table_config['primary_key'],
+                    violation_counts=violation_counts
+                ))
 
             resources.append(resource)
             print(f"✅ Successfully created resource for {table_name}")
@@ -117,3 +267,68 @@ def postgres_health_data(
     return resources
 
 
+def _make_query_adapter(
+        table_name: str,
+        filters: List[TableFilter],
+        ordering: Optional[str] = None,
+        limit: Optional[int] = None
+):
+    """
+    Build a query_adapter_callback that pushes filters, ordering and limits
+    down into the SELECT that dlt issues against PostgreSQL.
+
+    While an incremental cursor is active dlt orders by the cursor column, so
+    a configured ordering is dropped and the limit acts as a resumable batch.
+
+    Args:
+        table_name: Name of the table the adapter is built for
+        filters: Typed filters combined with AND
+        ordering: Optional ORDER BY clause such as 'created_at DESC'
+        limit: Optional maximum number of rows to read
+
+    Returns:
+        Callable taking (query, table) and returning the adapted query
+    """
+    order_by = TableOrdering.parse(ordering) if ordering else None
+
+    pushdown = [f"WHERE {' AND '.join(f.describe() for f in filters)}"] if filters else []
+    if order_by:
+        pushdown.append(f"ORDER BY {order_by.describe()}")
+    if limit:
+        pushdown.append(f"LIMIT {limit}")
+    print(f"Pushdown for {table_name}: {' '.join(pushdown) or 'none'}")
+
+    def adapt_query(query, table):
+        for table_filter in filters:
+            query = query.where(table_filter.to_sqlalchemy(table))
+        if order_by:
+            query = query.order_by(order_by.to_sqlalchemy(table))
+        if limit:
+            query = query.limit(limit)
+
+        compiled = query.compile()
+        print(f"Query for {table_name}: {compiled} {compiled.params or ''}".rstrip())
+        return query
+
+    return adapt_query
+
+
+def create_pooled_engine(database_config: DatabaseConfig, pool_size: int = 1):
+    """
+    Create a SQLAlchemy engine whose connection pool is shared by all table resources.
+
+    Args:
+        database_config: Database configuration object
+        pool_size: Number of pooled connections, normally the extract worker count
+
+    Returns:
+        SQLAlchemy Engine
+    """
+    from sqlalchemy import create_engine
+
+    return create_engine(
+        database_config.connection_string(),
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_pre_ping=True
+    )
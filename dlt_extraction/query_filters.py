@@ -0,0 +1,83 @@
+"""Typed filters and ordering pushed down into extraction and read queries."""
+
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Tuple
+
+
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    '=': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+@dataclass(frozen=True)
+class TableFilter:
+    """
+    A single column predicate compiled into the server-side WHERE clause.
+
+    Values are sent as bound parameters, never formatted into the SQL text,
+    e.g. TableFilter('checkup_date', '>=', date(2020, 1, 1)).
+    """
+
+    column: str
+    op: str
+    value: Any
+
+    def __post_init__(self):
+        if self.op not in _OPERATORS and self.op != 'in':
+            raise ValueError(f"Unsupported filter operator '{self.op}' for column '{self.column}'")
+
+    def to_sqlalchemy(self, table):
+        """Build the SQLAlchemy expression for this filter against a reflected table."""
+        column = table.c[self.column]
+        if self.op == 'in':
+            return column.in_(list(self.value))
+        return _OPERATORS[self.op](column, self.value)
+
+    def to_sql(self) -> Tuple[str, List[Any]]:
+        """Render the predicate as SQL with '?' placeholders and its parameters."""
+        column = quote_identifier(self.column)
+        if self.op == 'in':
+            values = list(self.value)
+            return f"{column} IN ({', '.join('?' for _ in values)})", values
+        return f"{column} {self.op} ?", [self.value]
+
+    def describe(self) -> str:
+        """Human readable form of the predicate."""
+        return f"{self.column} {self.op} {self.value!r}"
+
+
+@dataclass(frozen=True)
+class TableOrdering:
+    """A single ORDER BY column, parsed from clauses like 'created_at DESC'."""
+
+    column: str
+    descending: bool = False
+
+    @classmethod
+    def parse(cls, clause: str) -> 'TableOrdering':
+        parts = clause.split()
+        if not parts or len(parts) > 2:
+            raise ValueError(f"Invalid ordering clause: '{clause}'")
+        direction = parts[1].upper() if len(parts) == 2 else 'ASC'
+        if direction not in ('ASC', 'DESC'):
+            raise ValueError(f"Invalid ordering direction in clause: '{clause}'")
+        return cls(column=parts[0], descending=direction == 'DESC')
+
+    def to_sqlalchemy(self, table):
+        """Build the SQLAlchemy ORDER BY expression against a reflected table."""
+        column = table.c[self.column]
+        return column.desc() if self.descending else column.asc()
+
+    def describe(self) -> str:
+        return f"{self.column} {'DESC' if self.descending else 'ASC'}"
+
+
+def quote_identifier(name: str) -> str:
+    """Quote a column or table name for use in generated SQL."""
+    return '"' + name.replace('"', '""') + '"'
@@ -0,0 +1,228 @@
+"""Explicit raw table schemas declared in the dbt sources, and a row policy for type violations."""
+
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+SOURCES_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "dbt_health_data", "models", "staging", "_sources.yml"
+)
+
+VIOLATION_POLICIES = ("reject_row", "coerce", "quarantine")
+
+# Contract for resources with declared columns: new tables (such as the
+# quarantine tables) may be created, but columns and types never evolve
+FROZEN_CONTRACT = {'tables': 'evolve', 'columns': 'freeze', 'data_type': 'freeze'}
+
+_DECIMAL_TYPE = re.compile(r"^decimal\((\d+),\s*(\d+)\)$")
+
+
+@lru_cache(maxsize=None)
+def load_source_columns(sources_file: str = SOURCES_FILE) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Read the declared columns of each raw table from the dbt sources file.
+
+    Returns:
+        Dictionary mapping table name to its columns, each with name,
+        data_type, not_null and the accepted_values enumeration if any
+    """
+    import yaml
+
+    with open(sources_file) as f:
+        sources = yaml.safe_load(f)
+
+    tables = {}
+    for source in sources.get('sources', []):
+        if source.get('name') != 'raw':
+            continue
+        for table in source.get('tables', []):
+            columns = []
+            for column in table.get('columns', []):
+                if 'data_type' not in column:
+                    continue
+                accepted_values = None
+                not_null = False
+                for test in column.get('tests', []):
+                    if test == 'not_null':
+                        not_null = True
+                    elif isinstance(test, dict) and 'accepted_values' in test:
+                        accepted_values = list(test['accepted_values']['values'])
+                columns.append({
+                    'name': column['name'],
+                    'data_type': column['data_type'].lower(),
+                    'not_null': not_null,
+                    'accepted_values': accepted_values
+                })
+            if columns:
+                tables[table['name']] = columns
+    return tables
+
+
+def dlt_column_hints(columns: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Translate declared source columns into dlt column hints."""
+    hints = {}
+    for column in columns:
+        data_type = column['data_type']
+        hint: Dict[str, Any] = {'name': column['name']}
+        decimal_type = _DECIMAL_TYPE.match(data_type)
+        if decimal_type:
+            hint.update(data_type='decimal', precision=int(decimal_type.group(1)),
+                        scale=int(decimal_type.group(2)))
+        elif data_type == 'integer':
+            hint.update(data_type='bigint', precision=32)
+        elif data_type in ('bigint', 'date', 'timestamp'):
+            hint['data_type'] = data_type
+        elif data_type == 'boolean':
+            hint['data_type'] = 'bool'
+        else:
+            hint['data_type'] = 'text'
+        hints[column['name']] = hint
+    return hints
+
+
+class RowPolicy:
+    """
+    Enforce the declared column types on dict rows before dlt normalizes them.
+
+    Each value not already of its declared type is converted to it, and
+    enumerated columns are checked against their accepted values. Rows whose
+    values all have the declared types are yielded as they are, without a
+    copy. A row with a violation is handled by the policy:
+
+    - reject_row: the row is dropped
+    - coerce: offending values are set to NULL and the row is kept
+    - quarantine: the row is written as JSON, with the violations, to
+      quarantine_<table> instead of the raw table
+
+    The number of rows with violations is kept in violations and, when a
+    violation_counts dictionary is given, under the table name in it.
+
+    Used with DltResource.add_yield_map. Arrow tables and pandas DataFrames
+    from the columnar backends are typed by PostgreSQL and are passed through
+    unchanged.
+    """
+
+    def __init__(self, table_name: str, columns: List[Dict[str, Any]], policy: str, primary_key: str,
+                 violation_counts: Optional[Dict[str, int]] = None):
+        if policy not in VIOLATION_POLICIES:
+            raise ValueError(f"Unsupported schema violation policy: {policy}")
+        self.table_name = table_name
+        self.columns = columns
+        self.policy = policy
+        self.primary_key = primary_key
+        self.violations = 0
+        self.violation_counts = violation_counts
+        self._checks = [
+            (column['name'], column['data_type'], _python_type(column['data_type']),
+             column['not_null'], column['accepted_values'])
+            for column in columns
+        ]
+
+    def __call__(self, item) -> Iterator[Any]:
+        if not isinstance(item, dict):
+            # Arrow table or pandas DataFrame chunk
+            yield item
+            return
+
+        row, errors = self._convert(item)
+        if not errors:
+            yield row
+            return
+
+        self.violations += 1
+        if self.violation_counts is not None:
+            self.violation_counts[self.table_name] = self.violations
+        if self.violations == 1:
+            print(f"Schema violation in {self.table_name} ({self.policy}): {'; '.join(errors)}")
+        if self.policy == "coerce":
+            yield row
+        elif self.policy == "quarantine":
+            yield self._quarantine(item, errors)
+
+    def _convert(self, item: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+        row = item
+        errors = []
+        for name, data_type, python_type, not_null, accepted_values in self._checks:
+            value = item.get(name)
+            if value is None:
+                if not_null:
+                    errors.append(f"{name} is null")
+                continue
+            converted = value
+            # Values the backend already typed as declared need no conversion
+            if type(value) is not python_type:
+                try:
+                    converted = _convert_value(value, data_type)
+                except (TypeError, ValueError, InvalidOperation):
+                    errors.append(f"{name}={value!r} is not {data_type}")
+                    converted = None
+            if converted is not None and accepted_values is not None and converted not in accepted_values:
+                errors.append(f"{name}={converted!r} is not one of {accepted_values}")
+                converted = None
+            if converted is not value:
+                # Copy on the first change so the source row is never modified
+                if row is item:
+                    row = dict(item)
+                row[name] = converted
+        return row, errors
+
+    def _quarantine(self, item: Dict[str, Any], errors: List[str]):
+        import dlt
+
+        return dlt.mark.with_hints(
+            {
+                self.primary_key: item.get(self.primary_key),
+                'source_row': json.dumps(item, default=str),
+                'violations': "; ".join(errors),
+                'quarantined_at': datetime.now(timezone.utc)
+            },
+            dlt.mark.make_hints(
+                table_name=f"quarantine_{self.table_name}",
+                write_disposition="append",
+                columns=[
+                    {'name': 'source_row', 'data_type': 'json'},
+                    {'name': 'violations', 'data_type': 'text'},
+                    {'name': 'quarantined_at', 'data_type': 'timestamp'}
+                ]
+            ),
+            create_table_variant=True
+        )
+
+
+def _python_type(data_type: str) -> type:
+    """Python type a declared column's values have once converted."""
+    if data_type in ('bigint', 'integer'):
+        return int
+    if _DECIMAL_TYPE.match(data_type):
+        return Decimal
+    return {'timestamp': datetime, 'date': date, 'boolean': bool}.get(data_type, str)
+
+
+def _convert_value(value: Any, data_type: str) -> Any:
+    if data_type in ('bigint', 'integer'):
+        if isinstance(value, bool) or (isinstance(value, (float, Decimal)) and value != int(value)):
+            raise ValueError(value)
+        return int(value)
+    if _DECIMAL_TYPE.match(data_type):
+        return Decimal(str(value))
+    if data_type == 'timestamp':
+        return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    if data_type == 'date':
+        if isinstance(value, datetime):
+            return value.date()
+        return value if isinstance(value, date) else date.fromisoformat(str(value))
+    if data_type == 'boolean':
+        if not isinstance(value, bool):
+            raise ValueError(value)
+        return value
+    return value if isinstance(value, str) else str(value)
+
+
+def source_columns_for(table_name: str, sources_file: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Declared columns of one raw table, or an empty list if it declares none."""
+    return load_source_columns(sources_file or SOURCES_FILE).get(table_name, [])
@@ -0,0 +1,5 @@
+"""Read access to the dbt analytics marts."""
+
+from .risk_lookup import RiskLookup, publish_snapshot
+
+__all__ = ['RiskLookup', 'publish_snapshot']
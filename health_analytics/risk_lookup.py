@@ -0,0 +1,249 @@
+"""Point and batch lookups of customer risk from the clinical_risk_profile mart."""
+
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+DEFAULT_DUCKDB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "health_data.duckdb"
+)
+
+RISK_TABLE = "clinical_risk_profile"
+RISK_COLUMNS = ("customer_id", "composite_risk_score", "overall_risk_category", "care_priority")
+
+
+class RiskLookup:
+    """
+    Serve composite risk, risk category and care priority by customer_id.
+
+    Reads go through a persistent read-only DuckDB connection and a pool of
+    at most max_cursors cursors, each with the lookup statements prepared
+    once, and are answered from the customer_id index created by the
+    clinical_risk_profile post hook. Lookups beyond max_cursors wait for a
+    free cursor, so any number of caller threads shares a fixed set of
+    cursors. Results are kept in an LRU cache.
+
+    The cache is tied to the database file: once its size, mtime or inode
+    changes, the connection is reopened and the cache dropped, and
+    `version` moves to the latest source_load_id in the mart. DuckDB does not
+    let another process write a file that is open, even read-only, so point
+    the lookup at a copy published with publish_snapshot after each dbt run.
+    """
+
+    def __init__(self, duckdb_path: str = DEFAULT_DUCKDB_PATH, cache_size: int = 65536,
+                 check_interval_seconds: float = 1.0, schema: Optional[str] = None,
+                 max_cursors: int = 8):
+        """
+        Args:
+            duckdb_path: DuckDB file holding the analytics schema
+            cache_size: Customers kept in the LRU cache, 0 disables caching
+            check_interval_seconds: How often the file is checked for a new version
+            schema: Schema of clinical_risk_profile. None finds it in the catalog
+            max_cursors: Cursors kept open, the most lookups that query DuckDB at once
+        """
+        if max_cursors < 1:
+            raise ValueError("max_cursors must be at least 1")
+        self.duckdb_path = duckdb_path
+        self.cache_size = cache_size
+        self.check_interval_seconds = check_interval_seconds
+        self.schema = schema
+        self.max_cursors = max_cursors
+        self.version = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._active = 0
+        self._cursors = []
+        self._free_cursors: queue.Queue = queue.Queue(maxsize=max_cursors)
+        self._cache: 'OrderedDict[int, Optional[Dict[str, Any]]]' = OrderedDict()
+        self._connection = None
+        self._generation = 0
+        self._file_id = None
+        self._checked_at = 0.0
+
+    def get(self, customer_id: int) -> Optional[Dict[str, Any]]:
+        """Risk of one customer, or None if the customer is not in the mart."""
+        return self.get_many([customer_id]).get(int(customer_id))
+
+    def get_many(self, customer_ids: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """
+        Risk of several customers, looked up with one query for the cache misses.
+
+        Returns:
+            Dictionary mapping each requested customer_id to its risk, or None
+            for customers that are not in the mart
+        """
+        customer_ids = list(dict.fromkeys(int(customer_id) for customer_id in customer_ids))
+        self._check_version()
+        results: Dict[int, Optional[Dict[str, Any]]] = {}
+        missing = []
+        with self._lock:
+            for customer_id in customer_ids:
+                if customer_id in self._cache:
+                    self._cache.move_to_end(customer_id)
+                    results[customer_id] = self._cache[customer_id]
+                else:
+                    missing.append(customer_id)
+        if not missing:
+            return results
+
+        cursor, generation = self._acquire_cursor()
+        try:
+            if len(missing) == 1:
+                rows = cursor.execute(f"EXECUTE risk_point({missing[0]})").fetchall()
+            else:
+                rows = cursor.execute(f"EXECUTE risk_batch([{', '.join(map(str, missing))}])").fetchall()
+        finally:
+            self._release_cursor(cursor)
+        found = {row[0]: _risk(row) for row in rows}
+        with self._lock:
+            for customer_id in missing:
+                risk = found.get(customer_id)
+                results[customer_id] = risk
+                # Results read before a reload belong to the old version
+                if self.cache_size > 0 and generation == self._generation:
+                    self._cache[customer_id] = risk
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return results
+
+    def sample_customer_ids(self, sample_size: int) -> List[int]:
+        """Up to sample_size customer ids from the mart, for warm-up and load tests."""
+        self._check_version()
+        cursor, _ = self._acquire_cursor()
+        try:
+            return [row[0] for row in cursor.execute(
+                f'SELECT customer_id FROM "{self.schema}"."{RISK_TABLE}" USING SAMPLE {int(sample_size)} ROWS'
+            ).fetchall()]
+        finally:
+            self._release_cursor(cursor)
+
+    def close(self):
+        """Close the connection; the next lookup reopens it."""
+        with self._lock:
+            self._reset()
+
+    def _check_version(self):
+        now = time.monotonic()
+        if self._connection is not None and now - self._checked_at < self.check_interval_seconds:
+            return
+        file_id = self._stat_file()
+        with self._lock:
+            self._checked_at = now
+            if self._connection is not None and file_id == self._file_id:
+                return
+            self._reset()
+            self._open(file_id)
+
+    def _stat_file(self):
+        stat = os.stat(self.duckdb_path)
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def _open(self, file_id):
+        import duckdb
+
+        # Point lookups gain nothing from intra-query parallelism; concurrency comes from the callers
+        self._connection = duckdb.connect(self.duckdb_path, read_only=True, config={'threads': 1})
+        self._file_id = file_id
+        if self.schema is None:
+            # dbt prefixes custom schemas with the target schema, e.g. main_analytics
+            row = self._connection.execute(
+                "SELECT table_schema FROM information_schema.tables WHERE table_name = ? "
+                "ORDER BY table_schema LIMIT 1", [RISK_TABLE]
+            ).fetchone()
+            if row is None:
+                raise LookupError(f"{RISK_TABLE} not found in {self.duckdb_path}; run dbt first")
+            self.schema = row[0]
+        self.version = self._connection.execute(
+            f'SELECT max(source_load_id) FROM "{self.schema}"."{RISK_TABLE}"'
+        ).fetchone()[0]
+
+    def _reset(self):
+        # Called with the lock held; running lookups finish on the old connection first
+        self._idle.wait_for(lambda: self._active == 0)
+        for cursor in self._cursors:
+            cursor.close()
+        self._cursors = []
+        self._free_cursors = queue.Queue(maxsize=self.max_cursors)
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = None
+        self._cache.clear()
+        self._generation += 1
+        self.version = None
+
+    def _acquire_cursor(self):
+        """A pooled cursor with the lookup statements prepared on it, marked in use."""
+        with self._lock:
+            # close() may have run since the version check
+            if self._connection is None:
+                self._open(self._stat_file())
+            generation = self._generation
+            free_cursors = self._free_cursors
+            self._active += 1
+            try:
+                try:
+                    cursor = free_cursors.get_nowait()
+                except queue.Empty:
+                    cursor = self._prepare_cursor() if len(self._cursors) < self.max_cursors else None
+            except BaseException:
+                self._active -= 1
+                self._idle.notify_all()
+                raise
+        if cursor is None:
+            # Every cursor is in use. A reset waits for this lookup, so the
+            # cursor released to it is still of this generation
+            cursor = free_cursors.get()
+        return cursor, generation
+
+    def _prepare_cursor(self):
+        # Called with the lock held; statements are prepared once per cursor and generation
+        relation = f'"{self.schema}"."{RISK_TABLE}"'
+        columns = ", ".join(RISK_COLUMNS)
+        cursor = self._connection.cursor()
+        cursor.execute(f"PREPARE risk_point AS SELECT {columns} FROM {relation} WHERE customer_id = $1")
+        cursor.execute(
+            f"PREPARE risk_batch AS SELECT {columns} FROM {relation} "
+            f"WHERE customer_id IN (SELECT unnest($1::BIGINT[]))"
+        )
+        self._cursors.append(cursor)
+        return cursor
+
+    def _release_cursor(self, cursor):
+        with self._lock:
+            self._free_cursors.put_nowait(cursor)
+            self._active -= 1
+            if self._active == 0:
+                self._idle.notify_all()
+
+
+def _risk(row) -> Dict[str, Any]:
+    risk = dict(zip(RISK_COLUMNS, row))
+    # round() over the decimal weights returns a DECIMAL
+    if risk['composite_risk_score'] is not None:
+        risk['composite_risk_score'] = float(risk['composite_risk_score'])
+    return risk
+
+
+def publish_snapshot(duckdb_path: str, snapshot_path: str):
+    """
+    Copy a DuckDB file to the path a RiskLookup serves from.
+
+    The copy is written next to the snapshot and renamed into place, so a
+    lookup never sees a partial file and picks up the new inode on its next
+    version check. The source file must not be open for writing.
+    """
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(snapshot_path)}.{os.getpid()}.tmp")
+    try:
+        shutil.copyfile(duckdb_path, temp_path)
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
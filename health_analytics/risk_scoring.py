@@ -0,0 +1,327 @@
+"""
+Vectorized clinical risk scoring that mirrors the dbt staging and mart logic.
+
+The CASE chains of the staging models are declared here as ordered rule
+sets. A rule's condition is a list of alternatives (OR), each a list of
+(column, operator, value) terms (AND), and the first matching rule wins,
+exactly like CASE. Rules are evaluated over whole NumPy columns with
+np.select, and composite scores are binned with np.searchsorted, so no
+Python code runs per row.
+
+Keep these rules in step with:
+
+- stg_blood_pressure_readings.bp_risk_level
+- stg_blood_sugar_readings.glucose_risk_level
+- stg_cholesterol_readings.cardiovascular_risk_level
+- stg_sodium_readings.clinical_risk_level
+- stg_medical_checkups.health_risk_level
+- the risk scores, composite_risk_score, overall_risk_category and
+  care_priority in clinical_risk_profile
+
+benchmarks/risk_scoring_parity.py checks them against a dbt build.
+"""
+
+from dataclasses import astuple, dataclass, fields
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+Term = Tuple[str, str, Any]
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One WHEN branch: label is returned when any alternative has all its terms true."""
+
+    label: str
+    alternatives: Sequence[Sequence[Term]]
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    """An ordered CASE expression over input columns, with the ELSE label as default."""
+
+    name: str
+    rules: Sequence[Rule]
+    default: str = "Unknown"
+
+    @property
+    def labels(self) -> List[str]:
+        """Distinct output labels; codes returned by codes() index into this list."""
+        return list(dict.fromkeys([rule.label for rule in self.rules] + [self.default]))
+
+    @property
+    def inputs(self) -> List[str]:
+        """Columns the rules read."""
+        return list(dict.fromkeys(
+            column for rule in self.rules for alternative in rule.alternatives for column, _, _ in alternative
+        ))
+
+    def codes(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """Index into labels of the first matching rule for every row."""
+        labels = self.labels
+        arrays = {name: _as_numpy(columns[name]) for name in self.inputs}
+        conditions = [_condition(rule.alternatives, arrays) for rule in self.rules]
+        choices = [labels.index(rule.label) for rule in self.rules]
+        return np.select(conditions, choices, default=labels.index(self.default)).astype(np.int8)
+
+    def apply(self, columns: Mapping[str, Any]) -> np.ndarray:
+        """Label of the first matching rule for every row, as an object array."""
+        return np.array(self.labels, dtype=object)[self.codes(columns)]
+
+
+# Staging risk levels, in the order of their CASE branches
+RISK_RULES = {
+    'bmi': RuleSet('health_risk_level', [
+        Rule('High', [[('bmi', '<', 18.5)]]),
+        Rule('Low', [[('bmi', 'between', (18.5, 24.9))]]),
+        Rule('Moderate', [[('bmi', 'between', (25.0, 29.9))]]),
+        Rule('High', [[('bmi', '>=', 30.0)]])
+    ]),
+    'bp': RuleSet('bp_risk_level', [
+        Rule('Low', [[('systolic_pressure', '<', 120), ('diastolic_pressure', '<', 80)]]),
+        Rule('Low-Moderate', [[('systolic_pressure', 'between', (120, 129)), ('diastolic_pressure', '<', 80)]]),
+        Rule('Moderate', [[('systolic_pressure', 'between', (130, 139))],
+                          [('diastolic_pressure', 'between', (80, 89))]]),
+        Rule('High', [[('systolic_pressure', 'between', (140, 179))],
+                      [('diastolic_pressure', 'between', (90, 119))]]),
+        Rule('Critical', [[('systolic_pressure', '>=', 180)], [('diastolic_pressure', '>=', 120)]])
+    ]),
+    'glucose': RuleSet('glucose_risk_level', [
+        Rule('Critical Low', [[('glucose_level', '<', 54)]]),
+        Rule('Low', [[('glucose_level', '<', 70)]]),
+        Rule('Normal', [[('measurement_type', '==', 'fasting'), ('glucose_level', 'between', (70, 99))]]),
+        Rule('Moderate', [[('measurement_type', '==', 'fasting'), ('glucose_level', 'between', (100, 125))]]),
+        Rule('High', [[('measurement_type', '==', 'fasting'), ('glucose_level', '>=', 126)]]),
+        Rule('Normal', [[('measurement_type', 'in', ('random', 'post_meal', 'oral_glucose_tolerance')),
+                         ('glucose_level', '<', 140)]]),
+        Rule('Moderate', [[('measurement_type', 'in', ('random', 'post_meal', 'oral_glucose_tolerance')),
+                           ('glucose_level', 'between', (140, 199))]]),
+        Rule('High', [[('measurement_type', 'in', ('random', 'post_meal', 'oral_glucose_tolerance')),
+                       ('glucose_level', '>=', 200)]]),
+        Rule('Critical High', [[('glucose_level', '>', 400)]])
+    ]),
+    'cholesterol': RuleSet('cardiovascular_risk_level', [
+        Rule('Very High', [[('ldl_cholesterol', '>=', 190)], [('triglycerides', '>=', 500)]]),
+        Rule('High', [[('ldl_cholesterol', '>=', 160)],
+                      [('hdl_cholesterol', '<', 40), ('triglycerides', '>=', 200)]]),
+        Rule('Moderate', [[('ldl_cholesterol', '>=', 130)], [('hdl_cholesterol', '<', 40)],
+                          [('triglycerides', '>=', 150)]]),
+        Rule('Low', [[('ldl_cholesterol', '<', 100), ('hdl_cholesterol', '>=', 60), ('triglycerides', '<', 150)]])
+    ], default='Moderate'),
+    'sodium': RuleSet('clinical_risk_level', [
+        Rule('Critical', [[('sodium_level', '<', 120)], [('sodium_level', '>', 170)]]),
+        Rule('High', [[('sodium_level', '<', 125)], [('sodium_level', '>', 160)]]),
+        Rule('Moderate', [[('sodium_level', '<', 130)], [('sodium_level', '>', 150)]]),
+        Rule('Low', [[('sodium_level', 'between', (130, 150))]])
+    ])
+}
+
+# Score per risk level in clinical_risk_profile; levels not listed (Unknown, NULL) score 0
+RISK_SCORES = {
+    'bmi': {'Low': 0, 'Moderate': 1, 'High': 2},
+    'bp': {'Low': 0, 'Low-Moderate': 0, 'Moderate': 1, 'High': 2, 'Critical': 3},
+    'glucose': {'Low': 0, 'Normal': 0, 'Moderate': 1, 'High': 2, 'Critical High': 3, 'Critical Low': 3},
+    'cholesterol': {'Low': 0, 'Moderate': 1, 'High': 2, 'Very High': 3},
+    'sodium': {'Low': 0, 'Moderate': 1, 'High': 2, 'Critical': 3}
+}
+
+# Lower bounds of the composite score bins, and the labels of each bin
+RISK_BOUNDS = np.array([0.5, 1.5, 2.5])
+OVERALL_RISK_CATEGORIES = np.array(['Low Risk', 'Moderate Risk', 'High Risk', 'Critical Risk'], dtype=object)
+CARE_PRIORITIES = np.array(['Routine Care', 'Standard Care', 'Priority Care', 'Immediate Care'], dtype=object)
+
+
+@dataclass(frozen=True)
+class RiskWeights:
+    """Weights of the component scores in composite_risk_score."""
+
+    bmi: float = 0.15
+    bp: float = 0.25
+    glucose: float = 0.25
+    cholesterol: float = 0.25
+    sodium: float = 0.10
+
+
+COMPONENTS = tuple(field.name for field in fields(RiskWeights))
+
+
+def bmi(height_cm, weight_kg) -> np.ndarray:
+    """Unrounded BMI, as used by the staging risk level (the bmi column is rounded to 2 decimals)."""
+    return _as_numpy(weight_kg) / np.power(_as_numpy(height_cm) / 100.0, 2)
+
+
+def risk_levels(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """
+    Staging risk level of every component for every row.
+
+    Args:
+        columns: Input columns by name (NumPy arrays, Arrow arrays or pandas
+            Series): bmi (see bmi()), systolic_pressure, diastolic_pressure,
+            glucose_level, measurement_type, ldl_cholesterol, hdl_cholesterol,
+            triglycerides and sodium_level. Missing values are NaN or None
+            and match no rule, like NULL in SQL
+
+    Returns:
+        Dictionary mapping component name to an object array of labels
+    """
+    return {component: RISK_RULES[component].apply(columns) for component in COMPONENTS}
+
+
+def risk_scores(columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """Component scores (0 to 3) for every row, computed from the inputs of risk_levels."""
+    scores = {}
+    for component in COMPONENTS:
+        rule_set = RISK_RULES[component]
+        lookup = np.array([RISK_SCORES[component].get(label, 0) for label in rule_set.labels], dtype=np.int8)
+        scores[component] = lookup[rule_set.codes(columns)]
+    return scores
+
+
+def scores_from_levels(levels: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    """Component scores from risk level labels, such as the level columns of clinical_risk_profile."""
+    scores = {}
+    for component in COMPONENTS:
+        values = _as_numpy(levels[component])
+        # Map the few distinct labels once instead of every row
+        distinct, inverse = np.unique(np.where(_is_missing(values), "", values).astype(str), return_inverse=True)
+        lookup = np.array([RISK_SCORES[component].get(label, 0) for label in distinct], dtype=np.int8)
+        scores[component] = lookup[inverse.reshape(-1)]
+    return scores
+
+
+def composite_score(scores: Mapping[str, np.ndarray], weights: RiskWeights = RiskWeights()) -> np.ndarray:
+    """Weighted sum of the component scores rounded to 2 decimals, like composite_risk_score."""
+    total = np.zeros(len(scores[COMPONENTS[0]]), dtype=np.float64)
+    for component, weight in zip(COMPONENTS, astuple(weights)):
+        total += weight * scores[component]
+    return np.round(total, 2)
+
+
+def risk_categories(composite: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """overall_risk_category and care_priority of each composite score."""
+    bins = np.searchsorted(RISK_BOUNDS, composite, side="right")
+    return OVERALL_RISK_CATEGORIES[bins], CARE_PRIORITIES[bins]
+
+
+def score_customers(columns: Mapping[str, Any], weights: RiskWeights = RiskWeights()) -> Dict[str, np.ndarray]:
+    """
+    Score customers from their latest measurements.
+
+    Args:
+        columns: Inputs of risk_levels, one row per customer
+        weights: Composite score weights
+
+    Returns:
+        Dictionary with <component>_risk_score per component,
+        composite_risk_score, overall_risk_category and care_priority
+    """
+    scores = risk_scores(columns)
+    composite = composite_score(scores, weights)
+    overall, priority = risk_categories(composite)
+    result = {f"{component}_risk_score": score for component, score in scores.items()}
+    result.update(composite_risk_score=composite, overall_risk_category=overall, care_priority=priority)
+    return result
+
+
+def sweep_weights(scores: Mapping[str, np.ndarray], weight_grid: Iterable[RiskWeights],
+                  batch_size: int = 16) -> List[Dict[str, Any]]:
+    """
+    Re-score a population under each set of weights.
+
+    The component scores are computed once; each batch of weight sets is a
+    single matrix product, so a sweep costs one pass over the scores per
+    batch_size weight sets.
+
+    Args:
+        scores: Component scores from risk_scores or scores_from_levels
+        weight_grid: Weight sets to evaluate
+        batch_size: Weight sets evaluated per matrix product
+
+    Returns:
+        One dictionary per weight set with the weights, the mean composite
+        score and the number of customers per overall risk category
+    """
+    matrix = np.column_stack([scores[component] for component in COMPONENTS]).astype(np.float64)
+    weight_grid = list(weight_grid)
+    results = []
+    for start in range(0, len(weight_grid), batch_size):
+        batch = weight_grid[start:start + batch_size]
+        weights = np.array([astuple(w) for w in batch], dtype=np.float64).T
+        composite = np.round(matrix @ weights, 2)
+        bins = np.searchsorted(RISK_BOUNDS, composite, side="right")
+        for index, weight_set in enumerate(batch):
+            counts = np.bincount(bins[:, index], minlength=len(OVERALL_RISK_CATEGORIES))
+            results.append({
+                'weights': weight_set,
+                'mean_composite_risk_score': float(composite[:, index].mean()) if len(composite) else 0.0,
+                'overall_risk_category': dict(zip(OVERALL_RISK_CATEGORIES, counts.tolist()))
+            })
+    return results
+
+
+def _condition(alternatives: Sequence[Sequence[Term]], arrays: Mapping[str, np.ndarray]) -> np.ndarray:
+    matched = None
+    for alternative in alternatives:
+        terms = None
+        for column, operator, value in alternative:
+            term = _term(arrays[column], operator, value)
+            terms = term if terms is None else terms & term
+        matched = terms if matched is None else matched | terms
+    return matched
+
+
+def _term(values: np.ndarray, operator: str, value: Any) -> np.ndarray:
+    # NaN compares false, so missing numbers match no term, like NULL
+    with np.errstate(invalid="ignore"):
+        if operator == "<":
+            return values < value
+        if operator == "<=":
+            return values <= value
+        if operator == ">":
+            return values > value
+        if operator == ">=":
+            return values >= value
+        if operator == "between":
+            low, high = value
+            return (values >= low) & (values <= high)
+    if operator == "==":
+        return values == value
+    if operator == "in":
+        return np.isin(values, list(value))
+    raise ValueError(f"Unsupported rule operator: {operator}")
+
+
+def _as_numpy(column: Any) -> np.ndarray:
+    """
+    Numbers as float64 with NaN for missing values, anything else as an object array.
+
+    Arrow and NumPy columns convert without a per-row pass; Python lists of
+    Decimal or None, as returned by fetchall, are converted row by row.
+    """
+    if hasattr(column, 'type') and hasattr(column, 'cast'):
+        # Arrow arrays: decimals and integers go through float64 so nulls become NaN
+        import pyarrow as pa
+
+        if pa.types.is_decimal(column.type) or pa.types.is_integer(column.type):
+            column = column.cast(pa.float64())
+        return np.asarray(column.to_numpy(zero_copy_only=False))
+    if hasattr(column, 'to_numpy'):
+        column = column.to_numpy()
+    array = np.asarray(column)
+    if array.dtype.kind in "iub":
+        return array.astype(np.float64)
+    if array.dtype.kind == "O" and len(array) and _is_number(array):
+        return np.array([np.nan if value is None else float(value) for value in array], dtype=np.float64)
+    return array
+
+
+def _is_number(array: np.ndarray) -> bool:
+    first = next((value for value in array if value is not None), None)
+    return first is not None and not isinstance(first, str)
+
+
+def _is_missing(values: np.ndarray) -> np.ndarray:
+    if values.dtype.kind == "O":
+        return np.equal(values, None)
+    return np.zeros(len(values), dtype=bool)
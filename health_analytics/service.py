@@ -0,0 +1,85 @@
+"""Small local HTTP service for customer risk lookups."""
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+from urllib.parse import parse_qs, urlsplit
+
+from .risk_lookup import RiskLookup
+
+MAX_BATCH_SIZE = 1000
+
+
+class RiskRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON endpoints over the server's RiskLookup:
+
+    - GET /risk/<customer_id>: one customer, 404 if unknown
+    - GET /risk?customer_id=1,2,3: several customers, null for unknown ones
+    - GET /health: the data version being served
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Keep-alive responses are written in two parts; Nagle would hold back the body
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        lookup = self.server.lookup
+        try:
+            if url.path == "/health":
+                lookup.get_many([])
+                self._send(200, {'status': 'ok', 'version': lookup.version})
+            elif url.path.startswith("/risk/"):
+                risk = lookup.get(int(url.path[len("/risk/"):]))
+                if risk is None:
+                    self._send(404, {'error': 'customer not found'})
+                else:
+                    self._send(200, risk)
+            elif url.path == "/risk":
+                customer_ids = [
+                    int(customer_id)
+                    for value in parse_qs(url.query).get('customer_id', [])
+                    for customer_id in value.split(",") if customer_id
+                ]
+                if not customer_ids or len(customer_ids) > MAX_BATCH_SIZE:
+                    self._send(400, {'error': f"pass 1 to {MAX_BATCH_SIZE} customer_id values"})
+                    return
+                risks = lookup.get_many(customer_ids)
+                self._send(200, {'version': lookup.version,
+                                 'customers': {str(key): value for key, value in risks.items()}})
+            else:
+                self._send(404, {'error': 'not found'})
+        except ValueError:
+            self._send(400, {'error': 'customer_id must be an integer'})
+        except Exception as e:
+            self._send(500, {'error': str(e)})
+
+    def _send(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Per-request logging would dominate the latency of cached lookups
+        pass
+
+
+class RiskServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the RiskLookup its handlers answer from."""
+
+    daemon_threads = True
+    # The default listen backlog of 5 drops connections under concurrent load
+    request_queue_size = 128
+
+    def __init__(self, server_address, lookup: RiskLookup):
+        super().__init__(server_address, RiskRequestHandler)
+        self.lookup = lookup
+
+
+def create_server(lookup: RiskLookup, host: str = "127.0.0.1", port: int = 8080) -> RiskServer:
+    """Create the risk service on host:port; call serve_forever to run it."""
+    return RiskServer((host, port), lookup)
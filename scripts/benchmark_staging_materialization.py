@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark dbt builds with staging models as views versus incremental tables.
+
+Runs against the DuckDB file configured in dbt_health_data/profiles.yml, so
+load data with the extraction pipeline first. Each scenario is timed with
+`dbt run --select staging+`:
+
+- view:              every staging model is a view (the default)
+- incremental_full:  incremental staging models built from scratch
+- incremental_noop:  incremental rebuild with no new loads since the last run
+"""
+
+import json
+import os
+import sys
+import time
+
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dbt_health_data")
+
+STAGING_MODELS = [
+    'stg_customers',
+    'stg_medical_checkups',
+    'stg_blood_pressure_readings',
+    'stg_blood_sugar_readings',
+    'stg_cholesterol_readings',
+    'stg_sodium_readings'
+]
+
+
+def run_dbt(materialization: str, full_refresh: bool) -> float:
+    """Run the staging layer and everything downstream, returning wall clock seconds."""
+    from dbt.cli.main import dbtRunner
+
+    staging_vars = {
+        'staging_materializations': {model: materialization for model in STAGING_MODELS}
+    }
+    args = [
+        "run",
+        "--select", "staging+",
+        "--vars", json.dumps(staging_vars),
+        "--project-dir", PROJECT_DIR,
+        "--profiles-dir", PROJECT_DIR
+    ]
+    if full_refresh:
+        args.append("--full-refresh")
+
+    started = time.perf_counter()
+    result = dbtRunner().invoke(args)
+    elapsed = time.perf_counter() - started
+    if not result.success:
+        raise RuntimeError(f"dbt run failed for {materialization} staging: {result.exception}")
+    return elapsed
+
+
+def main():
+    # profiles.yml resolves the DuckDB path relative to the dbt project directory
+    os.chdir(PROJECT_DIR)
+
+    timings = {
+        'view': run_dbt("view", full_refresh=True),
+        'incremental_full': run_dbt("incremental", full_refresh=True),
+        'incremental_noop': run_dbt("incremental", full_refresh=False)
+    }
+
+    print("\nStaging materialization benchmark (dbt run --select staging+)")
+    print("=" * 60)
+    for scenario, seconds in timings.items():
+        print(f"{scenario:<20} {seconds:>8.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,161 @@
 #!/usr/bin/env python3
 
+import argparse
+import signal
 import sys
 import os
+import threading
+import time
+from typing import Dict, List
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dlt_extraction import run_full_extraction, export_to_files
+from dlt_extraction import run_full_extraction, run_extract_and_transform, export_to_files
+
+
+# Default daemon schedule in seconds: readings arrive continuously, profiles change rarely
+DEFAULT_SCHEDULE = {
+    'blood_pressure_readings': 60,
+    'blood_sugar_readings': 60,
+    'cholesterol_readings': 60,
+    'sodium_readings': 60,
+    'medical_checkups': 300,
+    'customers': 3600
+}
+
+
+def parse_schedule(entries) -> Dict[str, float]:
+    """Parse table=seconds entries on top of the default schedule."""
+    schedule = dict(DEFAULT_SCHEDULE)
+    for entry in entries or []:
+        table_name, _, seconds = entry.partition("=")
+        if table_name not in DEFAULT_SCHEDULE or not seconds:
+            raise argparse.ArgumentTypeError(f"Invalid schedule entry: '{entry}' (expected table=seconds)")
+        schedule[table_name] = float(seconds)
+    return {table_name: seconds for table_name, seconds in schedule.items() if seconds > 0}
+
+
+def run_daemon(schedule: Dict[str, float], stop: threading.Event, transform: bool = False):
+    """
+    Run incremental extractions on a per-table schedule until stop is set.
+
+    One HealthDataPipeline is kept for the lifetime of the daemon, so the dlt
+    pipeline, the PostgreSQL pool and the DuckDB handle are reused by every
+    cycle. Due tables whose high-water mark has not moved are skipped. With
+    transform, each cycle also runs the dbt models downstream of the tables
+    that loaded rows. Models a dbt run did not build are retried on every
+    following cycle until they succeed, since their tables' loads are already
+    past the cursor. A stop request lets the running cycle finish before
+    shutting down.
+    """
+    from dlt_extraction import HealthDataPipeline
+    from dlt_extraction.dbt_tasks import changed_source_selectors, failed_selectors
+    from dlt_extraction.pipeline_config import get_full_extraction_config
+    from dlt_extraction.postgres_source import HEALTH_TABLES
+
+    pipeline = HealthDataPipeline(get_full_extraction_config())
+    next_due = {table_name: 0.0 for table_name in schedule}
+    retry_selectors: List[str] = []
+    print(f"Daemon started: {', '.join(f'{t} every {s:g}s' for t, s in schedule.items())}")
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            due = [table_name for table_name, at in next_due.items() if at <= now]
+            for table_name in due:
+                next_due[table_name] = now + schedule[table_name]
+
+            if due:
+                changed: List[str] = []
+                try:
+                    changed = pipeline.tables_with_new_data(due)
+                    skipped = [table_name for table_name in due if table_name not in changed]
+                    if skipped:
+                        print(f"⏭️  No new data in {', '.join(skipped)}")
+                    if changed and transform:
+                        result = pipeline.run_extract_transform(
+                            show_progress=False, table_names=changed, retry_selectors=retry_selectors
+                        )
+                        retry_selectors = failed_selectors(result['dbt'])
+                    elif changed:
+                        result = pipeline.run_extraction(show_progress=False, table_names=changed)
+                    elif retry_selectors:
+                        retry_selectors = failed_selectors(pipeline.run_transform(retry_selectors))
+                    if changed:
+                        print(f"✅ Cycle loaded {result['rows_extracted']} rows "
+                              f"in {result['wall_clock_seconds']:.2f}s")
+                    if retry_selectors:
+                        print(f"🔁 Retrying dbt for {' '.join(retry_selectors)} next cycle")
+                except Exception as e:
+                    # Keep the daemon alive; the tables are retried when next due.
+                    # Rows may have loaded before the failure, so their models are retried too
+                    if transform:
+                        retry_selectors += [
+                            selector for selector in changed_source_selectors(dict.fromkeys(changed, 1), HEALTH_TABLES)
+                            if selector not in retry_selectors
+                        ]
+                    print(f"❌ Cycle failed: {e}")
+
+            stop.wait(max(0.0, min(next_due.values()) - time.monotonic()))
+    finally:
+        pipeline.close()
+        print("Daemon stopped")
 
 
 def main():
     """
     Main extraction script using dlt pipeline.
-    
+
     This replaces the old extraction logic with dlt-based extraction.
     Available options:
-    - Full extraction (all health tracking tables)
-    - Export to files
+    - Full extraction (all health tracking tables), the default
+    - Extraction followed by the dbt models of the changed tables (--transform)
+    - Export to files (--export)
+    - Long-running incremental daemon (--daemon)
     """
+    parser = argparse.ArgumentParser(description="Health data extraction using dlt")
+    parser.add_argument("--daemon", action="store_true", help="Run incremental extractions on a schedule")
+    parser.add_argument("--schedule", action="append", metavar="TABLE=SECONDS",
+                        help="Override a table's daemon interval; 0 disables the table")
+    parser.add_argument("--transform", action="store_true",
+                        help="Run the dbt models downstream of the tables that loaded rows")
+    parser.add_argument("--export", metavar="OUTPUT_DIR", help="Export data to files instead")
+    args = parser.parse_args()
+
     print("Health Data Extraction using dlt")
     print("=" * 40)
-    
-    # Option 2: Uncomment to run full extraction of all tables
-    print("\n🔄 Running full extraction (all health tables)...")
-    try:
-        result = run_full_extraction()
-        print("✅ Full extraction completed successfully")
-    except Exception as e:
-        print(f"❌ Full extraction failed: {e}")
-    
-    # Option 3: Uncomment to export data to files
-    # print("\n🔄 Exporting data to files...")
-    # try:
-    #     result = export_to_files("./health_data_export")
-    #     print("✅ Data export completed successfully")
-    # except Exception as e:
-    #     print(f"❌ Data export failed: {e}")
-    
+
+    if args.daemon:
+        schedule = parse_schedule(args.schedule)
+        if not schedule:
+            parser.error("every table is disabled in the daemon schedule")
+        stop = threading.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: stop.set())
+        run_daemon(schedule, stop, transform=args.transform)
+        return
+
+    if args.export:
+        print("\n🔄 Exporting data to files...")
+        try:
+            export_to_files(args.export)
+            print("✅ Data export completed successfully")
+        except Exception as e:
+            print(f"❌ Data export failed: {e}")
+    elif args.transform:
+        print("\n🔄 Running extraction and dbt (all health tables)...")
+        try:
+            run_extract_and_transform()
+            print("✅ Extraction and transformation completed successfully")
+        except Exception as e:
+            print(f"❌ Extraction and transformation failed: {e}")
+    else:
+        print("\n🔄 Running full extraction (all health tables)...")
+        try:
+            run_full_extraction()
+            print("✅ Full extraction completed successfully")
+        except Exception as e:
+            print(f"❌ Full extraction failed: {e}")
+
     print("\n🎉 Data extraction pipeline completed!")
 
 
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Maintain the Parquet lake written by export_to_files(lake=True).
+
+    python scripts/parquet_lake.py compact --lake-dir ./health_data_export/lake
+    python scripts/parquet_lake.py views --lake-dir ./health_data_export/lake --duckdb data/health_data.duckdb
+
+compact merges the small files left by incremental loads into one file per
+partition; views creates DuckDB views over the lake that dbt reads with
+--vars '{raw_schema: lake}'.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dlt_extraction.parquet_lake import LAKE_TABLES, ParquetLake
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the Parquet lake or create DuckDB views over it")
+    parser.add_argument("command", choices=["compact", "views"])
+    parser.add_argument("--lake-dir", default="./health_data_export/lake", help="Lake directory")
+    parser.add_argument("--tables", nargs="*", choices=list(LAKE_TABLES), help="Tables to compact (default: all)")
+    parser.add_argument("--min-files", type=int, default=8, help="Compact partitions with at least this many files")
+    parser.add_argument("--compression", default="zstd", help="Compression for compacted files")
+    parser.add_argument("--duckdb", default="data/health_data.duckdb", help="DuckDB file the views are created in")
+    parser.add_argument("--schema", default="lake", help="Schema the views are created in")
+    args = parser.parse_args()
+
+    lake = ParquetLake(args.lake_dir, compression=args.compression, compact_min_files=args.min_files)
+    if args.command == "compact":
+        lake.compact(args.tables)
+    else:
+        import duckdb
+
+        connection = duckdb.connect(args.duckdb)
+        try:
+            lake.create_views(connection, schema=args.schema)
+        finally:
+            connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
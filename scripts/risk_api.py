@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Serve customer risk lookups from clinical_risk_profile over HTTP.
+
+    python scripts/risk_api.py --port 8080
+    curl localhost:8080/risk/42
+    curl 'localhost:8080/risk?customer_id=1,2,3'
+
+The DuckDB file is opened read-only and held open, which blocks writers in
+other processes. Serve from a snapshot (--snapshot) so extraction and dbt
+can keep writing the main file; --publish refreshes the snapshot.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from health_analytics.risk_lookup import DEFAULT_DUCKDB_PATH, RiskLookup, publish_snapshot
+from health_analytics.service import create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Customer risk lookup service")
+    parser.add_argument("--duckdb", default=DEFAULT_DUCKDB_PATH, help="DuckDB file with the analytics marts")
+    parser.add_argument("--snapshot", help="Serve from this copy of the DuckDB file instead")
+    parser.add_argument("--publish", action="store_true", help="Copy --duckdb to --snapshot and exit")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--cache-size", type=int, default=65536, help="Customers kept in the LRU cache")
+    parser.add_argument("--max-cursors", type=int, default=8, help="DuckDB cursors shared by the request threads")
+    args = parser.parse_args()
+
+    if args.publish:
+        if not args.snapshot:
+            parser.error("--publish requires --snapshot")
+        publish_snapshot(args.duckdb, args.snapshot)
+        print(f"Published {args.duckdb} to {args.snapshot}")
+        return
+
+    if args.snapshot and not os.path.exists(args.snapshot):
+        publish_snapshot(args.duckdb, args.snapshot)
+    lookup = RiskLookup(args.snapshot or args.duckdb, cache_size=args.cache_size, max_cursors=args.max_cursors)
+    lookup.get_many([])
+    server = create_server(lookup, args.host, args.port)
+    print(f"Serving risk lookups on http://{args.host}:{args.port} (load {lookup.version})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        lookup.close()
+
+
+if __name__ == "__main__":
+    main()